@@ -0,0 +1,87 @@
+"""Compares graph reduction against the tree reducer and the abstract machine, on
+families of terms that duplicate work.
+
+Usage: python benchmarks/bench_graph.py
+
+Each family is run at growing sizes, so the step counts show how each evaluator
+scales. Evaluators that give up after `MAX_STEPS` steps or `TIMEOUT` seconds are
+shown with a `>`.
+"""
+
+import time
+from typing import Callable
+
+from families import apply
+
+from lambda_calc import graph
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.church import numeral
+from lambda_calc.machine import Mode, evaluate
+from lambda_calc.reduction import Reduction, reduce
+
+MAX_STEPS = 1_000_000
+TIMEOUT = 10.0
+
+ID = Abstraction(Variable(1))
+TRUE = Abstraction(Abstraction(Variable(2)))
+# λp.λz.z p p
+PAIR = Abstraction(Abstraction(apply(Variable(1), Variable(2), Variable(2))))
+
+
+def powers(k: int) -> Expression:
+    """2^2^...^2 (k twos) applied to I and TRUE, which reduces to TRUE."""
+    return apply(*[numeral(2)] * k, ID, TRUE)
+
+
+def repeated(n: int) -> Expression:
+    """Applies λy.(2^8 I TRUE) y n times, where the expensive part of the body
+    doesn't depend on y."""
+    heavy = apply(numeral(8), numeral(2), ID, TRUE)
+    return apply(numeral(n), Abstraction(Application(heavy, Variable(1))), ID)
+
+
+def nested_pairs(k: int) -> Expression:
+    """k nested pairs, each holding two copies of the one inside it, so the normal
+    form has 2^k leaves."""
+    return apply(numeral(k), PAIR, ID)
+
+
+FAMILIES: dict[str, tuple[Callable[[int], Expression], list[int]]] = {
+    "powers": (powers, [2, 3, 4]),
+    "repeated": (repeated, [1, 4, 16, 64]),
+    "nested pairs": (nested_pairs, [4, 8, 12, 16]),
+}
+
+EVALUATORS: dict[str, Callable[[Expression], Reduction]] = {
+    "reduce (normal order)": lambda e: reduce(e, max_steps=MAX_STEPS, timeout=TIMEOUT),
+    "machine (by need)": lambda e: evaluate(
+        e, Mode.NEED, max_steps=MAX_STEPS, timeout=TIMEOUT
+    ),
+    "graph": lambda e: graph.evaluate(e, max_steps=MAX_STEPS, timeout=TIMEOUT),
+}
+
+
+def main():
+    print(f"{'case':<16} {'evaluator':<24} {'steps':>10} {'seconds':>10}")
+    for family, (make, sizes) in FAMILIES.items():
+        for size in sizes:
+            case = f"{family} {size}"
+            expression = make(size)
+            want = None
+            for name, evaluator in EVALUATORS.items():
+                start = time.perf_counter()
+                result = evaluator(expression)
+                elapsed = time.perf_counter() - start
+                if result.normal_form:
+                    if want is None:
+                        want = result.expression
+                    assert result.expression == want, f"{name} disagrees on {case}"
+                    steps = f"{result.steps}"
+                else:
+                    steps = f">{result.steps}"
+                print(f"{case:<16} {name:<24} {steps:>10} {elapsed:>10.4f}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
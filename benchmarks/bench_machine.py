@@ -0,0 +1,55 @@
+"""Compares the abstract machine against the substitution-based reducer.
+
+Usage: python benchmarks/bench_machine.py
+"""
+
+import time
+from typing import Callable
+
+from families import apply
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.church import numeral
+from lambda_calc.machine import Mode, evaluate
+from lambda_calc.reduction import Reduction, reduce
+
+MULT = Abstraction(
+    Abstraction(
+        Abstraction(Application(Variable(3), Application(Variable(2), Variable(1))))
+    )
+)
+
+
+CASES: dict[str, Expression] = {
+    "mult 8 8": apply(MULT, numeral(8), numeral(8)),
+    "mult 20 20": apply(MULT, numeral(20), numeral(20)),
+    "2^6": apply(numeral(6), numeral(2)),
+    "3^4": apply(numeral(4), numeral(3)),
+    "2^8": apply(numeral(8), numeral(2)),
+}
+
+EVALUATORS: dict[str, Callable[[Expression], Reduction]] = {
+    "reduce (normal order)": reduce,
+    "machine (by name)": lambda e: evaluate(e, Mode.NAME),
+    "machine (by need)": lambda e: evaluate(e, Mode.NEED),
+}
+
+
+def main():
+    print(f"{'case':<12} {'evaluator':<24} {'steps':>10} {'seconds':>10}")
+    for case, expression in CASES.items():
+        want = None
+        for name, evaluator in EVALUATORS.items():
+            start = time.perf_counter()
+            result = evaluator(expression)
+            elapsed = time.perf_counter() - start
+            assert result.normal_form
+            if want is None:
+                want = result.expression
+            assert result.expression == want, f"{name} disagrees on {case}"
+            print(f"{case:<12} {name:<24} {result.steps:>10} {elapsed:>10.4f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Times each stage of parsing on wide, deeply nested terms.
+
+Usage: python benchmarks/bench_parse_area.py
+"""
+
+import time
+
+from families import comb, spine, tree
+
+from lambda_calc.ast import Expression
+from lambda_calc.parser import parse_tokens, tokenize_diagram, walk_diagram
+from lambda_calc.render import render_diagram
+
+CASES: dict[str, Expression] = {
+    "tree 8": tree(8),
+    "tree 10": tree(10),
+    "tree 12": tree(12),
+    "comb 300": comb(300),
+    "comb 1000": comb(1000),
+    "spine 2000": spine(2000),
+}
+
+
+def main():
+    print(f"{'case':<12} {'size':>12} {'walk':>10} {'tokenize':>10} {'parse area':>10}")
+    for case, expression in CASES.items():
+        diagram = render_diagram(expression)
+
+        start = time.perf_counter()
+        walk = walk_diagram(diagram)
+        walked = time.perf_counter()
+        tokens = tokenize_diagram(walk)
+        tokenized = time.perf_counter()
+        result = parse_tokens(walk, tokens)
+        parsed = time.perf_counter()
+
+        assert result == expression, f"wrong result for {case}"
+        size = f"{diagram.width}x{diagram.height}"
+        print(
+            f"{case:<12} {size:>12} {walked - start:>10.4f} "
+            f"{tokenized - walked:>10.4f} {parsed - tokenized:>10.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
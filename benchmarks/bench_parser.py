@@ -0,0 +1,163 @@
+"""Measures how each stage of parsing scales on generated diagrams, and compares the
+results against a stored baseline.
+
+Usage: python benchmarks/bench_parser.py [--quick] [--save] [--tolerance 0.5]
+
+Each stage reports its best time over a few runs, its throughput (pixels per second
+for the diagram stages, nodes per second for printing) and the peak memory it
+allocated. Timings are compared against `baseline.json`, and the exit code is 1 if
+any stage got slower or hungrier by more than the tolerance. Baselines only make
+sense on the machine that recorded them, so rerun with `--save` after changing
+machines or after an intended change in performance.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from families import FAMILIES
+
+from lambda_calc.ast import Abstraction, Application, Expression, display_with_names
+from lambda_calc.parser import parse_tokens, tokenize_diagram, walk_diagram
+from lambda_calc.render import render_diagram
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+# small and large size for each family
+CASES: dict[str, tuple[int, int]] = {
+    "church": (100, 400),
+    "sk": (8, 12),
+    "spine": (100, 300),
+    "tree": (8, 11),
+    "comb": (100, 200),
+    "random": (300, 1500),
+}
+
+
+def count_nodes(expression: Expression) -> int:
+    count = 0
+    stack = [expression]
+    while stack:
+        count += 1
+        match stack.pop():
+            case Abstraction(body=body):
+                stack.append(body)
+            case Application(function=function, argument=argument):
+                stack += [function, argument]
+            case _:
+                pass
+    return count
+
+
+def measure(stage: Callable[[], Any], repeat: int) -> tuple[float, int, Any]:
+    """Returns the best time of `repeat` runs, the peak memory of one run, and the
+    result of the stage."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = stage()
+        best = min(best, time.perf_counter() - start)
+
+    # tracing slows everything down, so measure memory in a separate run
+    tracemalloc.start()
+    stage()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak, result
+
+
+def run_case(family: str, size: int, repeat: int) -> dict[str, dict[str, float]]:
+    expression = FAMILIES[family](size)
+    nodes = count_nodes(expression)
+
+    results = dict[str, dict[str, float]]()
+
+    def record(stage: str, fn: Callable[[], Any], units: int) -> Any:
+        seconds, peak, result = measure(fn, repeat)
+        results[stage] = {
+            "seconds": seconds,
+            "throughput": units / seconds if seconds else float("inf"),
+            "peak": peak,
+        }
+        return result
+
+    diagram = record("render", lambda: render_diagram(expression), nodes)
+    pixels = diagram.width * diagram.height
+    walk = record("walk", lambda: walk_diagram(diagram), pixels)
+    tokens = record("tokenize", lambda: tokenize_diagram(walk), pixels)
+    parsed = record(
+        "parse",
+        lambda: parse_tokens(walk, tokens),
+        pixels,
+    )
+    assert parsed == expression, f"{family} {size} didn't round trip"
+    record("display", lambda: display_with_names(expression), nodes)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--quick", action="store_true", help="only run the small size of each family"
+    )
+    parser.add_argument("--save", action="store_true", help="overwrite the baseline")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="allowed relative slowdown before a stage counts as a regression",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    args = parser.parse_args()
+
+    baseline: dict[str, dict[str, dict[str, float]]] = (
+        json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    )
+    cases = [
+        (family, size)
+        for family, sizes in CASES.items()
+        for size in (sizes[:1] if args.quick else sizes)
+    ]
+
+    print(
+        f"{'case':<14} {'stage':<10} {'seconds':>10} {'throughput/s':>14} "
+        f"{'peak KiB':>10} {'vs baseline':>12}"
+    )
+    current = dict[str, dict[str, dict[str, float]]]()
+    regressions = list[str]()
+    for family, size in cases:
+        case = f"{family} {size}"
+        current[case] = run_case(family, size, args.repeat)
+        for stage, result in current[case].items():
+            comparison = ""
+            if (old := baseline.get(case, {}).get(stage)) is not None:
+                ratio = result["seconds"] / old["seconds"]
+                comparison = f"{ratio:.2f}x"
+                limit = 1 + args.tolerance
+                if ratio > limit or result["peak"] > old["peak"] * limit:
+                    comparison += " !"
+                    regressions.append(f"{case} {stage}")
+            print(
+                f"{case:<14} {stage:<10} {result['seconds']:>10.4f} "
+                f"{result['throughput']:>14.3g} {result['peak'] / 1024:>10.0f} "
+                f"{comparison:>12}"
+            )
+        print()
+
+    if args.save:
+        args.baseline.write_text(json.dumps(baseline | current, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+    elif regressions:
+        print(f"Regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
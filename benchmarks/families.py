@@ -0,0 +1,101 @@
+"""Generators for families of terms whose size is set by a parameter."""
+
+import random
+
+from lambda_calc import blc
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.church import numeral
+
+S = Abstraction(
+    Abstraction(
+        Abstraction(
+            Application(
+                Application(Variable(3), Variable(1)),
+                Application(Variable(2), Variable(1)),
+            )
+        )
+    )
+)
+K = Abstraction(Abstraction(Variable(2)))
+
+
+def apply(function: Expression, *arguments: Expression) -> Expression:
+    for argument in arguments:
+        function = Application(function, argument)
+    return function
+
+
+def sk(depth: int) -> Expression:
+    """Complete binary tree of applications of S and K, `depth` levels deep."""
+    expression: Expression = apply(S, K)
+    for level in range(depth):
+        expression = (
+            apply(expression, expression) if level % 2 else apply(S, expression, K)
+        )
+    return expression
+
+
+def spine(length: int) -> Expression:
+    """λx.x x x ... x, a long chain of applications."""
+    expression: Expression = Variable(1)
+    for _ in range(length):
+        expression = Application(expression, Variable(1))
+    return Abstraction(expression)
+
+
+def tree(depth: int) -> Expression:
+    """λ.(λ.(...) (λ.(...))) (λ.(...) (λ.(...))), a complete binary tree of
+    applications with an abstraction at every node."""
+    expression: Expression = Abstraction(Variable(1))
+    for _ in range(depth):
+        expression = Abstraction(Application(expression, expression))
+    return expression
+
+
+def comb(depth: int) -> Expression:
+    """λf.f (λx.f (λx.f ... (λx.x))), with each level further right and lower."""
+    expression: Expression = Abstraction(Variable(1))
+    for level in range(depth):
+        expression = Application(Variable(depth - level), expression)
+        if level < depth - 1:
+            expression = Abstraction(expression)
+    return Abstraction(expression)
+
+
+def random_term(size: int, seed: int = 0) -> Expression:
+    """Random closed term with about `size` nodes."""
+    rng = random.Random(seed)
+    bits = list[str]()
+    nodes = 0
+    # depth of each subterm that still needs to be generated
+    holes = [0]
+    while holes:
+        depth = holes.pop()
+        nodes += 1
+        # grow until the size is reached, then close every hole with a variable
+        # the last open hole can't be a variable yet, or the term would end early
+        if nodes + len(holes) >= size:
+            roll = 1
+        elif holes:
+            roll = rng.random()
+        else:
+            roll = 0.8 * rng.random()
+        if depth == 0 or roll < 0.3:
+            bits.append("00")
+            holes.append(depth + 1)
+        elif roll < 0.8:
+            bits.append("01")
+            holes += [depth, depth]
+        else:
+            bits.append("1" * rng.randint(1, depth) + "0")
+    return blc.decode_bits("".join(bits))
+
+
+FAMILIES = {
+    "church": numeral,
+    "sk": sk,
+    "spine": spine,
+    "tree": tree,
+    "comb": comb,
+    "random": random_term,
+}
@@ -0,0 +1,5 @@
+import sys
+
+from lambda_calc.cli import main
+
+sys.exit(main())
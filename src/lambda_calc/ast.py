@@ -3,27 +3,104 @@ from __future__ import annotations
 from abc import ABC
 from dataclasses import dataclass
 from string import ascii_lowercase
+from typing import Self, cast
+from weakref import ref
 
 
 class BaseExpression(ABC):
-    pass
+    """Base class for interned, immutable expression nodes.
 
+    Constructing a node returns the existing node if a structurally equal one is
+    still alive, so equality and hashing are by identity, and both are O(1).
+    """
 
-@dataclass
+    __slots__ = ()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo: object):
+        return self
+
+
+class _Ref(ref[BaseExpression]):
+    __slots__ = ("key",)
+    key: int
+
+
+def _forget(node_ref: _Ref):
+    # an equal node may have been interned again since this one died
+    if _interned.get(node_ref.key) is node_ref:
+        del _interned[node_ref.key]
+
+
+# live nodes, keyed by node type in the low two bits, and above them the ids of the
+# node's fields (which fit in 64 bits) or the index of a variable
+# children are interned too, so equal ids means structurally equal children, and a
+# node keeps its children (and so their ids) alive for as long as it's alive
+# int keys, and weakrefs that share one callback, keep the objects allocated per
+# node, which the garbage collector has to scan, to a minimum
+_interned = dict[int, _Ref]()
+
+_set = object.__setattr__
+
+
+@dataclass(frozen=True, slots=True, eq=False, init=False, weakref_slot=True)
 class Abstraction(BaseExpression):
     body: Expression
 
+    def __new__(cls, body: Expression) -> Self:
+        key = id(body) << 2
+        if (node_ref := _interned.get(key)) is None or (node := node_ref()) is None:
+            node = object.__new__(cls)
+            _set(node, "body", body)
+            node_ref = _Ref(node, _forget)
+            node_ref.key = key
+            _interned[key] = node_ref
+        # the key includes the node type, so an existing node is an instance of cls
+        return cast(Self, node)
 
-@dataclass
+    def __reduce__(self):
+        return Abstraction, (self.body,)
+
+
+@dataclass(frozen=True, slots=True, eq=False, init=False, weakref_slot=True)
 class Application(BaseExpression):
     function: Expression
     argument: Expression
 
+    def __new__(cls, function: Expression, argument: Expression) -> Self:
+        key = id(function) << 66 | id(argument) << 2 | 1
+        if (node_ref := _interned.get(key)) is None or (node := node_ref()) is None:
+            node = object.__new__(cls)
+            _set(node, "function", function)
+            _set(node, "argument", argument)
+            node_ref = _Ref(node, _forget)
+            node_ref.key = key
+            _interned[key] = node_ref
+        return cast(Self, node)
+
+    def __reduce__(self):
+        return Application, (self.function, self.argument)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True, eq=False, init=False, weakref_slot=True)
 class Variable(BaseExpression):
     index: int
 
+    def __new__(cls, index: int) -> Self:
+        key = index << 2 | 2
+        if (node_ref := _interned.get(key)) is None or (node := node_ref()) is None:
+            node = object.__new__(cls)
+            _set(node, "index", index)
+            node_ref = _Ref(node, _forget)
+            node_ref.key = key
+            _interned[key] = node_ref
+        return cast(Self, node)
+
+    def __reduce__(self):
+        return Variable, (self.index,)
+
 
 type Expression = Abstraction | Application | Variable
 
@@ -33,14 +110,16 @@ def display_with_names(
     names: str = ascii_lowercase,
     depth: int = 0,
 ) -> str:
-    match expression:
-        case Abstraction():
-            name = names[depth]
-            body = display_with_names(expression.body, names, depth + 1)
-            return f"(λ{name}.{body})"
-        case Application():
-            function = display_with_names(expression.function, names, depth)
-            argument = display_with_names(expression.argument, names, depth)
-            return f"({function}{argument})"
-        case Variable():
-            return names[depth - expression.index]
+    """Formats the expression with every abstraction and application in
+    parentheses, naming variables with `printer.variable_name`."""
+    from lambda_calc.printer import format_expression
+
+    return format_expression(expression, names=names, depth=depth)
+
+
+def display_de_bruijn(expression: Expression) -> str:
+    """Formats the expression with de Bruijn indices instead of names, in a form
+    that `text.parse_term` can read back."""
+    from lambda_calc.printer import format_expression
+
+    return format_expression(expression, de_bruijn=True)
@@ -0,0 +1,182 @@
+"""Parses, and optionally reduces, many diagrams in parallel across a process pool.
+
+Diagrams are sent to workers packed one bit per pixel (`LambdaDiagram.to_bytes`),
+and parsed terms come back BLC-encoded, so neither direction pickles object trees.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+
+from lambda_calc import blc
+from lambda_calc.ast import Expression
+from lambda_calc.diagram import LambdaDiagram
+from lambda_calc.parser import parse_diagram
+from lambda_calc.stats import ParseStats
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from lambda_calc.reduction import Reduction
+
+
+@dataclass
+class BatchResult:
+    index: int
+    """Position of the diagram in the input."""
+    expression: Expression | None
+    error: Exception | None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class NoNormalForm(ValueError):
+    """Reduction gave up before reaching a normal form."""
+
+    def __init__(self, steps: int):
+        super().__init__(f"no normal form after {steps} steps")
+        self.steps = steps
+
+    def __reduce__(self):
+        return NoNormalForm, (self.steps,)
+
+
+def parse_diagrams(
+    diagrams: Iterable[LambdaDiagram],
+    *,
+    jobs: int | None = None,
+    chunksize: int = 16,
+    ordered: bool = True,
+    stats: ParseStats | None = None,
+    reduce: Callable[[Expression], Reduction] | None = None,
+) -> Iterator[BatchResult]:
+    """Parses each diagram, yielding results as they become available.
+
+    Diagrams are dispatched to `jobs` worker processes (default: one per CPU) in
+    chunks of `chunksize`. Only a few chunks per worker are in flight at once, so
+    `diagrams` may be a lazy stream of any length. If `ordered` is False, results are
+    yielded as soon as their chunk finishes instead of in input order.
+
+    A diagram that fails to parse doesn't stop the batch; its result holds the
+    error instead.
+
+    If `stats` is given, each worker collects its own, and they're added to it as
+    chunks come back.
+
+    If `reduce` is given, each term is replaced by its normal form, computed in the
+    worker that parsed it. It's sent to the workers, so it has to be picklable, like
+    a module-level function or a `functools.partial` of one. A term that it doesn't
+    fully reduce gets a `NoNormalForm` error.
+    """
+    jobs = jobs or os.cpu_count() or 1
+
+    if jobs == 1:
+        # nothing to send anywhere, so skip packing
+        for index, diagram in enumerate(diagrams):
+            try:
+                expression = _process(diagram, stats, reduce)
+            except Exception as e:
+                yield BatchResult(index, None, e)
+            else:
+                yield BatchResult(index, expression, None)
+        return
+
+    # the pool is slow to import, and not needed for a single job
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunks = _chunks(enumerate(diagrams), chunksize)
+    with ProcessPoolExecutor(jobs) as executor:
+        in_flight: list[Future[_PackedChunk]] = []
+        for chunk in chunks:
+            chunk_stats = None if stats is None else ParseStats()
+            in_flight.append(executor.submit(_parse_chunk, chunk, chunk_stats, reduce))
+            while len(in_flight) >= 2 * jobs:
+                yield from _collect(in_flight, ordered, stats)
+        while in_flight:
+            yield from _collect(in_flight, ordered, stats)
+
+
+# (index, BLC-encoded expression, error)
+type _PackedResult = tuple[int, bytes | None, Exception | None]
+type _PackedChunk = tuple[list[_PackedResult], ParseStats | None]
+
+
+def _chunks(
+    diagrams: Iterable[tuple[int, LambdaDiagram]],
+    size: int,
+) -> Iterator[list[tuple[int, bytes]]]:
+    iterator = iter(diagrams)
+    while chunk := [
+        (index, diagram.to_bytes())
+        for index, diagram in itertools.islice(iterator, size)
+    ]:
+        yield chunk
+
+
+def _process(
+    diagram: LambdaDiagram,
+    stats: ParseStats | None,
+    reduce: Callable[[Expression], Reduction] | None,
+) -> Expression:
+    expression = parse_diagram(diagram, stats=stats)
+    if reduce is None:
+        return expression
+
+    if stats is None:
+        reduction = reduce(expression)
+    else:
+        with stats.measure(stats.reduce):
+            reduction = reduce(expression)
+    if not reduction.normal_form:
+        raise NoNormalForm(reduction.steps)
+    return reduction.expression
+
+
+def _parse_chunk(
+    chunk: list[tuple[int, bytes]],
+    stats: ParseStats | None = None,
+    reduce: Callable[[Expression], Reduction] | None = None,
+) -> _PackedChunk:
+    results = list[_PackedResult]()
+    for index, data in chunk:
+        try:
+            expression = _process(LambdaDiagram.from_bytes(data), stats, reduce)
+        except Exception as e:
+            results.append((index, None, e))
+        else:
+            results.append((index, blc.encode(expression), None))
+    return results, stats
+
+
+def _collect(
+    in_flight: list[Future[_PackedChunk]],
+    ordered: bool,
+    stats: ParseStats | None,
+) -> Iterator[BatchResult]:
+    """Waits for at least one chunk to finish, removes it from `in_flight`, and
+    yields its results."""
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    if ordered:
+        done = [in_flight.pop(0)]
+    else:
+        finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        done = [future for future in in_flight if future in finished]
+        in_flight[:] = [future for future in in_flight if future not in finished]
+
+    for future in done:
+        results, chunk_stats = future.result()
+        if stats is not None and chunk_stats is not None:
+            stats.add(chunk_stats)
+        yield from _decode_results(results)
+
+
+def _decode_results(results: list[_PackedResult]) -> Iterator[BatchResult]:
+    for index, data, error in results:
+        expression = None if data is None else blc.decode(data)
+        yield BatchResult(index, expression, error)
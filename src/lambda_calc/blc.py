@@ -0,0 +1,177 @@
+"""Binary Lambda Calculus encoding.
+
+Each term is written as a prefix code: `00` then the body for an abstraction, `01`
+then the function and argument for an application, and `1` repeated `index` times
+then `0` for a variable. Bits are packed into bytes most significant bit first, and
+the last byte is padded with zeros.
+
+Several terms can be written back to back in one bitstream. The zeros that pad out
+the last byte can't be mistaken for a term, since no complete term is all zeros.
+"""
+
+from __future__ import annotations
+
+from typing import BinaryIO, Iterable, Iterator
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+
+
+def encode(expression: Expression) -> bytes:
+    return _pack(encode_bits(expression))[0]
+
+
+def decode(data: bytes | bytearray | memoryview) -> Expression:
+    """Decodes the first term in `data`, ignoring anything after it."""
+    decoder = _Decoder()
+    for expression in decoder.feed(_unpack(data), limit=1):
+        return expression
+    raise ValueError("Unexpected end of data in the middle of a term")
+
+
+def encode_bits(expression: Expression) -> str:
+    """Returns the encoding of `expression` as a string of `0` and `1` characters."""
+    parts = list[str]()
+    stack = [expression]
+    while stack:
+        match stack.pop():
+            case Abstraction(body=body):
+                parts.append("00")
+                stack.append(body)
+            case Application(function=function, argument=argument):
+                parts.append("01")
+                stack += [argument, function]
+            case Variable(index=index):
+                parts.append("1" * index + "0")
+    return "".join(parts)
+
+
+def decode_bits(bits: str) -> Expression:
+    """Decodes a string of `0` and `1` characters, which must hold exactly one
+    term."""
+    decoder = _Decoder()
+    expressions = decoder.feed(bits)
+    if len(expressions) != 1 or decoder.tail:
+        raise ValueError("Expected exactly one term")
+    return expressions[0]
+
+
+def write_terms(expressions: Iterable[Expression], stream: BinaryIO) -> int:
+    """Writes terms back to back as one bitstream, and returns the number of bytes
+    written.
+
+    Each term is written as soon as it's encoded, so `expressions` may be lazy.
+    """
+    written = 0
+    leftover = ""
+    for expression in expressions:
+        data, leftover = _pack(leftover + encode_bits(expression), pad=False)
+        written += stream.write(data)
+    if leftover:
+        written += stream.write(_pack(leftover)[0])
+    return written
+
+
+def read_terms(stream: BinaryIO, chunk_size: int = 1 << 16) -> Iterator[Expression]:
+    """Incrementally decodes all of the terms in a stream.
+
+    At most `chunk_size` bytes are read at a time, so the whole stream never has to
+    be in memory at once.
+    """
+    decoder = _Decoder()
+    while data := stream.read(chunk_size):
+        yield from decoder.feed(_unpack(data))
+
+    decoder.finish()
+
+
+def _pack(bits: str, pad: bool = True) -> tuple[bytes, str]:
+    """Packs whole bytes of `bits`, and returns them with the bits that didn't fill
+    a byte. If `pad` is True, the last byte is padded with zeros instead."""
+    if pad:
+        bits += "0" * (-len(bits) % 8)
+    whole = len(bits) - len(bits) % 8
+    if not whole:
+        return b"", bits
+    # int() and to_bytes() both run in linear time for binary
+    return int(bits[:whole], 2).to_bytes(whole // 8), bits[whole:]
+
+
+def _unpack(data: bytes | bytearray | memoryview) -> str:
+    if not data:
+        return ""
+    return bin(int.from_bytes(data))[2:].zfill(8 * len(data))
+
+
+class _Decoder:
+    """Builds terms from a stream of bits fed in arbitrary chunks."""
+
+    def __init__(self):
+        # incomplete nodes from the root down to the current position
+        # None is an abstraction waiting for its body, and a list is an application
+        # holding whichever of its children are done so far
+        self.pending = list[list[Expression] | None]()
+        # bits at the end of the last chunk that didn't form a whole token yet
+        self.leftover: str = ""
+        # bits since the end of the last complete term, or "1" if there are too many
+        # of them to be padding
+        self.tail: str = ""
+
+    def feed(self, bits: str, limit: int | None = None) -> list[Expression]:
+        """Consumes `bits` and returns the terms completed by them.
+
+        If `limit` is given, stops as soon as that many terms are complete.
+        """
+        chunk = bits
+        bits = self.leftover + bits
+        pending = self.pending
+        completed = list[Expression]()
+        pos = 0
+        end = len(bits)
+        # where the bits after the last complete term start, if one ended here
+        # slicing them off after every term would copy the chunk once per term
+        tail_start = -1
+
+        while pos < end:
+            if bits[pos] == "0":
+                if pos + 1 >= end:
+                    break
+                if bits[pos + 1] == "0":
+                    pending.append(None)
+                else:
+                    pending.append([])
+                pos += 2
+                continue
+
+            stop = bits.find("0", pos)
+            if stop < 0:
+                break
+            value: Expression = Variable(stop - pos)
+            pos = stop + 1
+
+            # pass the finished node up to its incomplete parents
+            while pending:
+                parent = pending[-1]
+                if parent is None:
+                    pending.pop()
+                    value = Abstraction(value)
+                elif not parent:
+                    parent.append(value)
+                    break
+                else:
+                    pending.pop()
+                    value = Application(parent[0], value)
+            else:
+                completed.append(value)
+                tail_start = pos
+                if len(completed) == limit:
+                    break
+
+        self.leftover = bits[pos:]
+        tail = self.tail + chunk if tail_start < 0 else bits[tail_start:]
+        self.tail = tail if len(tail) < 8 and "1" not in tail else "1"
+        return completed
+
+    def finish(self):
+        """Checks that everything after the last complete term was padding."""
+        if "1" in self.tail:
+            raise ValueError("Unexpected end of data in the middle of a term")
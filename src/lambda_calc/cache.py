@@ -0,0 +1,95 @@
+"""Content-addressed cache of parsed diagrams.
+
+Diagrams are keyed by a hash of their size and pixels, so two diagrams with the same
+content share an entry no matter where they came from.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+from lambda_calc import blc
+from lambda_calc.ast import Expression
+from lambda_calc.diagram import LambdaDiagram
+
+
+class ParseCache:
+    """In-memory LRU cache of parsed expressions, optionally backed by a directory
+    of BLC-encoded files that persists between runs.
+
+    Pass an instance as the `cache` argument of `parse_diagram` to use it.
+    """
+
+    def __init__(self, maxsize: int | None = 1024, directory: str | Path | None = None):
+        """If `maxsize` is None, the in-memory cache is unbounded."""
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory is not None else None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict[str, Expression]()
+
+    @staticmethod
+    def key(diagram: LambdaDiagram) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(diagram.width.to_bytes(4) + diagram.height.to_bytes(4))
+        for chunk in diagram.chunks():
+            h.update(chunk)
+        return h.hexdigest()
+
+    def get(self, key: str) -> Expression | None:
+        """Returns the expression cached for `key`, or None if there isn't one.
+
+        Entries found on disk are promoted into memory.
+        """
+        entries = self._entries
+        if (expression := entries.get(key)) is not None:
+            entries.move_to_end(key)
+            self.hits += 1
+            return expression
+
+        if (path := self._path(key)) is not None and path.is_file():
+            expression = blc.decode(path.read_bytes())
+            self._remember(key, expression)
+            self.hits += 1
+            return expression
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, expression: Expression):
+        self._remember(key, expression)
+        if (path := self._path(key)) is not None and not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write to a temporary file first, so concurrent readers never see a
+            # partially written entry
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(blc.encode(expression))
+            os.replace(tmp, path)
+
+    def clear(self):
+        """Empties the in-memory cache and resets the counters. The on-disk store is
+        left alone."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, key: str, expression: Expression):
+        entries = self._entries
+        entries[key] = expression
+        entries.move_to_end(key)
+        if self.maxsize is not None:
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+
+    def _path(self, key: str) -> Path | None:
+        if self.directory is None:
+            return None
+        return self.directory / key[:2] / f"{key}.blc"
@@ -0,0 +1,312 @@
+"""Church encodings of numbers, booleans and pairs.
+
+`as_numeral`, `as_boolean` and `as_pair` recognize encoded values in normal form, in
+time linear in the size of the term. `evaluate` is a normal order reducer that
+computes the arithmetic combinators below with Python integers instead of by beta
+reduction, wherever they're applied to numerals.
+"""
+
+from __future__ import annotations
+
+import operator
+import time
+from typing import Callable
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.reduction import (
+    ExpressionPath,
+    Reduction,
+    find_outermost_redex,
+    rebuild,
+    shift,
+    substitute,
+)
+
+
+def _apply(function: Expression, *arguments: Expression) -> Expression:
+    for argument in arguments:
+        function = Application(function, argument)
+    return function
+
+
+def _abstract(count: int, body: Expression) -> Expression:
+    for _ in range(count):
+        body = Abstraction(body)
+    return body
+
+
+SUCC = _abstract(
+    3, Application(Variable(2), _apply(Variable(3), Variable(2), Variable(1)))
+)
+"""λn.λf.λx.f (n f x)"""
+SUCC_ALT = _abstract(
+    3, _apply(Variable(3), Variable(2), Application(Variable(2), Variable(1)))
+)
+"""λn.λf.λx.n f (f x)"""
+PLUS = _abstract(
+    4, _apply(Variable(4), Variable(2), _apply(Variable(3), Variable(2), Variable(1)))
+)
+"""λm.λn.λf.λx.m f (n f x)"""
+MULT = _abstract(3, Application(Variable(3), Application(Variable(2), Variable(1))))
+"""λm.λn.λf.m (n f)"""
+EXP = _abstract(2, Application(Variable(1), Variable(2)))
+"""λm.λn.n m, which is m to the power of n."""
+PRED = _abstract(
+    3,
+    _apply(
+        Variable(3),
+        _abstract(2, Application(Variable(1), Application(Variable(2), Variable(4)))),
+        Abstraction(Variable(2)),
+        Abstraction(Variable(1)),
+    ),
+)
+"""λn.λf.λx.n (λg.λh.h (g f)) (λu.x) (λu.u)"""
+
+TRUE = _abstract(2, Variable(2))
+FALSE = _abstract(2, Variable(1))
+
+
+# larger results are left to beta reduction, so one native step can't build a term
+# too big to fit in memory
+_MAX_NUMERAL = 1 << 16
+
+
+def _power(base: int, exponent: int) -> int | None:
+    # n applied to m is m^n, but 0 applied to m is λx.x, which isn't a numeral
+    if not exponent:
+        return None
+    # don't compute huge powers only to throw them away
+    if base > 1 and exponent >= _MAX_NUMERAL.bit_length():
+        return None
+    return base**exponent
+
+
+# native version of each combinator
+# an operation can return None if its result isn't a numeral
+_UNARY: dict[Expression, Callable[[int], int]] = {
+    SUCC: lambda n: n + 1,
+    SUCC_ALT: lambda n: n + 1,
+    PRED: lambda n: max(n - 1, 0),
+}
+_BINARY: dict[Expression, Callable[[int, int], int | None]] = {
+    PLUS: operator.add,
+    MULT: operator.mul,
+    EXP: _power,
+}
+
+
+def _needed(
+    head: Expression, exponent: int | None, values: list[int | None]
+) -> list[bool]:
+    """Returns whether the result can only have a normal form if each argument does,
+    given the values of the arguments that are already numerals."""
+    if exponent is not None:
+        # 0 discards its argument
+        return [exponent != 0]
+    if head == MULT:
+        # 0 times anything is 0
+        return [True, bool(values[0])]
+    if head == EXP:
+        # anything to the power of 0 is λx.x
+        return [bool(values[1]), True]
+    return [True] * len(values)
+
+
+def numeral(n: int) -> Expression:
+    """Returns λf.λx.f (f ... (f x)), with `n` applications of f."""
+    if n < 0:
+        raise ValueError(f"Expected a non-negative number, but got {n}")
+    body: Expression = Variable(1)
+    for _ in range(n):
+        body = Application(Variable(2), body)
+    return Abstraction(Abstraction(body))
+
+
+def boolean(value: bool) -> Expression:
+    return TRUE if value else FALSE
+
+
+def pair(first: Expression, second: Expression) -> Expression:
+    """Returns λz.z first second."""
+    return Abstraction(_apply(Variable(1), shift(first, 1), shift(second, 1)))
+
+
+def as_numeral(expression: Expression) -> int | None:
+    """Returns the number encoded by a Church numeral in normal form, or None if
+    `expression` isn't one."""
+    match expression:
+        case Abstraction(body=Abstraction(body=body)):
+            pass
+        case _:
+            return None
+
+    n = 0
+    while True:
+        match body:
+            case Application(function=Variable(index=2), argument=argument):
+                n += 1
+                body = argument
+            case Variable(index=1):
+                return n
+            case _:
+                return None
+
+
+def as_boolean(expression: Expression) -> bool | None:
+    """Returns the value of a Church boolean, or None if `expression` isn't one.
+
+    False is encoded the same way as the numeral 0.
+    """
+    if expression == TRUE:
+        return True
+    if expression == FALSE:
+        return False
+    return None
+
+
+def as_pair(expression: Expression) -> tuple[Expression, Expression] | None:
+    """Returns the two halves of a Church pair, or None if `expression` isn't
+    one."""
+    match expression:
+        case Abstraction(
+            body=Application(
+                function=Application(function=Variable(index=1), argument=first),
+                argument=second,
+            )
+        ) if not _uses_variable(first) and not _uses_variable(second):
+            return shift(first, -1), shift(second, -1)
+        case _:
+            return None
+
+
+def _uses_variable(expression: Expression) -> bool:
+    """Returns True if the variable bound just outside `expression` occurs in it."""
+    stack = [(expression, 1)]
+    while stack:
+        match stack.pop():
+            case Abstraction(body=body), index:
+                stack.append((body, index + 1))
+            case Application(function=function, argument=argument), index:
+                stack += [(function, index), (argument, index)]
+            case Variable(index=found), index if found == index:
+                return True
+            case _:
+                pass
+    return False
+
+
+def evaluate(
+    expression: Expression,
+    *,
+    max_steps: int | None = None,
+    timeout: float | None = None,
+) -> Reduction:
+    """Reduces `expression` to its normal form in normal order, but computes
+    arithmetic on Church numerals natively.
+
+    When the head of the next redex is `SUCC`, `PLUS`, `MULT`, `EXP`, `PRED` or a
+    numeral, and it's applied to numerals, the whole application is replaced by the
+    numeral of the result, which counts as one step. Arguments that aren't numerals
+    yet are reduced first, but only if the result couldn't have a normal form
+    without theirs, so `MULT 0 Ω` and `FALSE Ω I` (`FALSE` is the numeral 0) are
+    reduced like `reduce` would. Otherwise, and for results bigger than 65536, the
+    redex is contracted as usual.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    numbers = dict[Expression, int | None]()
+    steps = 0
+
+    while True:
+        if max_steps is not None and steps >= max_steps:
+            return Reduction(expression, steps, normal_form=False)
+        if deadline is not None and time.monotonic() >= deadline:
+            return Reduction(expression, steps, normal_form=False)
+
+        reduced = _step(expression, numbers)
+        if reduced is None:
+            return Reduction(expression, steps, normal_form=True)
+
+        expression = reduced
+        steps += 1
+
+
+def _step(expression: Expression, numbers: dict[Expression, int | None]):
+    """Contracts one redex or does one native operation, or returns None if
+    `expression` is in normal form."""
+
+    def number(expression: Expression) -> int | None:
+        if expression not in numbers:
+            numbers[expression] = as_numeral(expression)
+        return numbers[expression]
+
+    # paths to the arguments being reduced first, outermost first
+    outer = list[ExpressionPath]()
+    target = expression
+
+    while True:
+        found = find_outermost_redex(target)
+        if found is None:
+            # arguments are only reduced first if they have a redex
+            assert not outer
+            return None
+        redex, path = found
+        assert isinstance(redex.function, Abstraction)
+
+        # the rest of the spine the redex is at the top of
+        head = redex.function
+        spine = [(redex, path)]
+        while path is not None and isinstance(path[0], Application) and path[1] == 0:
+            spine.append((path[0], path[2]))
+            path = path[2]
+
+        unary = binary = exponent = None
+        if (unary := _UNARY.get(head)) is not None:
+            arity = 1
+        elif (binary := _BINARY.get(head)) is not None:
+            arity = 2
+        elif (exponent := number(head)) is not None:
+            arity = 1
+        else:
+            arity = 0
+
+        result = None
+        if arity and len(spine) >= arity:
+            arguments = [node.argument for node, _ in spine[:arity]]
+            values = [number(argument) for argument in arguments]
+            known = [value for value in values if value is not None]
+
+            if len(known) == arity:
+                if unary is not None:
+                    value = unary(known[0])
+                elif binary is not None:
+                    value = binary(known[0], known[1])
+                else:
+                    assert exponent is not None
+                    value = _power(known[0], exponent)
+                if value is not None and value <= _MAX_NUMERAL:
+                    result = rebuild(numeral(value), spine[arity - 1][1])
+            else:
+                needed = _needed(head, exponent, values)
+                pending = next(
+                    (
+                        i
+                        for i, argument in enumerate(arguments)
+                        if values[i] is None
+                        and needed[i]
+                        and find_outermost_redex(argument) is not None
+                    ),
+                    None,
+                )
+                if pending is not None:
+                    # reduce that argument first
+                    node, node_path = spine[pending]
+                    outer.append((node, 1, node_path))
+                    target = arguments[pending]
+                    continue
+
+        if result is None:
+            result = rebuild(substitute(head.body, redex.argument), spine[0][1])
+
+        for path in reversed(outer):
+            result = rebuild(result, path)
+        return result
@@ -0,0 +1,231 @@
+"""Command line interface, installed as `lambda-calc`.
+
+Diagrams are read one file per argument, or as a stream from stdin, and each result
+is printed as soon as it's ready, so the input never has to fit in memory. Modules
+that only some options need are imported when they're used, to keep startup fast.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import os
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+
+from lambda_calc.ast import Expression, display_de_bruijn, display_with_names
+from lambda_calc.batch import NoNormalForm, parse_diagrams
+from lambda_calc.diagram import LambdaDiagram
+from lambda_calc.stats import ParseStats
+
+if TYPE_CHECKING:
+    from lambda_calc.reduction import Reduction
+
+_IMAGE_SUFFIXES = {".pbm", ".pgm", ".png"}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="lambda-calc",
+        description=(
+            "Parse lambda diagrams, printing one term per diagram. Diagrams on stdin "
+            "are separated by two or more blank lines."
+        ),
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="text or image (PBM, PGM, PNG) files, or - for stdin (default: stdin)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["names", "de-bruijn", "blc"],
+        default="names",
+        help="how to print each term (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-r",
+        "--reduce",
+        action="store_true",
+        help="print the normal form of each term instead",
+    )
+    parser.add_argument(
+        "--max-steps",
+        type=int,
+        default=None,
+        help="give up reducing a term after this many beta steps",
+    )
+    parser.add_argument(
+        "--native",
+        action="store_true",
+        help="with --reduce, do arithmetic on Church numerals with native integers",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "number of worker processes, which parse and reduce, or 0 for one per CPU "
+            "(default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=16,
+        help="number of diagrams sent to a worker at once (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="print results as soon as they're ready, instead of in input order",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print parse statistics and timings to stderr when done",
+    )
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    stats = ParseStats() if args.stats else None
+    display = _formatter(args.format)
+    files: list[str] = args.files or ["-"]
+    # a plain stream of terms is easier to pipe on, unless the order is lost
+    show_labels = files != ["-"] or args.unordered
+
+    # labels of the diagrams that have been read but not printed yet
+    labels = dict[int, str]()
+    failed = False
+
+    def diagrams() -> Iterator[LambdaDiagram]:
+        nonlocal failed
+        index = 0
+        for label, diagram in _read_inputs(files):
+            if isinstance(diagram, Exception):
+                print(f"{label}: error: {diagram!r}", file=sys.stderr, flush=True)
+                failed = True
+                continue
+            labels[index] = label
+            index += 1
+            yield diagram
+
+    try:
+        for result in parse_diagrams(
+            diagrams(),
+            jobs=args.jobs,
+            chunksize=args.chunksize,
+            ordered=not args.unordered,
+            stats=stats,
+            reduce=_reducer(args.native, args.max_steps) if args.reduce else None,
+        ):
+            label = labels.pop(result.index)
+            expression = result.expression
+            if expression is None:
+                error = result.error
+                message = str(error) if isinstance(error, NoNormalForm) else repr(error)
+                print(f"{label}: error: {message}", file=sys.stderr, flush=True)
+                failed = True
+                continue
+
+            text = display(expression)
+            print(f"{label}: {text}" if show_labels else text, flush=True)
+    except BrokenPipeError:
+        # the reader went away, eg. `| head`, so stop quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+
+    if stats is not None:
+        print(stats.summary(), file=sys.stderr)
+        if args.reduce:
+            print(f"reduce: {stats.reduce.seconds * 1000:.3f} ms", file=sys.stderr)
+        print(
+            f"total: {(time.perf_counter() - start) * 1000:.3f} ms",
+            file=sys.stderr,
+        )
+
+    return 1 if failed else 0
+
+
+def _formatter(name: str) -> Callable[[Expression], str]:
+    match name:
+        case "de-bruijn":
+            return display_de_bruijn
+        case "blc":
+            from lambda_calc.blc import encode_bits
+
+            return encode_bits
+        case _:
+            return display_with_names
+
+
+def _reducer(native: bool, max_steps: int | None) -> Callable[[Expression], Reduction]:
+    if native:
+        from lambda_calc.church import evaluate
+    else:
+        from lambda_calc.machine import evaluate
+
+    # a partial of a module-level function can be sent to worker processes
+    return functools.partial(evaluate, max_steps=max_steps)
+
+
+def _read_inputs(
+    files: list[str],
+) -> Iterator[tuple[str, LambdaDiagram | Exception]]:
+    """Yields a label and the diagram, or the error from loading it, for each
+    input."""
+    for name in files:
+        if name == "-":
+            for line, data in _split_diagrams(sys.stdin):
+                yield f"<stdin>:{line}", _load(lambda: LambdaDiagram.from_str(data))
+            continue
+
+        path = Path(name)
+        if path.suffix.lower() in _IMAGE_SUFFIXES:
+            from lambda_calc.image import read_image
+
+            yield name, _load(lambda: read_image(path))
+        else:
+            yield (
+                name,
+                _load(lambda: LambdaDiagram.from_str(path.read_text(encoding="utf-8"))),
+            )
+
+
+def _load(load: Callable[[], LambdaDiagram]) -> LambdaDiagram | Exception:
+    try:
+        return load()
+    except (OSError, ValueError) as e:
+        return e
+
+
+def _split_diagrams(lines: Iterable[str]) -> Iterator[tuple[int, str]]:
+    """Splits a stream of text into diagrams, and yields the line number each one
+    starts on with its text.
+
+    A single blank line can be part of a diagram, so diagrams are separated by two
+    or more.
+    """
+    diagram = list[str]()
+    start = 0
+    blank = 0
+    for number, line in enumerate(lines, 1):
+        if line.strip():
+            if diagram and blank >= 2:
+                yield start, "".join(diagram)
+                diagram.clear()
+            if not diagram:
+                start = number
+            else:
+                diagram += ["\n"] * blank
+            diagram.append(line)
+            blank = 0
+        else:
+            blank += 1
+    if diagram:
+        yield start, "".join(diagram)
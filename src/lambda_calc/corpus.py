@@ -0,0 +1,275 @@
+"""Content hashes of terms, and an on-disk index of them.
+
+With de Bruijn indices, alpha-equivalent terms are structurally equal, so a Merkle
+hash of the structure identifies a term up to renaming. Each node's digest is
+computed from its children's, so the digests of every subterm come out of one
+bottom-up pass.
+
+Interning already gives equal terms the same object and an O(1) `hash`, but only
+within one process. These digests are stable, and wide enough to use as keys on
+disk.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+
+DIGEST_SIZE = 16
+
+_ABSTRACTION, _APPLICATION, _VARIABLE = range(3)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    hash BLOB PRIMARY KEY,
+    kind INTEGER NOT NULL,
+    first BLOB,
+    second BLOB,
+    variable INTEGER,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS terms (
+    hash BLOB NOT NULL,
+    name TEXT
+);
+CREATE INDEX IF NOT EXISTS terms_hash ON terms (hash);
+"""
+
+# every node reachable from a root, each once
+_SUBTERMS = f"""
+WITH RECURSIVE reachable (hash) AS (
+    SELECT ?
+    UNION
+    SELECT CASE side.i WHEN 0 THEN nodes.first ELSE nodes.second END
+    FROM reachable
+    JOIN nodes ON nodes.hash = reachable.hash
+    JOIN (SELECT 0 AS i UNION ALL SELECT 1) AS side
+    WHERE nodes.kind = {_APPLICATION} OR (nodes.kind = {_ABSTRACTION} AND side.i = 0)
+)
+SELECT nodes.hash, kind, first, second, variable
+FROM nodes JOIN reachable ON nodes.hash = reachable.hash
+"""
+
+# sqlite's default limit on parameters in one statement is 999 on older versions
+_BATCH_SIZE = 500
+
+
+def digest(expression: Expression) -> bytes:
+    """Returns the Merkle hash of `expression`."""
+    return subterm_digests(expression)[expression][0]
+
+
+def subterm_digests(expression: Expression) -> dict[Expression, tuple[bytes, int]]:
+    """Returns the digest and size of every distinct subterm of `expression`, with
+    subterms before the terms that contain them.
+
+    Size counts nodes as if the term were a tree, so shared subterms are counted
+    every time they occur.
+    """
+    results = dict[Expression, tuple[bytes, int]]()
+    stack = [expression]
+
+    # this runs once per node of a whole corpus, so it checks types directly
+    # instead of matching
+    while stack:
+        node = stack[-1]
+        if node in results:
+            stack.pop()
+            continue
+
+        if isinstance(node, Application):
+            function = results.get(node.function)
+            argument = results.get(node.argument)
+            if function is None or argument is None:
+                if function is None:
+                    stack.append(node.function)
+                if argument is None:
+                    stack.append(node.argument)
+                continue
+            results[node] = (
+                _hash(b"\x01" + function[0] + argument[0]),
+                function[1] + argument[1] + 1,
+            )
+        elif isinstance(node, Abstraction):
+            body = results.get(node.body)
+            if body is None:
+                stack.append(node.body)
+                continue
+            results[node] = (_hash(b"\x00" + body[0]), body[1] + 1)
+        else:
+            results[node] = (_hash(b"\x02" + str(node.index).encode()), 1)
+        stack.pop()
+
+    return results
+
+
+def _hash(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+
+class TermIndex:
+    """SQLite index of terms and all of their subterms, keyed by digest.
+
+    Each distinct subterm is stored once, as its kind and the digests of its
+    children, so the index grows with the number of distinct nodes in the corpus
+    rather than the total size of its terms.
+
+    Changes are committed by `commit`, or when the index is used as a context
+    manager and the block exits without an error.
+    """
+
+    def __init__(self, path: str | Path = ":memory:"):
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+
+    def add(self, expression: Expression, name: str | None = None) -> bytes:
+        """Adds a term and all of its subterms, and returns the term's digest."""
+        digests = subterm_digests(expression)
+        rows = list[tuple[bytes, int, bytes | None, bytes | None, int | None, int]]()
+        for node, (key, size) in digests.items():
+            match node:
+                case Abstraction(body=body):
+                    rows.append((key, _ABSTRACTION, digests[body][0], None, None, size))
+                case Application(function=function, argument=argument):
+                    rows.append(
+                        (
+                            key,
+                            _APPLICATION,
+                            digests[function][0],
+                            digests[argument][0],
+                            None,
+                            size,
+                        )
+                    )
+                case Variable(index=index):
+                    rows.append((key, _VARIABLE, None, None, index, size))
+
+        key = digests[expression][0]
+        self._db.executemany(
+            "INSERT OR IGNORE INTO nodes VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+        self._db.execute("INSERT INTO terms VALUES (?, ?)", (key, name))
+        return key
+
+    def add_all(self, expressions: Iterable[tuple[str | None, Expression]]) -> int:
+        """Adds each named term, and returns how many there were."""
+        count = 0
+        for name, expression in expressions:
+            self.add(expression, name)
+            count += 1
+        return count
+
+    def get(self, key: bytes) -> Expression | None:
+        """Returns the term or subterm with the digest `key`, or None if it isn't in
+        the index."""
+        rows = {
+            node_key: (kind, first, second, variable)
+            for node_key, kind, first, second, variable in self._db.execute(
+                _SUBTERMS, (key,)
+            )
+        }
+        if key not in rows:
+            return None
+
+        results = dict[bytes, Expression]()
+        stack = [(key, False)]
+        while stack:
+            node_key, children_done = stack.pop()
+            if node_key in results:
+                continue
+            kind, first, second, variable = rows[node_key]
+            if kind == _VARIABLE:
+                assert variable is not None
+                results[node_key] = Variable(variable)
+            elif not children_done:
+                stack.append((node_key, True))
+                stack += [(child, False) for child in (second, first) if child]
+            elif kind == _ABSTRACTION:
+                assert first is not None
+                results[node_key] = Abstraction(results[first])
+            else:
+                assert first is not None and second is not None
+                results[node_key] = Application(results[first], results[second])
+        return results[key]
+
+    def names(self, expression: Expression) -> list[str | None]:
+        """Returns the name of each time `expression` was added as a whole term."""
+        rows = self._db.execute(
+            "SELECT name FROM terms WHERE hash = ?", (digest(expression),)
+        )
+        return [name for (name,) in rows]
+
+    def find_subterms(
+        self,
+        expression: Expression,
+        *,
+        min_size: int = 1,
+    ) -> Iterator[tuple[Expression, bytes]]:
+        """Yields each distinct largest subterm of `expression` that's already in the
+        index, with its digest, in prefix order. Subterms of those aren't yielded,
+        and neither are subterms smaller than `min_size`."""
+        digests = subterm_digests(expression)
+        candidates = {key for key, size in digests.values() if size >= min_size}
+        known = {key for (key,) in self._fetch("SELECT hash FROM nodes", candidates)}
+
+        seen = set[Expression]()
+        stack = [expression]
+        while stack:
+            node = stack.pop()
+            key, size = digests[node]
+            if size < min_size or node in seen:
+                continue
+            if key in known:
+                seen.add(node)
+                yield node, key
+                continue
+            match node:
+                case Abstraction(body=body):
+                    stack.append(body)
+                case Application(function=function, argument=argument):
+                    stack += [argument, function]
+                case Variable():
+                    pass
+
+    def __contains__(self, expression: Expression) -> bool:
+        """Returns True if `expression` is in the index as a term or subterm."""
+        row = self._db.execute(
+            "SELECT 1 FROM nodes WHERE hash = ?", (digest(expression),)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        """Returns the number of distinct terms and subterms in the index."""
+        (count,) = self._db.execute("SELECT COUNT(*) FROM nodes").fetchone()
+        return count
+
+    def commit(self):
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type: object, exc: object, traceback: object):
+        if exc_type is None:
+            self.commit()
+        self.close()
+
+    def _fetch(self, query: str, keys: Iterable[bytes]) -> list[tuple[bytes]]:
+        """Runs `query`, which selects one column, with a `WHERE hash IN (...)`
+        clause for each batch of `keys`."""
+        rows = list[tuple[bytes]]()
+        iterator = iter(keys)
+        while batch := list(itertools.islice(iterator, _BATCH_SIZE)):
+            placeholders = ", ".join("?" * len(batch))
+            rows += self._db.execute(
+                f"{query} WHERE hash IN ({placeholders})", batch
+            ).fetchall()
+        return rows
@@ -1,12 +1,49 @@
+import struct
 import textwrap
-from typing import Sequence
+from typing import Iterator, Sequence
 
 from lambda_calc.math import Vec2
 
+# tables for `bytes.translate` from the text and bit string forms to pixels
+# any byte other than a space is a set pixel
+TEXT_TO_PIXEL = bytes(0 if i == ord(" ") else 1 for i in range(256))
+BIT_TO_PIXEL = bytes(i - ord("0") if i in b"01" else 0 for i in range(256))
+_PIXEL_TO_TEXT = b" #" + bytes(254)
+_PIXEL_TO_BIT = b"01" + bytes(254)
+
+_HEADER = struct.Struct(">II")
+
 
 class LambdaDiagram:
+    """Binary pixel grid.
+
+    Pixels are stored one byte each (0 or 1) in a flat `bytearray`, row by row, with
+    a fixed stride of `width` bytes. Rows shorter than the widest row are padded with
+    unset pixels.
+    """
+
+    pixels: bytearray
+    width: int
+    height: int
+
     def __init__(self, data: Sequence[Sequence[bool]]):
-        self.data = data
+        width = max((len(row) for row in data), default=0)
+        pixels = bytearray(width * len(data))
+        for y, row in enumerate(data):
+            start = y * width
+            pixels[start : start + len(row)] = bytes(map(bool, row))
+        self._set_pixels(pixels, width, len(data))
+
+    @classmethod
+    def from_pixels(cls, pixels: bytearray, width: int, height: int):
+        """Wraps an existing buffer of `width * height` bytes without copying it."""
+        if len(pixels) != width * height:
+            raise ValueError(
+                f"Expected {width * height} bytes for a {width}x{height} diagram, but got {len(pixels)}"
+            )
+        diagram = cls.__new__(cls)
+        diagram._set_pixels(pixels, width, height)
+        return diagram
 
     @classmethod
     def from_str(cls, data: str):
@@ -15,7 +52,77 @@ class LambdaDiagram:
             raise ValueError("Top left character must not be blank")
         if "\t" in data:
             raise ValueError("Must use spaces, not tabs")
-        return cls([[c != " " for c in line] for line in data.splitlines()])
+
+        lines = data.splitlines()
+        width = max(len(line) for line in lines)
+        pixels = bytearray(width * len(lines))
+        for y, line in enumerate(lines):
+            start = y * width
+            # non-ASCII characters become "?", which keeps one byte per character
+            row = line.encode("ascii", "replace").translate(TEXT_TO_PIXEL)
+            pixels[start : start + len(row)] = row
+        return cls.from_pixels(pixels, width, len(lines))
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        """Inverse of `to_bytes`."""
+        width, height = _HEADER.unpack_from(data)
+        size = width * height
+        packed = data[_HEADER.size :]
+        if len(packed) != (size + 7) // 8:
+            raise ValueError(
+                f"Expected {(size + 7) // 8} bytes of pixels for a {width}x{height} "
+                f"diagram, but got {len(packed)}"
+            )
+        if not size:
+            return cls.from_pixels(bytearray(), width, height)
+        bits = bin(int.from_bytes(packed))[2:].zfill(8 * len(packed))
+        return cls.from_pixels(
+            bytearray(bits[:size].encode().translate(BIT_TO_PIXEL)), width, height
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serializes the diagram compactly: its size, then one bit per pixel."""
+        parts = [_HEADER.pack(self.width, self.height)]
+        bits = b""
+        for chunk in self.chunks():
+            bits += chunk.translate(_PIXEL_TO_BIT)
+            # pack whole bytes, and keep the rest for the next chunk
+            end = len(bits) - len(bits) % 8
+            if end:
+                # int() and to_bytes() both run in linear time for binary
+                parts.append(int(bits[:end], 2).to_bytes(end // 8))
+                bits = bits[end:]
+        if bits:
+            parts.append(int(bits.ljust(8, b"0"), 2).to_bytes(1))
+        return b"".join(parts)
+
+    def _set_pixels(self, pixels: bytearray, width: int, height: int):
+        self.pixels = pixels
+        self.width = width
+        self.height = height
+
+    def get(self, x: int, y: int) -> bool:
+        """Fast path for `diagram[x, y]` with plain integer coordinates."""
+        return (
+            0 <= x < self.width
+            and 0 <= y < self.height
+            and self.pixels[y * self.width + x] != 0
+        )
+
+    def buffer(self) -> bytes | bytearray:
+        """Returns all of the pixels row by row, as `width * height` bytes."""
+        return self.pixels
+
+    def chunks(self) -> Iterator[bytes | bytearray]:
+        """Yields the same bytes as `buffer` in pieces, so they can be processed
+        without holding a copy of every pixel at once."""
+        yield self.pixels
+
+    def row(self, y: int) -> bytes:
+        """Returns the pixels of row `y` as `width` bytes, each 0 or 1."""
+        start = y * self.width
+        return bytes(self.pixels[start : start + self.width])
 
     def __getitem__(self, pos: Vec2 | tuple[int, int]):
         match pos:
@@ -24,15 +131,13 @@ class LambdaDiagram:
             case (x, y):
                 pass
 
-        if not (0 <= y < len(self.data)):
-            return False
-        row = self.data[y]
-        if not (0 <= x < len(row)):
-            return False
-        return row[x]
+        return self.get(x, y)
 
     def __str__(self):
-        return "\n".join("".join("#" if v else " " for v in row) for row in self.data)
+        return "\n".join(
+            self.row(y).translate(_PIXEL_TO_TEXT).decode().rstrip()
+            for y in range(self.height)
+        )
 
     def _ipython_display_(self):
         print(str(self))
@@ -0,0 +1,291 @@
+"""Flat encoding of expressions as parallel arrays.
+
+A `FlatTerm` stores the nodes of a term in prefix order, like BLC: every abstraction
+is followed by its body, and every application by its function and then its
+argument. Each node takes one byte for its tag and four for its value, instead of a
+Python object, and subterms are contiguous slices of the arrays.
+
+Shared subterms of an `Expression` are copied wherever they occur, so a term with a
+lot of sharing can be much bigger in this form.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from string import ascii_lowercase
+from typing import Iterator
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.diagram import LambdaDiagram
+from lambda_calc.parser import (
+    AbstractionToken,
+    ApplicationToken,
+    VariableToken,
+    prefix_tokens,
+    tokenize_diagram,
+    walk_diagram,
+)
+from lambda_calc.printer import variable_name
+
+ABSTRACTION = 0
+APPLICATION = 1
+VARIABLE = 2
+
+_HEADER = struct.Struct(">I")
+
+
+@dataclass
+class FlatTerm:
+    tags: bytearray = field(default_factory=bytearray)
+    """`ABSTRACTION`, `APPLICATION` or `VARIABLE` for each node."""
+    values: array[int] = field(default_factory=lambda: array("i"))
+    """The position of the argument for an application, the de Bruijn index for a
+    variable, and 0 for an abstraction."""
+
+    @classmethod
+    def from_expression(cls, expression: Expression) -> FlatTerm:
+        builder = FlatBuilder()
+        stack = [expression]
+        while stack:
+            match stack.pop():
+                case Abstraction(body=body):
+                    builder.abstraction()
+                    stack.append(body)
+                case Application(function=function, argument=argument):
+                    builder.application()
+                    stack += [argument, function]
+                case Variable(index=index):
+                    builder.variable(index)
+        return builder.build()
+
+    def to_expression(self, start: int = 0) -> Expression:
+        """Converts the subterm at `start` to its object form."""
+        tags = self.tags
+        values = self.values
+        # in reverse prefix order, each node's children are on top of the stack,
+        # function first
+        results = list[Expression]()
+        for i in range(self.end(start) - 1, start - 1, -1):
+            tag = tags[i]
+            if tag == ABSTRACTION:
+                results.append(Abstraction(results.pop()))
+            elif tag == APPLICATION:
+                function = results.pop()
+                results.append(Application(function, results.pop()))
+            else:
+                results.append(Variable(values[i]))
+        return results.pop()
+
+    @classmethod
+    def from_blc(cls, bits: str) -> FlatTerm:
+        """Decodes a string of `0` and `1` characters, which must hold exactly one
+        term."""
+        builder = FlatBuilder()
+        pos = 0
+        end = len(bits)
+        while pos < end and not builder.complete:
+            if bits[pos] == "0":
+                if pos + 1 >= end:
+                    break
+                if bits[pos + 1] == "0":
+                    builder.abstraction()
+                else:
+                    builder.application()
+                pos += 2
+            else:
+                stop = bits.find("0", pos)
+                if stop < 0:
+                    break
+                builder.variable(stop - pos)
+                pos = stop + 1
+        if pos != end:
+            raise ValueError("Expected exactly one term")
+        return builder.build()
+
+    def to_blc(self) -> str:
+        """Returns the BLC encoding of the term as a string of `0` and `1`
+        characters."""
+        codes = ("00", "01")
+        return "".join(
+            codes[tag] if tag != VARIABLE else "1" * index + "0"
+            for tag, index in zip(self.tags, self.values)
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> FlatTerm:
+        (size,) = _HEADER.unpack_from(data)
+        if len(data) != _HEADER.size + 5 * size:
+            raise ValueError(
+                f"Expected {_HEADER.size + 5 * size} bytes for a term of {size} "
+                f"nodes, but got {len(data)}"
+            )
+        tags = bytearray(data[_HEADER.size : _HEADER.size + size])
+        values = array("i", data[_HEADER.size + size :])
+        if sys.byteorder == "little":
+            values.byteswap()
+        return cls(tags, values)
+
+    def to_bytes(self) -> bytes:
+        """Packs the term as its size, then its tags, then its values as big-endian
+        32-bit integers."""
+        values = array("i", self.values)
+        if sys.byteorder == "little":
+            values.byteswap()
+        return _HEADER.pack(len(self)) + self.tags + values.tobytes()
+
+    def end(self, start: int = 0) -> int:
+        """Returns the position just after the subterm at `start`."""
+        tags = self.tags
+        i = start
+        # the last node of a subterm is at the end of its chain of bodies and
+        # arguments
+        while tags[i] != VARIABLE:
+            i = self.values[i] if tags[i] == APPLICATION else i + 1
+        return i + 1
+
+    def subterm(self, start: int) -> FlatTerm:
+        end = self.end(start)
+        values = self.values[start:end]
+        for i, tag in enumerate(self.tags[start:end]):
+            if tag == APPLICATION:
+                values[i] -= start
+        return FlatTerm(self.tags[start:end], values)
+
+    def display(self, names: str = ascii_lowercase) -> str:
+        """Formats the term like `display_with_names`."""
+        tags = self.tags
+        values = self.values
+        parts = list[str]()
+        depth = 0
+        # children still to come for each open node, and whether it's an abstraction
+        open_nodes = list[list[int]]()
+        # name of the variable just written, if nothing has been written after it
+        previous = None
+        level_names = list[str]()
+
+        for tag, value in zip(tags, values):
+            if tag == ABSTRACTION:
+                while len(level_names) <= depth:
+                    level_names.append(variable_name(len(level_names), names))
+                parts.append(f"(λ{level_names[depth]}.")
+                depth += 1
+                open_nodes.append([1, True])
+                previous = None
+                continue
+            if tag == APPLICATION:
+                parts.append("(")
+                open_nodes.append([2, False])
+                previous = None
+                continue
+
+            if depth - value < 0:
+                raise ValueError(
+                    f"Variable with index {value} is free at depth {depth}"
+                )
+            name = level_names[depth - value]
+            # a function and argument that are both variables are only separated if
+            # one of their names is longer than a character
+            if previous is not None and (len(previous) > 1 or len(name) > 1):
+                parts.append(" ")
+            parts.append(name)
+            previous = name
+            # close every node this variable completes
+            while open_nodes:
+                node = open_nodes[-1]
+                node[0] -= 1
+                if node[0]:
+                    break
+                open_nodes.pop()
+                parts.append(")")
+                previous = None
+                if node[1]:
+                    depth -= 1
+
+        return "".join(parts)
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        """Yields the tag and value of each node, in prefix order."""
+        return zip(self.tags, self.values)
+
+    def __len__(self):
+        return len(self.tags)
+
+    def __str__(self):
+        return self.display()
+
+
+class FlatBuilder:
+    """Builds a `FlatTerm` one node at a time, in prefix order.
+
+    Call `abstraction` before the nodes of its body, `application` before the nodes
+    of its function and argument, and `variable` for each leaf.
+    """
+
+    def __init__(self):
+        self.term = FlatTerm()
+        # open nodes, and how many of their children are still to come
+        self._open = list[list[int]]()
+        self._done = False
+
+    @property
+    def complete(self):
+        return self._done
+
+    def abstraction(self):
+        self._add(ABSTRACTION, 0)
+        self._open.append([len(self.term) - 1, 1])
+
+    def application(self):
+        self._add(APPLICATION, 0)
+        self._open.append([len(self.term) - 1, 2])
+
+    def variable(self, index: int):
+        if index < 1:
+            raise ValueError(f"Expected a positive de Bruijn index, but got {index}")
+        self._add(VARIABLE, index)
+        self._close()
+
+    def build(self) -> FlatTerm:
+        if not self._done:
+            raise ValueError("Term is incomplete")
+        return self.term
+
+    def _add(self, tag: int, value: int):
+        if self._done:
+            raise ValueError("Term is already complete")
+        term = self.term
+        if self._open:
+            parent, remaining = self._open[-1]
+            if remaining == 1 and term.tags[parent] == APPLICATION:
+                # the function is done, so this starts the argument
+                term.values[parent] = len(term)
+        term.tags.append(tag)
+        term.values.append(value)
+
+    def _close(self):
+        """Marks the last node's subterm as done, and every node it completes."""
+        while self._open:
+            node = self._open[-1]
+            node[1] -= 1
+            if node[1]:
+                return
+            self._open.pop()
+        self._done = True
+
+
+def parse_diagram_flat(diagram: LambdaDiagram) -> FlatTerm:
+    """Parses a diagram like `parse_diagram`, straight into a `FlatTerm`."""
+    walk = walk_diagram(diagram)
+    builder = FlatBuilder()
+    for token in prefix_tokens(walk, tokenize_diagram(walk)):
+        match token:
+            case AbstractionToken():
+                builder.abstraction()
+            case ApplicationToken():
+                builder.application()
+            case VariableToken():
+                builder.variable(token.index)
+    return builder.build()
@@ -0,0 +1,308 @@
+"""Lazy graph reduction with in-place updates.
+
+Terms are converted to a graph of mutable nodes, where variables point straight at
+their binders instead of counting them. Reducing a redex overwrites the application
+node with an indirection to the result, so every reference to a shared subterm sees
+it reduced, and no redex is ever contracted twice.
+
+Applying an abstraction copies only the parts of its body that mention the bound
+variable, and shares the rest (Wadsworth's maximal free subexpressions). So an
+expensive subterm that doesn't depend on the variable is evaluated once, however
+many times the abstraction is applied.
+
+Work under a binder is still repeated for each copy of the abstraction's body, so
+this isn't optimal reduction in Lévy's sense.
+"""
+
+from __future__ import annotations
+
+import time
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.reduction import Reduction
+
+# node kinds
+# an abstraction's `a` is its body; an application's `a` and `b` are its function
+# and argument; a bound variable's `a` is its binder; a free variable has a `level`,
+# counted from the root like `machine._Neutral`; an indirection's `a` is the node it
+# was reduced to
+# fields a kind doesn't use are left unset
+_ABSTRACTION, _APPLICATION, _VARIABLE, _FREE, _INDIRECTION = range(5)
+
+_EMPTY = frozenset["_Node"]()
+
+
+class _Node:
+    __slots__ = ("kind", "a", "b", "level", "free")
+
+    kind: int
+    a: _Node
+    b: _Node
+    level: int
+    free: frozenset[_Node]
+    """Binders of the variables that are free in this node. Reduction can only drop
+    variables, so after an update this may be a superset."""
+
+    def __init__(self, kind: int, free: frozenset[_Node] = _EMPTY):
+        self.kind = kind
+        self.free = free
+
+
+def evaluate(
+    expression: Expression,
+    *,
+    max_steps: int | None = None,
+    timeout: float | None = None,
+) -> Reduction:
+    """Reduces `expression` to its normal form by normal order graph reduction.
+
+    `steps` counts beta rewrites of the graph. If a limit is reached, the returned
+    `expression` is the unreduced input.
+    """
+    graph = _Graph(max_steps, timeout)
+    root = _from_expression(expression)
+    try:
+        graph.normalize(root)
+    except _LimitReached:
+        return Reduction(expression, graph.steps, normal_form=False)
+    return Reduction(_to_expression(root), graph.steps, normal_form=True)
+
+
+class _LimitReached(Exception):
+    pass
+
+
+class _Graph:
+    def __init__(self, max_steps: int | None, timeout: float | None):
+        self.max_steps = max_steps
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.steps = 0
+
+    def normalize(self, root: _Node):
+        # each node is only normalized once, even if it's shared
+        done = set[_Node]()
+        todo = [root]
+        while todo:
+            node = self.whnf(todo.pop())
+            if node in done:
+                continue
+            done.add(node)
+            if node.kind == _ABSTRACTION:
+                todo.append(node.a)
+            else:
+                # a variable applied to some arguments
+                while node.kind == _APPLICATION:
+                    todo.append(node.b)
+                    node = _resolve(node.a)
+
+    def whnf(self, start: _Node) -> _Node:
+        """Reduces `start` in place until it's an abstraction or a variable applied
+        to some arguments, and returns what it was reduced to."""
+        spine = list[_Node]()
+        node = _resolve(start)
+        while True:
+            if node.kind == _APPLICATION:
+                spine.append(node)
+                node = _resolve(node.a)
+            elif node.kind == _ABSTRACTION and spine:
+                self._tick()
+                redex = spine.pop()
+                result = _instantiate(node, _resolve(redex.b))
+                redex.kind = _INDIRECTION
+                redex.a = result
+                del redex.b
+                node = _resolve(result)
+            else:
+                return _resolve(start)
+
+    def _tick(self):
+        self.steps += 1
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise _LimitReached
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise _LimitReached
+
+
+def _resolve(node: _Node) -> _Node:
+    while node.kind == _INDIRECTION:
+        node = node.a
+    return node
+
+
+def _application(function: _Node, argument: _Node) -> _Node:
+    if not argument.free:
+        free = function.free
+    elif not function.free:
+        free = argument.free
+    else:
+        free = function.free | argument.free
+    node = _Node(_APPLICATION, free)
+    node.a = function
+    node.b = argument
+    return node
+
+
+def _variable(binder: _Node) -> _Node:
+    node = _Node(_VARIABLE, frozenset((binder,)))
+    node.a = binder
+    return node
+
+
+def _free_variable(level: int) -> _Node:
+    node = _Node(_FREE)
+    node.level = level
+    # its own node stands in for its binder, so nothing containing it looks closed
+    node.free = frozenset((node,))
+    return node
+
+
+def _instantiate(abstraction: _Node, argument: _Node) -> _Node:
+    """Returns the body of `abstraction` with its variable replaced by `argument`.
+
+    Nodes that don't mention the variable, or any abstraction that had to be copied
+    because it does, are shared with the original body.
+    """
+    body = _resolve(abstraction.a)
+    # binders whose variables have to be replaced, and their replacements
+    copied = {abstraction}
+    binders = {abstraction: argument}
+    copies = dict[_Node, _Node]()
+
+    stack = [body]
+    while stack:
+        node = stack[-1]
+        if node in copies:
+            stack.pop()
+            continue
+        if node.free.isdisjoint(copied):
+            copies[node] = node
+            stack.pop()
+            continue
+
+        kind = node.kind
+        if kind == _ABSTRACTION:
+            child = _resolve(node.a)
+            if node not in binders:
+                copy = _Node(_ABSTRACTION)
+                binders[node] = _variable(copy)
+                copied.add(node)
+            if child not in copies:
+                stack.append(child)
+                continue
+            stack.pop()
+            copy = binders[node].a
+            copy.a = copies[child]
+            copy.free = copy.a.free - {copy}
+            copies[node] = copy
+
+        elif kind == _APPLICATION:
+            function = _resolve(node.a)
+            argument_ = _resolve(node.b)
+            pending = False
+            if function not in copies:
+                stack.append(function)
+                pending = True
+            if argument_ not in copies:
+                stack.append(argument_)
+                pending = True
+            if pending:
+                continue
+            stack.pop()
+            copies[node] = _application(copies[function], copies[argument_])
+
+        else:
+            assert kind == _VARIABLE
+            stack.pop()
+            copies[node] = binders[node.a]
+
+    return copies[body]
+
+
+def _from_expression(expression: Expression) -> _Node:
+    # closed subterms mean the same thing anywhere, so they're only converted once
+    closed = dict[Expression, _Node]()
+    binders = list[_Node]()
+    variables = dict[_Node, _Node]()
+    results = list[_Node]()
+    todo: list[tuple[Expression, bool]] = [(expression, False)]
+
+    while todo:
+        node, children_done = todo.pop()
+        if not children_done and (result := closed.get(node)) is not None:
+            results.append(result)
+            continue
+
+        match node:
+            case Abstraction(body=body) if children_done:
+                binder = binders.pop()
+                binder.a = results.pop()
+                binder.free = binder.a.free - {binder}
+                result = binder
+            case Abstraction(body=body):
+                binders.append(_Node(_ABSTRACTION))
+                todo += [(node, True), (body, False)]
+                continue
+            case Application() if children_done:
+                argument = results.pop()
+                result = _application(results.pop(), argument)
+            case Application(function=function, argument=argument):
+                todo += [(node, True), (argument, False), (function, False)]
+                continue
+            case Variable(index=index) if index <= len(binders):
+                binder = binders[-index]
+                if (result := variables.get(binder)) is None:
+                    result = variables[binder] = _variable(binder)
+            case Variable(index=index):
+                result = _free_variable(len(binders) - index)
+
+        if not result.free:
+            closed[node] = result
+        results.append(result)
+
+    return results.pop()
+
+
+def _to_expression(root: _Node) -> Expression:
+    # depth inside each abstraction currently being read back
+    levels = dict[_Node, int]()
+    closed = dict[_Node, Expression]()
+    results = list[Expression]()
+    # (node, depth, children done)
+    todo: list[tuple[_Node, int, bool]] = [(root, 0, False)]
+
+    while todo:
+        node, depth, children_done = todo.pop()
+        node = _resolve(node)
+        if not children_done and (result := closed.get(node)) is not None:
+            results.append(result)
+            continue
+
+        kind = node.kind
+        if kind == _ABSTRACTION:
+            if not children_done:
+                levels[node] = depth
+                todo += [(node, depth, True), (node.a, depth + 1, False)]
+                continue
+            del levels[node]
+            result = Abstraction(results.pop())
+        elif kind == _APPLICATION:
+            if not children_done:
+                todo += [
+                    (node, depth, True),
+                    (node.b, depth, False),
+                    (node.a, depth, False),
+                ]
+                continue
+            argument = results.pop()
+            result = Application(results.pop(), argument)
+        elif kind == _VARIABLE:
+            result = Variable(depth - levels[node.a])
+        else:
+            assert kind == _FREE
+            result = Variable(depth - node.level)
+
+        if not node.free:
+            closed[node] = result
+        results.append(result)
+
+    return results.pop()
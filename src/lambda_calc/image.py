@@ -0,0 +1,499 @@
+"""Reading and writing diagrams as bitmap images (PBM, PGM and PNG).
+
+Images are converted a whole row or buffer at a time with `bytes.translate`, strided
+slices and big integer arithmetic, not with a Python loop per pixel, so even large
+images load quickly. The exception is PNG rows with the Average or Paeth filter,
+which can only be undone one byte at a time. Dark pixels are set.
+
+Diagrams are often drawn scaled up, with each pixel as a square block. When reading,
+the margins around the diagram are cropped and the scale is detected from the
+lengths of runs of pixels, then the image is sampled back down to one pixel per
+block.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import struct
+import zlib
+from pathlib import Path
+
+from lambda_calc.diagram import LambdaDiagram
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+_SEPARATOR = rb"(?:\s|#[^\n]*\n)+"
+_SIZE = rb"(\d+)" + _SEPARATOR + rb"(\d+)"
+_PBM_HEADER = re.compile(rb"(P[14])" + _SEPARATOR + _SIZE + rb"\s")
+_PGM_HEADER = re.compile(rb"(P[25])" + _SEPARATOR + _SIZE + _SEPARATOR + rb"(\d+)\s")
+_COMMENT = re.compile(rb"#[^\n]*")
+_RUNS = re.compile(rb"\x00+|\x01+")
+
+# bits of a packed row, from `bin()`, to pixels
+_BIT_TO_PIXEL = bytes(i - ord("0") if i in b"01" else 0 for i in range(256))
+# pixels to the bits of a packed row, where 1 is black (PBM) or white (PNG)
+_PIXEL_TO_BIT = b"01" + bytes(254)
+_PIXEL_TO_INVERTED_BIT = b"10" + bytes(254)
+_PIXEL_TO_GRAY = b"\xff\x00" + bytes(254)
+# mostly transparent pixels are never set
+_OPAQUE = bytes(i >= 128 for i in range(256))
+
+
+def read_image(
+    path: str | Path,
+    *,
+    threshold: int = 128,
+    scale: int | tuple[int, int] | None = None,
+) -> LambdaDiagram:
+    return decode_image(Path(path).read_bytes(), threshold=threshold, scale=scale)
+
+
+def decode_image(
+    data: bytes,
+    *,
+    threshold: int = 128,
+    scale: int | tuple[int, int] | None = None,
+) -> LambdaDiagram:
+    """Decodes a PBM, PGM or PNG image into a diagram.
+
+    Pixels darker than `threshold` (out of 255) are set. The image is cropped and
+    scaled down with `downsample`.
+    """
+    if data.startswith(_PNG_SIGNATURE):
+        image = _decode_png(data, threshold)
+    elif data[:1] == b"P":
+        image = _decode_netpbm(data, threshold)
+    else:
+        raise ValueError("Unrecognized image format")
+    return downsample(image, scale)
+
+
+def write_image(diagram: LambdaDiagram, path: str | Path, *, scale: int = 1):
+    """Writes a diagram as an image, choosing the format from the file extension."""
+    path = Path(path)
+    match path.suffix.lower():
+        case ".pbm":
+            data = encode_pbm(diagram, scale=scale)
+        case ".pgm":
+            data = encode_pgm(diagram, scale=scale)
+        case ".png":
+            data = encode_png(diagram, scale=scale)
+        case suffix:
+            raise ValueError(f"Unsupported image format: {suffix}")
+    path.write_bytes(data)
+
+
+def encode_pbm(diagram: LambdaDiagram, *, scale: int = 1) -> bytes:
+    """Encodes a diagram as a binary (P4) PBM bitmap."""
+    diagram = upsample(diagram, scale)
+    header = b"P4\n%d %d\n" % (diagram.width, diagram.height)
+    return header + _pack_rows(diagram, _PIXEL_TO_BIT)
+
+
+def encode_pgm(diagram: LambdaDiagram, *, scale: int = 1) -> bytes:
+    """Encodes a diagram as a binary (P5) PGM graymap."""
+    diagram = upsample(diagram, scale)
+    header = b"P5\n%d %d\n255\n" % (diagram.width, diagram.height)
+    return header + diagram.buffer().translate(_PIXEL_TO_GRAY)
+
+
+def encode_png(diagram: LambdaDiagram, *, scale: int = 1) -> bytes:
+    """Encodes a diagram as a 1-bit grayscale PNG."""
+    diagram = upsample(diagram, scale)
+    header = struct.pack(">IIBBBBB", diagram.width, diagram.height, 1, 0, 0, 0, 0)
+    stride = (diagram.width + 7) // 8
+
+    # every row starts with its filter type, which is always 0 (none)
+    rows = _pack_rows(diagram, _PIXEL_TO_INVERTED_BIT)
+    filtered = bytearray((stride + 1) * diagram.height)
+    for y in range(diagram.height):
+        start = y * (stride + 1) + 1
+        filtered[start : start + stride] = rows[y * stride : (y + 1) * stride]
+
+    return b"".join(
+        [
+            _PNG_SIGNATURE,
+            _png_chunk(b"IHDR", header),
+            _png_chunk(b"IDAT", zlib.compress(filtered)),
+            _png_chunk(b"IEND", b""),
+        ]
+    )
+
+
+def detect_scale(diagram: LambdaDiagram) -> tuple[int, int]:
+    """Returns the horizontal and vertical size of the blocks a diagram is drawn
+    with, assuming it's already cropped to its contents.
+
+    Horizontally, this is the greatest common divisor of the lengths of the runs of
+    set and unset pixels in each row. Vertically, it's the greatest common divisor
+    of the lengths of the runs of identical rows.
+    """
+    width = diagram.width
+    pixels = diagram.buffer()
+
+    scale_y = diagram.height
+    previous = b""
+    run = 0
+    # scaled diagrams repeat every row many times, so only look at distinct ones
+    rows = set[bytes]()
+    for y in range(diagram.height):
+        row = bytes(pixels[y * width : (y + 1) * width])
+        if row == previous:
+            run += 1
+            continue
+        rows.add(row)
+        if run:
+            scale_y = math.gcd(scale_y, run)
+        previous = row
+        run = 1
+    scale_y = math.gcd(scale_y, run)
+
+    scale_x = width
+    for row in rows:
+        for match in _RUNS.finditer(row):
+            scale_x = math.gcd(scale_x, match.end() - match.start())
+            if scale_x == 1:
+                break
+
+    return scale_x, scale_y
+
+
+def downsample(
+    diagram: LambdaDiagram,
+    scale: int | tuple[int, int] | None = None,
+) -> LambdaDiagram:
+    """Crops the blank margins around a diagram, then samples one pixel from each
+    block of `scale` pixels.
+
+    `scale` may be one factor for both axes or separate horizontal and vertical
+    factors. If it's None, it's found with `detect_scale`.
+    """
+    diagram = _crop(diagram)
+    match scale:
+        case None:
+            scale_x, scale_y = detect_scale(diagram)
+        case int():
+            scale_x = scale_y = scale
+        case (scale_x, scale_y):
+            pass
+    if scale_x < 1 or scale_y < 1:
+        raise ValueError(f"Scale must be positive, but got {scale}")
+    if scale_x == scale_y == 1:
+        return diagram
+
+    width = -(-diagram.width // scale_x)
+    height = -(-diagram.height // scale_y)
+    source = diagram.buffer()
+    pixels = bytearray(width * height)
+    for y in range(height):
+        start = y * scale_y * diagram.width
+        pixels[y * width : (y + 1) * width] = source[
+            start : start + diagram.width : scale_x
+        ]
+    return LambdaDiagram.from_pixels(pixels, width, height)
+
+
+def upsample(diagram: LambdaDiagram, scale: int) -> LambdaDiagram:
+    """Scales a diagram up, drawing each pixel as a `scale` by `scale` block."""
+    if scale < 1:
+        raise ValueError(f"Scale must be positive, but got {scale}")
+    if scale == 1:
+        return diagram
+
+    width = diagram.width * scale
+    pixels = bytearray()
+    row = bytearray(width)
+    for y in range(diagram.height):
+        source = diagram.row(y)
+        for offset in range(scale):
+            row[offset::scale] = source
+        pixels += row * scale
+    return LambdaDiagram.from_pixels(pixels, width, diagram.height * scale)
+
+
+def _crop(diagram: LambdaDiagram) -> LambdaDiagram:
+    width = diagram.width
+    pixels = diagram.buffer()
+    first = pixels.find(1)
+    if first < 0:
+        raise ValueError("Image is blank")
+    top = first // width
+    bottom = pixels.rfind(1) // width
+
+    # OR all of the distinct rows together to find the occupied columns
+    view = memoryview(pixels)
+    rows = {bytes(view[y * width : (y + 1) * width]) for y in range(top, bottom + 1)}
+    columns = 0
+    for row in rows:
+        columns |= int.from_bytes(row)
+    occupied = columns.to_bytes(width)
+    left = occupied.find(1)
+    right = occupied.rfind(1)
+
+    if (left, top, right, bottom) == (0, 0, width - 1, diagram.height - 1):
+        return diagram
+
+    cropped_width = right - left + 1
+    cropped = bytearray()
+    for y in range(top, bottom + 1):
+        cropped += view[y * width + left : y * width + right + 1]
+    return LambdaDiagram.from_pixels(cropped, cropped_width, bottom - top + 1)
+
+
+def _pack_rows(diagram: LambdaDiagram, table: bytes) -> bytes:
+    """Packs each row into bytes, 8 pixels per byte, padding rows with zeros."""
+    stride = (diagram.width + 7) // 8
+    if not stride:
+        return b""
+    padding = b"0" * (8 * stride - diagram.width)
+    rows = bytearray()
+    for y in range(diagram.height):
+        bits = diagram.row(y).translate(table) + padding
+        rows += int(bits, 2).to_bytes(stride)
+    return bytes(rows)
+
+
+def _unpack_rows(data: bytes, width: int, height: int, table: bytes) -> bytearray:
+    """Inverse of `_pack_rows`."""
+    stride = (width + 7) // 8
+    pixels = bytearray(width * height)
+    if not stride:
+        return pixels
+    if width == 8 * stride:
+        # the extra leading bit keeps bin() from dropping leading zeros
+        bits = bin(int.from_bytes(data[: stride * height]) | 1 << len(pixels))
+        return bytearray(bits[3:].encode().translate(table))
+    for y in range(height):
+        row = int.from_bytes(data[y * stride : (y + 1) * stride])
+        bits = bin(row | 1 << 8 * stride)[3 : 3 + width]
+        pixels[y * width : (y + 1) * width] = bits.encode().translate(table)
+    return pixels
+
+
+def _dark(threshold: int, maxval: int = 255) -> bytes:
+    """Returns a translation table from samples to 1 if they're darker than
+    `threshold` out of 255, and 0 otherwise."""
+    return bytes(1 if 255 * i < threshold * maxval else 0 for i in range(256))
+
+
+def _and(*masks: bytes) -> bytes:
+    """Combines equal length buffers of 0 and 1 bytes with a bitwise AND."""
+    result = int.from_bytes(masks[0])
+    for mask in masks[1:]:
+        result &= int.from_bytes(mask)
+    return result.to_bytes(len(masks[0]))
+
+
+def _decode_netpbm(data: bytes, threshold: int) -> LambdaDiagram:
+    match = _PBM_HEADER.match(data) or _PGM_HEADER.match(data)
+    if match is None:
+        raise ValueError("Unsupported or invalid Netpbm header")
+    kind = match[1]
+    width, height = int(match[2]), int(match[3])
+    body = data[match.end() :]
+
+    match kind:
+        case b"P1":
+            # ASCII bitmap: 1 is black, and the digits may or may not be separated
+            digits = _COMMENT.sub(b"", body).translate(None, b" \t\r\n\v\f")
+            pixels = bytearray(digits[: width * height].translate(_BIT_TO_PIXEL))
+
+        case b"P4":
+            pixels = _unpack_rows(body, width, height, _BIT_TO_PIXEL)
+
+        case b"P2":
+            maxval = int(match[4])
+            # parsing each sample as a number is the slowest part of any format, so
+            # ASCII images are best avoided for large diagrams
+            samples = _COMMENT.sub(b"", body).split()[: width * height]
+            if maxval <= 255:
+                values = bytes(map(int, samples))
+                pixels = bytearray(values.translate(_dark(threshold, maxval)))
+            else:
+                table = [255 * i < threshold * maxval for i in range(maxval + 1)]
+                pixels = bytearray(table[int(sample)] for sample in samples)
+
+        case _:
+            maxval = int(match[4])
+            if maxval > 255:
+                # 16-bit samples, so threshold the most significant byte
+                body = body[: 2 * width * height : 2]
+                maxval >>= 8
+            pixels = bytearray(
+                body[: width * height].translate(_dark(threshold, maxval))
+            )
+
+    if len(pixels) != width * height:
+        raise ValueError(
+            f"Expected {width * height} pixels for a {width}x{height} image, but got "
+            f"{len(pixels)}"
+        )
+    return LambdaDiagram.from_pixels(pixels, width, height)
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(kind + data))
+    )
+
+
+def _decode_png(data: bytes, threshold: int) -> LambdaDiagram:
+    header = b""
+    palette = b""
+    idat = list[bytes]()
+
+    pos = len(_PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack_from(">I4s", data, pos)
+        chunk = data[pos + 8 : pos + 8 + length]
+        pos += 12 + length
+        match kind:
+            case b"IHDR":
+                header = chunk
+            case b"PLTE":
+                palette = chunk
+            case b"IDAT":
+                idat.append(chunk)
+            case b"IEND":
+                break
+            case _:
+                pass
+
+    if len(header) != 13:
+        raise ValueError("PNG is missing its header")
+    width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", header)
+    if color not in _PNG_CHANNELS:
+        raise ValueError(f"Invalid PNG color type: {color}")
+    if interlace:
+        raise ValueError("Interlaced PNGs aren't supported")
+    if depth not in (1, 8, 16) or (depth == 1 and color not in (0, 3)):
+        raise ValueError(f"Unsupported PNG bit depth: {depth}")
+
+    channels = _PNG_CHANNELS[color]
+    stride = (width * channels * depth + 7) // 8
+    raw = _unfilter_png(
+        zlib.decompress(b"".join(idat)),
+        stride,
+        height,
+        max(1, channels * depth // 8),
+    )
+
+    if depth == 1:
+        # unpack to one sample per byte, each 0 or 1
+        samples = bytes(_unpack_rows(raw, width, height, _BIT_TO_PIXEL))
+    else:
+        # for 16-bit samples, only look at the most significant byte
+        samples = raw[::2] if depth == 16 else raw
+
+    match color:
+        case 0 if depth == 1:
+            # 0 is black
+            pixels = samples.translate(b"\x01\x00" + bytes(254))
+        case 0:
+            pixels = samples.translate(_dark(threshold))
+        case 2:
+            table = _dark(threshold)
+            pixels = _and(*(samples[i::3].translate(table) for i in range(3)))
+        case 3:
+            # a palette entry is dark if all of its channels are
+            table = _dark(threshold)
+            entries = [palette[i : i + 3] for i in range(0, len(palette), 3)]
+            lookup = bytes(
+                all(table[c] for c in entries[i]) if i < len(entries) else 0
+                for i in range(256)
+            )
+            pixels = samples.translate(lookup)
+        case 4:
+            pixels = _and(
+                samples[0::2].translate(_dark(threshold)),
+                samples[1::2].translate(_OPAQUE),
+            )
+        case _:
+            table = _dark(threshold)
+            pixels = _and(
+                *(samples[i::4].translate(table) for i in range(3)),
+                samples[3::4].translate(_OPAQUE),
+            )
+
+    return LambdaDiagram.from_pixels(bytearray(pixels), width, height)
+
+
+def _unfilter_png(data: bytes, stride: int, height: int, bpp: int) -> bytes:
+    """Reverses PNG's per-row filters.
+
+    Unfiltered rows are copied, and the Up and Sub filters are undone with bytewise
+    integer arithmetic. Average and Paeth depend nonlinearly on the decoded bytes
+    before them in the same row, so they fall back to a loop over the row.
+    """
+    if len(data) < (stride + 1) * height:
+        raise ValueError("PNG image data is truncated")
+
+    # masks for adding rows bytewise modulo 256: add the low 7 bits of each byte,
+    # which can't carry into the next byte, then fix up the high bits with XOR
+    low = int.from_bytes(b"\x7f" * stride)
+    high = int.from_bytes(b"\x80" * stride)
+
+    out = bytearray(stride * height)
+    previous = bytes(stride)
+    for y in range(height):
+        start = y * (stride + 1)
+        kind = data[start]
+        row = data[start + 1 : start + 1 + stride]
+
+        match kind:
+            case 0:
+                pass
+            case 1:
+                # a running sum of each channel, computed by adding the row to
+                # itself shifted by 1, 2, 4, ... pixels
+                a = int.from_bytes(row)
+                shift = 8 * bpp
+                while shift < 8 * stride:
+                    b = a >> shift
+                    a = ((a & low) + (b & low)) ^ ((a ^ b) & high)
+                    shift *= 2
+                row = a.to_bytes(stride)
+            case 2:
+                a = int.from_bytes(row)
+                b = int.from_bytes(previous)
+                row = (((a & low) + (b & low)) ^ ((a ^ b) & high)).to_bytes(stride)
+            case 3 | 4:
+                row = _unfilter_row(kind, bytearray(row), previous, bpp)
+            case _:
+                raise ValueError(f"Invalid PNG filter type: {kind}")
+
+        out[y * stride : (y + 1) * stride] = row
+        previous = row
+    return bytes(out)
+
+
+def _unfilter_row(kind: int, row: bytearray, previous: bytes, bpp: int) -> bytes:
+    # the first pixel has nothing to its left, which works like zeros
+    for i in range(min(bpp, len(row))):
+        up = previous[i] >> 1 if kind == 3 else previous[i]
+        row[i] = (row[i] + up) & 0xFF
+
+    if kind == 3:
+        for i in range(bpp, len(row)):
+            row[i] = (row[i] + ((row[i - bpp] + previous[i]) >> 1)) & 0xFF
+        return bytes(row)
+
+    for i in range(bpp, len(row)):
+        left = row[i - bpp]
+        up = previous[i]
+        up_left = previous[i - bpp]
+        p = left + up - up_left
+        pa, pb, pc = abs(p - left), abs(p - up), abs(p - up_left)
+        if pa <= pb and pa <= pc:
+            predictor = left
+        elif pb <= pc:
+            predictor = up
+        else:
+            predictor = up_left
+        row[i] = (row[i] + predictor) & 0xFF
+    return bytes(row)
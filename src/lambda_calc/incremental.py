@@ -0,0 +1,289 @@
+"""Incremental parsing of a diagram that's being edited.
+
+`IncrementalParser` keeps the walk from its last parse, along with how each pixel in
+it was first reached. After some pixels are edited, only the part of the walk that
+was reached through them is walked again, and edits that don't change the walk
+don't parse anything. The result is always the same as parsing the edited diagram
+from scratch.
+
+Tokenizing and parsing still cover the whole walk, since they work a run at a time
+and cost little next to walking it a pixel at a time.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable
+
+from lambda_calc.ast import Expression
+from lambda_calc.diagram import LambdaDiagram
+from lambda_calc.parser import DiagramWalk, parse_walk
+
+# where the pixel that first reached each walked pixel is, relative to it
+# 0 is the top left, which isn't reached from anywhere
+_LEFT, _RIGHT, _UP, _DOWN, _JUMP_UP, _JUMP_DOWN = range(1, 7)
+
+
+class IncrementalParser:
+    """Parses a diagram, then parses it again after edits without starting over.
+
+    Edit the diagram with `set`, or change its pixels directly and then call
+    `invalidate` with the rectangle that changed. Edits are applied lazily, on the
+    next call to `parse`.
+    """
+
+    def __init__(self, diagram: LambdaDiagram):
+        """The diagram is edited in place, so it must not be memory-mapped."""
+        self.diagram = diagram
+        width = diagram.width
+        height = diagram.height
+
+        assert diagram.get(0, 0)
+
+        self._visited = bytearray(width * height)
+        self._parents = bytearray(width * height)
+        self._abstractions = set[int]()
+        self._applications = set[int]()
+        self._dirty = list[tuple[int, int, int, int]]()
+        self._expression: Expression | None = None
+
+        self._visited[0] = 1
+        self._extend([0])
+
+    def set(self, x: int, y: int, value: bool):
+        self.diagram.pixels[y * self.diagram.width + x] = value
+        self.invalidate(x, y, x, y)
+
+    def invalidate(self, min_x: int, min_y: int, max_x: int, max_y: int):
+        """Marks the pixels in a rectangle, inclusive, as changed."""
+        self._dirty.append(
+            (
+                max(min_x, 0),
+                max(min_y, 0),
+                min(max_x, self.diagram.width - 1),
+                min(max_y, self.diagram.height - 1),
+            )
+        )
+
+    def parse(self) -> Expression:
+        if self._dirty:
+            assert self.diagram.get(0, 0)
+            if self._update():
+                self._expression = None
+            self._dirty.clear()
+
+        if self._expression is None:
+            self._expression = parse_walk(self.walk())
+        return self._expression
+
+    def walk(self) -> DiagramWalk:
+        """Returns the walk as of the last parse, cropped to the area it covers like
+        the walks made by `parse_diagram`."""
+        width = self.diagram.width
+        visited = self._visited
+        max_y = visited.rfind(1) // width
+        max_x = max(
+            visited.rfind(1, y * width, (y + 1) * width) - y * width
+            for y in range(max_y + 1)
+        )
+        walk_width = max_x + 1
+        pixels = bytearray().join(
+            visited[y * width : y * width + walk_width] for y in range(max_y + 1)
+        )
+
+        def crop(indices: set[int]) -> list[int]:
+            return sorted(
+                y * walk_width + x for y, x in (divmod(i, width) for i in indices)
+            )
+
+        return DiagramWalk(
+            width=walk_width,
+            height=max_y + 1,
+            pixels=pixels,
+            abstractions=crop(self._abstractions),
+            applications=crop(self._applications),
+            min_x=0,
+            min_y=0,
+            max_x=max_x,
+            max_y=max_y,
+        )
+
+    def _update(self) -> bool:
+        """Updates the walk for the dirty rectangles, and returns True if it
+        changed."""
+        visited = self._visited
+        parents = self._parents
+        old_abstractions = self._abstractions.copy()
+        old_applications = self._applications.copy()
+
+        # an edit can only add or remove steps from pixels within two of it, and
+        # two-row jumps can land one further away than that
+        broken = [
+            index
+            for index in self._around(3)
+            if index and visited[index] and not self._still_reached(index)
+        ]
+
+        # everything reached through a missing step has to be walked again
+        removed = list[int]()
+        stack = broken
+        while stack:
+            index = stack.pop()
+            if not visited[index]:
+                continue
+            visited[index] = 0
+            self._abstractions.discard(index)
+            self._applications.discard(index)
+            removed.append(index)
+            for child, step in self._steps(index):
+                if visited[child] and parents[child] == step:
+                    stack.append(child)
+
+        # walk again from every pixel that may now reach something it didn't before
+        seeds = {index for index in self._around(2) if visited[index]}
+        for index in removed:
+            seeds.update(
+                adjacent for adjacent, _ in self._steps(index) if visited[adjacent]
+            )
+        added = self._extend(seeds)
+
+        return bool(
+            [index for index in removed if not visited[index]]
+            or set(added).difference(removed)
+            or old_abstractions != self._abstractions
+            or old_applications != self._applications
+        )
+
+    def _extend(self, queue: Iterable[int]) -> list[int]:
+        """Continues the walk from the pixels in `queue`, which must already be
+        visited, and returns the pixels it reached.
+
+        This walks breadth first, so the path to each pixel is as short as it can
+        be, and an edit cuts off as little of the walk as possible.
+        """
+        width = self.diagram.width
+        height = self.diagram.height
+        grid = self.diagram.pixels
+        visited = self._visited
+        parents = self._parents
+        abstractions = self._abstractions
+        applications = self._applications
+        added = list[int]()
+
+        queue = deque(queue)
+        while queue:
+            index = queue.popleft()
+            y, x = divmod(index, width)
+
+            left = x > 0 and grid[index - 1]
+            right = x < width - 1 and grid[index + 1]
+            up = y > 0 and grid[index - width]
+            down = y < height - 1 and grid[index + width]
+
+            if left and not visited[index - 1]:
+                visited[index - 1] = 1
+                parents[index - 1] = _RIGHT
+                queue.append(index - 1)
+                added.append(index - 1)
+            if right and not visited[index + 1]:
+                visited[index + 1] = 1
+                parents[index + 1] = _LEFT
+                queue.append(index + 1)
+                added.append(index + 1)
+            if up and not visited[index - width]:
+                visited[index - width] = 1
+                parents[index - width] = _DOWN
+                queue.append(index - width)
+                added.append(index - width)
+            if down and not visited[index + width]:
+                visited[index + width] = 1
+                parents[index + width] = _UP
+                queue.append(index + width)
+                added.append(index + width)
+
+            abstractions.discard(index)
+            applications.discard(index)
+            if right and not left and not up and not down:
+                abstractions.add(index)
+
+                # only check two up/down if it's the start of an abstraction
+                for adjacent, step in [
+                    (index - 2 * width, _JUMP_DOWN),
+                    (index + 2 * width, _JUMP_UP),
+                ]:
+                    if (
+                        0 <= adjacent < len(grid)
+                        and grid[adjacent]
+                        and not visited[adjacent]
+                    ):
+                        visited[adjacent] = 1
+                        parents[adjacent] = step
+                        queue.append(adjacent)
+                        added.append(adjacent)
+
+            elif up and right and not left:
+                applications.add(index)
+
+        return added
+
+    def _still_reached(self, index: int) -> bool:
+        """Returns True if the step that first reached a walked pixel still exists."""
+        grid = self.diagram.pixels
+        step = self._parents[index]
+        parent = index + self._offset(step)
+        if not grid[index]:
+            return False
+        if step in (_JUMP_UP, _JUMP_DOWN):
+            return self._is_abstraction(parent)
+        return bool(grid[parent])
+
+    def _is_abstraction(self, index: int) -> bool:
+        width = self.diagram.width
+        grid = self.diagram.pixels
+        x = index % width
+        return bool(
+            grid[index]
+            and x < width - 1
+            and grid[index + 1]
+            and not (x > 0 and grid[index - 1])
+            and not (index >= width and grid[index - width])
+            and not (index + width < len(grid) and grid[index + width])
+        )
+
+    def _steps(self, index: int):
+        """Yields the pixels a step away from `index`, and the step that would reach
+        each of them from it."""
+        width = self.diagram.width
+        size = len(self._visited)
+        x = index % width
+        if x > 0:
+            yield index - 1, _RIGHT
+        if x < width - 1:
+            yield index + 1, _LEFT
+        for adjacent, step in [
+            (index - width, _DOWN),
+            (index + width, _UP),
+            (index - 2 * width, _JUMP_DOWN),
+            (index + 2 * width, _JUMP_UP),
+        ]:
+            if 0 <= adjacent < size:
+                yield adjacent, step
+
+    def _offset(self, step: int) -> int:
+        width = self.diagram.width
+        return (0, -1, 1, -width, width, -2 * width, 2 * width)[step]
+
+    def _around(self, margin: int):
+        """Yields the pixels within `margin` of a dirty rectangle."""
+        width = self.diagram.width
+        height = self.diagram.height
+        seen = set[int]()
+        for min_x, min_y, max_x, max_y in self._dirty:
+            for y in range(max(min_y - margin, 0), min(max_y + margin, height - 1) + 1):
+                for x in range(
+                    max(min_x - margin, 0), min(max_x + margin, width - 1) + 1
+                ):
+                    index = y * width + x
+                    if index not in seen:
+                        seen.add(index)
+                        yield index
@@ -0,0 +1,234 @@
+"""Krivine-style abstract machine.
+
+Terms are evaluated against environments of shared thunks instead of by substitution,
+so a beta step costs O(1) no matter how big the argument is. Normal forms are read
+back by evaluating under each binder with a fresh neutral variable in its place.
+"""
+
+from __future__ import annotations
+
+import time
+from enum import StrEnum
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.reduction import Reduction
+
+
+class Mode(StrEnum):
+    NAME = "name"
+    """Call-by-name: arguments are re-evaluated every time they're used."""
+    NEED = "need"
+    """Call-by-need: arguments are evaluated at most once, then memoized."""
+
+
+def evaluate(
+    expression: Expression,
+    mode: Mode = Mode.NEED,
+    *,
+    max_steps: int | None = None,
+    timeout: float | None = None,
+) -> Reduction:
+    """Evaluates `expression` to its normal form.
+
+    `steps` counts beta steps taken by the machine. If a limit is reached, the
+    returned `expression` is the unevaluated input, since the machine has no term
+    form for a partially evaluated program.
+    """
+    machine = _Machine(mode, max_steps, timeout)
+    try:
+        result = machine.read_back(_Closure(expression, None))
+    except _LimitReached:
+        return Reduction(expression, machine.steps, normal_form=False)
+    return Reduction(result, machine.steps, normal_form=True)
+
+
+# environments are linked lists of thunks, innermost binder first
+type _Env = tuple[_Thunk, _Env] | None
+
+
+class _Thunk:
+    __slots__ = ("term", "env", "value")
+
+    def __init__(self, term: Expression | None, env: _Env, value: _Value | None = None):
+        self.term = term
+        self.env = env
+        self.value = value
+
+
+class _Closure:
+    """Weak head normal form: a term (an abstraction, once evaluated) and its
+    environment."""
+
+    __slots__ = ("term", "env")
+
+    def __init__(self, term: Expression, env: _Env):
+        self.term = term
+        self.env = env
+
+
+class _Neutral:
+    """Weak head normal form: an unknown variable applied to some arguments.
+
+    `level` counts binders from the root, so it doesn't change as terms move under
+    more binders. Variables that are free in the whole term have negative levels.
+    """
+
+    __slots__ = ("level", "args")
+
+    def __init__(self, level: int, args: tuple[_Thunk, ...] = ()):
+        self.level = level
+        self.args = args
+
+
+type _Value = _Closure | _Neutral
+
+
+class _Update:
+    """Stack marker: once evaluation reaches a value, memoize it in `thunk`."""
+
+    __slots__ = ("thunk",)
+
+    def __init__(self, thunk: _Thunk):
+        self.thunk = thunk
+
+
+class _LimitReached(Exception):
+    pass
+
+
+class _Machine:
+    def __init__(self, mode: Mode, max_steps: int | None, timeout: float | None):
+        self.memoize = mode is Mode.NEED
+        self.max_steps = max_steps
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.steps = 0
+
+    def force(self, thunk: _Thunk) -> _Value:
+        if thunk.value is not None:
+            return thunk.value
+        assert thunk.term is not None
+        return self.whnf(thunk.term, thunk.env, [_Update(thunk)])
+
+    def whnf(
+        self,
+        term: Expression,
+        env: _Env,
+        stack: list[_Thunk | _Update] | None = None,
+    ) -> _Value:
+        """Runs the machine until `term` applied to `stack` is in weak head normal
+        form."""
+        stack = stack if stack is not None else []
+
+        while True:
+            match term:
+                case Application(function=function, argument=argument):
+                    stack.append(_Thunk(argument, env))
+                    term = function
+
+                case Abstraction(body=body):
+                    while stack and isinstance(update := stack[-1], _Update):
+                        stack.pop()
+                        if self.memoize:
+                            update.thunk.value = _Closure(term, env)
+                    if not stack:
+                        return _Closure(term, env)
+
+                    argument = stack.pop()
+                    assert isinstance(argument, _Thunk)
+                    env = (argument, env)
+                    term = body
+                    self._tick()
+
+                case Variable(index=index):
+                    thunk, depth = self._lookup(env, index)
+                    if thunk is None:
+                        # free in the whole term
+                        value = _Neutral(depth - index)
+                    elif (value := thunk.value) is None:
+                        assert thunk.term is not None
+                        if self.memoize:
+                            stack.append(_Update(thunk))
+                        term, env = thunk.term, thunk.env
+                        continue
+
+                    match value:
+                        case _Closure():
+                            term, env = value.term, value.env
+                        case _Neutral():
+                            return self._apply_neutral(value, stack)
+
+    def read_back(self, value: _Value) -> Expression:
+        """Converts a value to a term in normal form, evaluating under binders."""
+        # explicit stack of pending work, so deep normal forms don't overflow
+        # each entry is a value to read back at a depth, or a node to assemble
+        todo: list[tuple[_Value, int] | Abstraction | tuple[Variable, int]] = [
+            (value, 0)
+        ]
+        results = list[Expression]()
+
+        while todo:
+            match todo.pop():
+                case Abstraction():
+                    results.append(Abstraction(results.pop()))
+
+                case (Variable() as head, int(count)):
+                    expression: Expression = head
+                    if count:
+                        for argument in results[-count:]:
+                            expression = Application(expression, argument)
+                        del results[-count:]
+                    results.append(expression)
+
+                case (_Closure() as closure, int(depth)):
+                    if not isinstance(closure.term, Abstraction):
+                        closure = self.whnf(closure.term, closure.env)
+                        todo.append((closure, depth))
+                        continue
+                    fresh = _Thunk(None, None, _Neutral(depth))
+                    body = self.whnf(closure.term.body, (fresh, closure.env))
+                    todo += [closure.term, (body, depth + 1)]
+
+                case (_Neutral() as neutral, int(depth)):
+                    todo.append((Variable(depth - neutral.level), len(neutral.args)))
+                    todo += [
+                        (self.force(argument), depth)
+                        for argument in reversed(neutral.args)
+                    ]
+
+                case _:
+                    raise AssertionError("Unreachable")
+
+        return results.pop()
+
+    def _apply_neutral(self, neutral: _Neutral, stack: list[_Thunk | _Update]):
+        args = list[_Thunk]()
+        while stack:
+            match stack.pop():
+                case _Thunk() as argument:
+                    args.append(argument)
+                case _Update(thunk=thunk):
+                    neutral = _Neutral(neutral.level, neutral.args + tuple(args))
+                    args.clear()
+                    if self.memoize:
+                        thunk.value = neutral
+        if args:
+            neutral = _Neutral(neutral.level, neutral.args + tuple(args))
+        return neutral
+
+    def _lookup(self, env: _Env, index: int) -> tuple[_Thunk | None, int]:
+        """Returns the thunk bound to `index`, or None and the length of `env` if the
+        variable is free."""
+        depth = 0
+        while env is not None:
+            depth += 1
+            if depth == index:
+                return env[0], depth
+            env = env[1]
+        return None, depth
+
+    def _tick(self):
+        self.steps += 1
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise _LimitReached
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise _LimitReached
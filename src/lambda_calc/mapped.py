@@ -0,0 +1,190 @@
+"""Memory-mapped diagram files.
+
+The loaders here map a file and read pixels straight out of it, so a diagram can be
+parsed without reading the whole file into memory. Parsing keeps a byte per pixel of
+the rectangle the term covers, from the top left to its furthest pixels, so a small
+term in a huge file stays cheap. A term that fills the file still needs as much
+memory as a text file, or eight times as much as a PBM file.
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+from array import array
+from pathlib import Path
+from typing import Iterator
+
+from lambda_calc.diagram import BIT_TO_PIXEL, TEXT_TO_PIXEL, LambdaDiagram
+
+# bytes of pixels to read at a time in `MappedDiagram.chunks`
+_CHUNK = 1 << 16
+
+_INDENT = re.compile(rb" *")
+_PBM_HEADER = re.compile(rb"P4(?:\s|#[^\n]*\n)+(\d+)(?:\s|#[^\n]*\n)+(\d+)\s")
+
+
+class MappedDiagram(LambdaDiagram):
+    """Diagram whose pixels are read from a memory-mapped file on demand.
+
+    `pixels` is a read-only view indexed by flat position like the buffer of a
+    regular diagram, but it can't be sliced. Call `close` (or use the diagram as a
+    context manager) to unmap the file.
+    """
+
+    pixels: _TextPixels | _BitmapPixels  # pyright: ignore[reportIncompatibleVariableOverride]
+
+    def __init__(self, pixels: _TextPixels | _BitmapPixels, width: int, height: int):
+        self._set_pixels(pixels, width, height)  # pyright: ignore[reportArgumentType]
+
+    def buffer(self) -> bytes:
+        """Copies all of the pixels into memory."""
+        return b"".join(self.chunks())
+
+    def chunks(self) -> Iterator[bytes]:
+        """Yields the pixels a few rows at a time."""
+        rows = max(_CHUNK // max(self.width, 1), 1)
+        for y in range(0, self.height, rows):
+            yield b"".join(self.row(i) for i in range(y, min(y + rows, self.height)))
+
+    def row(self, y: int) -> bytes:
+        return self.pixels.row(y)
+
+    def close(self):
+        self.pixels.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_: object):
+        self.close()
+
+
+def map_text(path: str | Path) -> MappedDiagram:
+    """Maps a text diagram, where every byte other than a space is a set pixel.
+
+    Like `LambdaDiagram.from_str`, leading blank lines and common indentation are
+    ignored. Unlike it, the file is read as bytes, so it should be ASCII.
+    """
+    data = _map(path)
+    if data.find(b"\t") >= 0:
+        data.close()
+        raise ValueError("Must use spaces, not tabs")
+
+    # find where each line starts and how long it is, without its line ending
+    offsets = array("q")
+    lengths = array("q")
+    indent = len(data)
+    start = 0
+    while start < len(data):
+        end = data.find(b"\n", start)
+        if end < 0:
+            end = len(data)
+        stop = end - 1 if end > start and data[end - 1] == ord("\r") else end
+
+        spaces = _INDENT.match(data, start, stop)
+        assert spaces is not None
+        if spaces.end() < stop:
+            indent = min(indent, spaces.end() - start)
+            offsets.append(start)
+            lengths.append(stop - start)
+        elif offsets and end < len(data):
+            # blank lines only count once the diagram has started, and a blank
+            # last line without a line ending is just indentation
+            offsets.append(start)
+            lengths.append(0)
+        start = end + 1
+
+    if not offsets or data[offsets[0] + indent] == ord(" "):
+        data.close()
+        raise ValueError("Top left character must not be blank")
+
+    for y, length in enumerate(lengths):
+        offsets[y] += indent
+        lengths[y] = max(length - indent, 0)
+
+    width = max(lengths)
+    return MappedDiagram(
+        _TextPixels(data, offsets, lengths, width), width, len(offsets)
+    )
+
+
+def map_pbm(path: str | Path) -> MappedDiagram:
+    """Maps a binary (P4) PBM bitmap, where black pixels are set."""
+    data = _map(path)
+    match = _PBM_HEADER.match(data)
+    if match is None:
+        data.close()
+        raise ValueError("Not a binary PBM file")
+
+    width, height = int(match[1]), int(match[2])
+    stride = (width + 7) // 8
+    if len(data) - match.end() < stride * height:
+        data.close()
+        raise ValueError(
+            f"Expected {stride * height} bytes of pixels for a {width}x{height} "
+            f"bitmap, but got {len(data) - match.end()}"
+        )
+
+    return MappedDiagram(
+        _BitmapPixels(data, match.end(), stride, width, height), width, height
+    )
+
+
+def _map(path: str | Path):
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _TextPixels:
+    __slots__ = ("data", "offsets", "lengths", "width")
+
+    def __init__(
+        self, data: mmap.mmap, offsets: array[int], lengths: array[int], width: int
+    ):
+        self.data = data
+        self.offsets = offsets
+        self.lengths = lengths
+        self.width = width
+
+    def row(self, y: int) -> bytes:
+        start = self.offsets[y]
+        length = self.lengths[y]
+        pixels = self.data[start : start + length].translate(TEXT_TO_PIXEL)
+        return pixels + bytes(self.width - length)
+
+    def __getitem__(self, index: int) -> bool:
+        y, x = divmod(index, self.width)
+        return x < self.lengths[y] and self.data[self.offsets[y] + x] != 0x20
+
+    def __len__(self):
+        return self.width * len(self.offsets)
+
+
+class _BitmapPixels:
+    __slots__ = ("data", "start", "stride", "width", "height")
+
+    def __init__(
+        self, data: mmap.mmap, start: int, stride: int, width: int, height: int
+    ):
+        self.data = data
+        self.start = start
+        self.stride = stride
+        self.width = width
+        self.height = height
+
+    def row(self, y: int) -> bytes:
+        if not self.width:
+            return b""
+        start = self.start + y * self.stride
+        bits = bin(int.from_bytes(self.data[start : start + self.stride]))[2:]
+        return (
+            bits.zfill(8 * self.stride)[: self.width].encode().translate(BIT_TO_PIXEL)
+        )
+
+    def __getitem__(self, index: int) -> int:
+        y, x = divmod(index, self.width)
+        return self.data[self.start + y * self.stride + (x >> 3)] >> (7 - (x & 7)) & 1
+
+    def __len__(self):
+        return self.width * self.height
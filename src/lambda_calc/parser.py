@@ -1,24 +1,54 @@
 from __future__ import annotations
 
+import bisect
 from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterator
 
 from lambda_calc.ast import Abstraction, Application, Expression, Variable
 from lambda_calc.diagram import LambdaDiagram
 from lambda_calc.math import Vec2
 
+if TYPE_CHECKING:
+    from lambda_calc.cache import ParseCache
+    from lambda_calc.stats import ParseStats
+
+# rows and columns of visited pixels to start a walk with
+_WALK_CHUNK = 64
+
 
 @dataclass
 class DiagramWalk:
-    pixels: set[Vec2]
-    abstractions: set[Vec2]
-    applications: set[Vec2]
+    """Connected set of pixels reachable from the top left of a diagram.
+
+    The walk only covers the rectangle from the top left to the furthest pixels it
+    reached, so `width` and `height` can be smaller than the diagram's. Pixels are
+    addressed by their flat index `y * width + x` within that rectangle.
+    """
+
+    width: int
+    height: int
+    pixels: bytearray
+    """1 for every pixel that is part of the walk, 0 otherwise."""
+    abstractions: list[int]
+    applications: list[int]
     min_x: int
     min_y: int
     max_x: int
     max_y: int
 
+    def has(self, x: int, y: int) -> bool:
+        return (
+            0 <= x < self.width
+            and 0 <= y < self.height
+            and self.pixels[y * self.width + x] != 0
+        )
+
+    def pos(self, index: int):
+        y, x = divmod(index, self.width)
+        return Vec2(x, y)
+
     def __contains__(self, pos: Vec2):
-        return pos in self.pixels
+        return self.has(pos.x, pos.y)
 
 
 @dataclass(kw_only=True, eq=False)
@@ -46,210 +76,550 @@ class VariableToken:
 type Token = AbstractionToken | ApplicationToken | VariableToken
 
 
-def parse_diagram(diagram: LambdaDiagram):
-    walk = _walk_diagram(diagram)
-    tokens = _tokenize_diagram(walk)
-    return _parse_area(
-        tokens,
-        min_x=walk.min_x,
-        max_x=walk.max_x,
-        min_y=walk.min_y,
-        max_y=walk.max_y,
-    )
-
-
-def _walk_diagram(diagram: LambdaDiagram):
-    queue = [Vec2(0, 0)]
-
-    walk = DiagramWalk(
-        pixels=set(queue),
-        abstractions=set(),
-        applications=set(),
-        min_x=0,
-        min_y=0,
-        max_x=0,
-        max_y=0,
-    )
-
-    assert diagram[queue[0]]
+class TokenGrid:
+    """Tokens of a diagram, stored as horizontal runs per row and vertical runs per
+    column instead of per pixel."""
+
+    def __init__(self):
+        # row or column -> sorted run starts, and the matching (end, token) pairs
+        self.rows = dict[int, tuple[list[int], list[tuple[int, Token]]]]()
+        self.columns = dict[int, tuple[list[int], list[tuple[int, Token]]]]()
+        # sorted keys of `columns`, built on demand by `row_tokens`
+        self._column_keys: list[int] | None = None
+
+    def add_row_run(self, y: int, min_x: int, max_x: int, token: Token):
+        _insert_run(self.rows, y, min_x, max_x, token)
+
+    def add_column_run(self, x: int, min_y: int, max_y: int, token: Token):
+        if x not in self.columns:
+            self._column_keys = None
+        _insert_run(self.columns, x, min_y, max_y, token)
+
+    def row_tokens(self, y: int, min_x: int, max_x: int) -> Iterator[Token]:
+        """Yields the tokens that intersect row `y` between `min_x` and `max_x`, from
+        left to right.
+
+        Horizontal runs on the row are found by binary search. Vertical runs are
+        found by visiting only the columns that have any, so blank space costs
+        nothing. Callers usually only need the first token or two, so this is lazy.
+        """
+        if self._column_keys is None:
+            self._column_keys = sorted(self.columns)
+        keys = self._column_keys
+
+        row_starts, row_runs = self.rows.get(y, ((), ()))
+        i = bisect.bisect_right(row_starts, min_x) - 1
+        if i < 0 or row_runs[i][0] < min_x:
+            i += 1
+        j = bisect.bisect_left(keys, min_x)
+
+        # merge the horizontal runs with the vertical runs crossing the row
+        # runs never overlap, so there are no ties
+        while True:
+            row_x = row_starts[i] if i < len(row_starts) else max_x + 1
+            column_x = keys[j] if j < len(keys) else max_x + 1
+            if min(row_x, column_x) > max_x:
+                return
+            if row_x < column_x:
+                yield row_runs[i][1]
+                i += 1
+            else:
+                if (token := _find_run(self.columns, column_x, y)) is not None:
+                    yield token
+                j += 1
+
+    def __len__(self):
+        """Returns the number of runs."""
+        return sum(len(starts) for starts, _ in self.rows.values()) + sum(
+            len(starts) for starts, _ in self.columns.values()
+        )
 
-    while queue:
-        pos = queue.pop(0)
+    def get(self, pos: Vec2) -> Token | None:
+        return _find_run(self.rows, pos.y, pos.x) or _find_run(
+            self.columns, pos.x, pos.y
+        )
 
-        walk.min_x = min(walk.min_x, pos.x)
-        walk.min_y = min(walk.min_y, pos.y)
-        walk.max_x = max(walk.max_x, pos.x)
-        walk.max_y = max(walk.max_y, pos.y)
+    def __getitem__(self, pos: Vec2) -> Token:
+        if (token := self.get(pos)) is None:
+            raise KeyError(pos)
+        return token
 
-        adjacents = list[Vec2]()
-        if left := diagram[adjacent := pos + Vec2.left()]:
-            adjacents.append(adjacent)
-        if right := diagram[adjacent := pos + Vec2.right()]:
-            adjacents.append(adjacent)
-        if up := diagram[adjacent := pos + Vec2.up()]:
-            adjacents.append(adjacent)
-        if down := diagram[adjacent := pos + Vec2.down()]:
-            adjacents.append(adjacent)
+    def __contains__(self, pos: Vec2):
+        return self.get(pos) is not None
+
+    def column_applications(
+        self,
+        x: int,
+        column: bytes,
+    ) -> tuple[list[int], list[ApplicationToken]]:
+        """Returns the rows in column `x` that start an application, and those
+        applications, given the column's pixels.
+
+        Runs of set pixels are skipped over a token at a time, rather than a pixel
+        at a time.
+        """
+        rows = list[int]()
+        applications = list[ApplicationToken]()
+        starts, runs = self.columns.get(x, ((), ()))
+
+        y = column.find(1)
+        while y >= 0:
+            i = bisect.bisect_right(starts, y) - 1
+            if i >= 0 and runs[i][0] >= y:
+                # vertical run
+                end, token = runs[i]
+            else:
+                # crossing a horizontal run, or a pixel with no token
+                end, token = y, _find_run(self.rows, y, x)
+            if isinstance(token, ApplicationToken):
+                rows.append(y)
+                applications.append(token)
+            y = column.find(1, end + 1)
+
+        return rows, applications
+
+
+def _insert_run(
+    lines: dict[int, tuple[list[int], list[tuple[int, Token]]]],
+    line: int,
+    start: int,
+    end: int,
+    token: Token,
+):
+    starts, runs = lines.setdefault(line, ([], []))
+    i = bisect.bisect_left(starts, start)
+    starts.insert(i, start)
+    runs.insert(i, (end, token))
+
+
+def _find_run(
+    lines: dict[int, tuple[list[int], list[tuple[int, Token]]]],
+    line: int,
+    pos: int,
+) -> Token | None:
+    if (entry := lines.get(line)) is None:
+        return None
+    starts, runs = entry
+    i = bisect.bisect_right(starts, pos) - 1
+    if i >= 0:
+        end, token = runs[i]
+        if end >= pos:
+            return token
+    return None
+
+
+def parse_diagram(
+    diagram: LambdaDiagram,
+    cache: ParseCache | None = None,
+    stats: ParseStats | None = None,
+):
+    """Parses a diagram into an expression.
+
+    If `cache` is given, diagrams it has already seen are looked up instead of being
+    parsed again. If `stats` is given, timings and counts for each stage are added
+    to it.
+    """
+    if cache is None:
+        return _parse_diagram(diagram, stats)
+
+    key = cache.key(diagram)
+    if (expression := cache.get(key)) is None:
+        expression = _parse_diagram(diagram, stats)
+        cache.put(key, expression)
+    elif stats is not None:
+        stats.diagrams += 1
+        stats.cache_hits += 1
+    return expression
+
+
+def _parse_diagram(diagram: LambdaDiagram, stats: ParseStats | None = None):
+    if stats is not None:
+        return _parse_diagram_with_stats(diagram, stats)
+
+    return parse_walk(walk_diagram(diagram))
+
+
+def _parse_diagram_with_stats(diagram: LambdaDiagram, stats: ParseStats):
+    with stats.measure(stats.walk):
+        walk = walk_diagram(diagram)
+    with stats.measure(stats.tokenize):
+        tokens = tokenize_diagram(walk)
+    with stats.measure(stats.parse):
+        expression = parse_tokens(walk, tokens)
+
+    stats.diagrams += 1
+    stats.pixels += diagram.width * diagram.height
+    stats.walked_pixels += walk.pixels.count(1)
+    stats.abstractions += len(walk.abstractions)
+    stats.applications += len(walk.applications)
+    stats.runs += len(tokens)
+    stats.count_nodes(expression)
+    return expression
+
+
+def walk_diagram(diagram: LambdaDiagram) -> DiagramWalk:
+    width = diagram.width
+    height = diagram.height
+    grid = diagram.pixels
+
+    assert diagram.get(0, 0)
+
+    # the walk starts at the top left, so it only ever extends right and down
+    # visited pixels are kept in a grid of their own that grows to fit the walk,
+    # rather than one the size of the diagram, so a small term in a huge mapped file
+    # only needs memory for the area it covers
+    stride = min(width, _WALK_CHUNK)
+    rows = min(height, _WALK_CHUNK)
+    visited = bytearray(stride * rows)
+    visited[0] = 1
+    stack = [0]
+    # pixels in this column or row or beyond need a bigger grid, to have room for
+    # their neighbours and the pixel two below an abstraction
+    grow_x, grow_y = _grow_limits(stride, rows, width, height)
+
+    abstractions = list[tuple[int, int]]()
+    applications = list[tuple[int, int]]()
+    max_x = max_y = 0
+
+    while stack:
+        index = stack.pop()
+        y, x = divmod(index, width)
+
+        if x > max_x:
+            max_x = x
+        if y > max_y:
+            max_y = y
+
+        if x >= grow_x or y >= grow_y:
+            visited, stride, rows = _resize_visited(
+                visited,
+                stride,
+                rows,
+                min(width, max(2 * stride, x + 2)),
+                min(height, max(2 * rows, y + 3)),
+            )
+            grow_x, grow_y = _grow_limits(stride, rows, width, height)
+        position = y * stride + x
+
+        left = x > 0 and grid[index - 1]
+        right = x < width - 1 and grid[index + 1]
+        up = y > 0 and grid[index - width]
+        down = y < height - 1 and grid[index + width]
+
+        if left and not visited[position - 1]:
+            visited[position - 1] = 1
+            stack.append(index - 1)
+        if right and not visited[position + 1]:
+            visited[position + 1] = 1
+            stack.append(index + 1)
+        if up and not visited[position - stride]:
+            visited[position - stride] = 1
+            stack.append(index - width)
+        if down and not visited[position + stride]:
+            visited[position + stride] = 1
+            stack.append(index + width)
 
         if right and not left and not up and not down:
-            walk.abstractions.add(pos)
+            abstractions.append((y, x))
 
             # only check two up/down if it's the start of an abstraction
-            if diagram[adjacent := pos + Vec2.up() * 2]:
-                adjacents.append(adjacent)
-            if diagram[adjacent := pos + Vec2.down() * 2]:
-                adjacents.append(adjacent)
+            if (
+                y >= 2
+                and grid[index - 2 * width]
+                and not visited[position - 2 * stride]
+            ):
+                visited[position - 2 * stride] = 1
+                stack.append(index - 2 * width)
+            if (
+                y + 2 < height
+                and grid[index + 2 * width]
+                and not visited[position + 2 * stride]
+            ):
+                visited[position + 2 * stride] = 1
+                stack.append(index + 2 * width)
 
         elif up and right and not left:
-            walk.applications.add(pos)
+            applications.append((y, x))
+
+    # crop to the walked area
+    walk_width = max_x + 1
+    walk_height = max_y + 1
+    visited, _, _ = _resize_visited(visited, stride, rows, walk_width, walk_height)
+
+    # sort by row, then by column, like flat indices
+    abstractions.sort()
+    applications.sort()
+
+    return DiagramWalk(
+        width=walk_width,
+        height=walk_height,
+        pixels=visited,
+        abstractions=[y * walk_width + x for y, x in abstractions],
+        applications=[y * walk_width + x for y, x in applications],
+        min_x=0,
+        min_y=0,
+        max_x=max_x,
+        max_y=max_y,
+    )
 
-        for adjacent in adjacents:
-            if adjacent not in walk.pixels:
-                walk.pixels.add(adjacent)
-                queue.append(adjacent)
 
-    return walk
+def _grow_limits(stride: int, rows: int, width: int, height: int) -> tuple[int, int]:
+    """Returns the column and row from which a walk needs a bigger visited grid."""
+    return (
+        stride - 1 if stride < width else width,
+        rows - 2 if rows < height else height,
+    )
 
 
-def _tokenize_diagram(walk: DiagramWalk):
-    tokens = dict[Vec2, Token]()
+def _resize_visited(
+    visited: bytearray, stride: int, rows: int, new_stride: int, new_rows: int
+) -> tuple[bytearray, int, int]:
+    """Resizes a grid of `rows` rows of `stride` pixels to `new_rows` rows of
+    `new_stride` pixels, keeping the top left corner."""
+    if new_stride == stride:
+        if new_rows <= rows:
+            del visited[new_rows * stride :]
+        else:
+            visited += bytes((new_rows - rows) * stride)
+        return visited, stride, new_rows
+
+    grown = bytearray(new_stride * new_rows)
+    keep = min(stride, new_stride)
+    for y in range(min(rows, new_rows)):
+        start = y * stride
+        grown[y * new_stride : y * new_stride + keep] = visited[start : start + keep]
+    return grown, new_stride, new_rows
+
+
+def tokenize_diagram(walk: DiagramWalk) -> TokenGrid:
+    """Splits the walked pixels into tokens.
+
+    Lines are followed a run at a time with `find` over rows and columns of the walk,
+    and tokens are stored per run, so this scales with the number of lines in the
+    diagram rather than the number of pixels.
+    """
+    width = walk.width
+    pixels = walk.pixels
+    columns = _WalkColumns(walk)
+    tokens = TokenGrid()
     abstractions = list[AbstractionToken]()
 
-    for abstraction_pos in sorted(walk.abstractions, key=lambda v: v.y):
+    def hanging(y: int, min_x: int, max_x: int):
+        """Yields the columns in `[min_x, max_x]` with a line hanging below row `y`."""
+        below = (y + 1) * width
+        if y + 1 >= walk.height:
+            return
+        x = pixels.find(1, below + min_x, below + max_x + 1)
+        while x >= 0:
+            yield x - below
+            x = pixels.find(1, x + 1, below + max_x + 1)
+
+    def follow(x: int, y: int) -> tuple[int, bool]:
+        """Follows the line down column `x` from row `y` until a pixel with a
+        neighbour on the left or right, or the end of the line.
+
+        Returns the first row after the straight part of the line, and whether that
+        row has neighbours on both sides.
+        """
+        end = columns[x].find(0, y)
+        if end < 0:
+            end = walk.height
+        left = columns[x - 1].find(1, y, end) if x > 0 else -1
+        right = columns[x + 1].find(1, y, end) if x < width - 1 else -1
+        stop = min(left, right) if left >= 0 and right >= 0 else max(left, right)
+        if stop < 0:
+            return end, False
+        return stop, left == right
+
+    for index in walk.abstractions:
+        y, min_x = divmod(index, width)
+        max_x = _run_end(pixels, index, (y + 1) * width) - y * width
         abstraction = AbstractionToken(
-            min_x=abstraction_pos.x,
-            max_x=abstraction_pos.x,
-            y=abstraction_pos.y,
-            scope_max_y=abstraction_pos.y,
+            min_x=min_x,
+            max_x=max_x,
+            y=y,
+            scope_max_y=y,
         )
         abstractions.append(abstraction)
-
-        while abstraction_pos in walk:
-            if abstraction_pos + Vec2.up() not in walk:
-                variable_pos = abstraction_pos + Vec2.down()
-                variable = VariableToken(1)
-                while variable_pos in walk:
-                    left = variable_pos + Vec2.left() in walk
-                    right = variable_pos + Vec2.right() in walk
-                    match left, right:
-                        case False, False:
-                            # same chunk of variable
-                            tokens[variable_pos] = variable
-                        case True, True:
-                            # nested abstraction
-                            variable = VariableToken(variable.index + 1)
-                        case _:
-                            # application
-                            break
-                    variable_pos += Vec2.down()
-
-            abstraction.max_x = abstraction_pos.x
-            tokens[abstraction_pos] = abstraction
-            abstraction_pos += Vec2.right()
-
-    for application_pos in sorted(walk.applications, key=lambda v: v.y):
-        application = ApplicationToken(
-            min_x=application_pos.x,
-            max_x=application_pos.x,
-            y=application_pos.y,
-            left=tokens[application_pos + Vec2.up()],
-        )
-
-        while application_pos in walk:
-            tail_pos = application_pos + Vec2.down()
-            while tail_pos in walk:
-                if tail_pos + Vec2.left() in walk or tail_pos + Vec2.right() in walk:
-                    # reached another application
+        tokens.add_row_run(y, min_x, max_x, abstraction)
+
+        for x in hanging(y, min_x, max_x):
+            if y > 0 and pixels[index - width - min_x + x]:
+                # a line from an outer abstraction passing through this one
+                continue
+
+            # nested abstractions cross the variable's line, increasing its index
+            variable_y = y + 1
+            variable = VariableToken(1)
+            while True:
+                stop, crossed = follow(x, variable_y)
+                if stop > variable_y:
+                    tokens.add_column_run(x, variable_y, stop - 1, variable)
+                if not crossed:
                     break
-                tokens[tail_pos] = application
-                tail_pos += Vec2.down()
+                variable = VariableToken(variable.index + 1)
+                variable_y = stop + 1
+
+    for index in walk.applications:
+        y, min_x = divmod(index, width)
+        max_x = _run_end(pixels, index, (y + 1) * width) - y * width
+        left = tokens.get(Vec2(min_x, y - 1))
+        right = tokens.get(Vec2(max_x, y - 1))
+        if left is None or right is None:
+            raise ValueError(
+                f"Expected lines above both ends of application at {min_x}, {y}"
+            )
 
-            application.max_x = application_pos.x
-            tokens[application_pos] = application
-            application_pos += Vec2.right()
+        application = ApplicationToken(min_x=min_x, max_x=max_x, y=y, left=left)
+        application.right = right
+        tokens.add_row_run(y, min_x, max_x, application)
 
-        application.right = tokens[Vec2(application.max_x, application.y) + Vec2.up()]
+        for x in hanging(y, min_x, max_x):
+            stop, _ = follow(x, y + 1)
+            if stop > y + 1:
+                tokens.add_column_run(x, y + 1, stop - 1, application)
 
     # find the first application that leaves each abstraction's scope
-    for abstraction in abstractions:
-        for y in range(abstraction.y, walk.max_y + 1):
-            if isinstance(
-                token := tokens.get(Vec2(abstraction.min_x, y)), ApplicationToken
-            ):
-                if not isinstance(token.right, AbstractionToken):
-                    token.right = abstraction
-                break
+    first_applications = dict[int, tuple[list[int], list[ApplicationToken]]]()
 
-            if isinstance(
-                token := tokens.get(Vec2(abstraction.max_x, y)), ApplicationToken
-            ):
-                if not isinstance(token.left, AbstractionToken):
-                    token.left = abstraction
-                break
+    def first_application(x: int, y: int) -> tuple[int, ApplicationToken | None]:
+        if x not in first_applications:
+            first_applications[x] = tokens.column_applications(x, columns[x])
+        rows, applications = first_applications[x]
+        i = bisect.bisect_left(rows, y)
+        if i < len(rows):
+            return rows[i], applications[i]
+        return walk.max_y + 1, None
 
-            abstraction.scope_max_y = y
+    for abstraction in abstractions:
+        left_y, left = first_application(abstraction.min_x, abstraction.y)
+        right_y, right = first_application(abstraction.max_x, abstraction.y)
+        if left is not None and left_y <= right_y:
+            if not isinstance(left.right, AbstractionToken):
+                left.right = abstraction
+        elif right is not None:
+            if not isinstance(right.left, AbstractionToken):
+                right.left = abstraction
+        abstraction.scope_max_y = min(left_y, right_y) - 1
 
     return tokens
 
 
-def _parse_area(
-    tokens: dict[Vec2, Token],
+def _run_end(pixels: bytearray, index: int, stop: int) -> int:
+    """Returns the index of the last set pixel in the run starting at `index`."""
+    end = pixels.find(0, index, stop)
+    return (stop if end < 0 else end) - 1
+
+
+class _WalkColumns:
+    """Lazily sliced columns of a walk, for finding runs down a column."""
+
+    def __init__(self, walk: DiagramWalk):
+        self.walk = walk
+        self.columns = dict[int, bytes]()
+
+    def __getitem__(self, x: int) -> bytes:
+        if (column := self.columns.get(x)) is None:
+            column = bytes(self.walk.pixels[x :: self.walk.width])
+            self.columns[x] = column
+        return column
+
+
+def prefix_tokens(walk: DiagramWalk, tokens: TokenGrid) -> Iterator[Token]:
+    """Yields the tokens of the term in a walk, in prefix order: every abstraction
+    before its body, and every application before its function and then its
+    argument.
+
+    Raises ValueError if the tokens don't make up a term.
+    """
+    stack = [
+        _find_area_token(
+            tokens,
+            min_x=walk.min_x,
+            max_x=walk.max_x,
+            min_y=walk.min_y,
+            max_y=walk.max_y,
+        )
+    ]
+    # in a valid diagram every token has one parent, but a malformed one can lead
+    # back to a token that's already been reached, which would never finish
+    seen = set[Token]()
+
+    while stack:
+        token = stack.pop()
+        if token in seen:
+            raise ValueError(f"Diagram refers back to a token it already used: {token}")
+        seen.add(token)
+        yield token
+
+        match token:
+            case AbstractionToken():
+                stack.append(
+                    _find_area_token(
+                        tokens,
+                        min_x=token.min_x,
+                        max_x=token.max_x,
+                        min_y=token.y + 2,
+                        max_y=token.scope_max_y,
+                    )
+                )
+            case ApplicationToken():
+                stack += [token.right, token.left]
+            case VariableToken():
+                pass
+
+
+def parse_walk(walk: DiagramWalk) -> Expression:
+    """Tokenizes a walk and builds the term in it. The walk doesn't have to come
+    from `walk_diagram`, so `IncrementalParser` parses the walks it keeps with this."""
+    return parse_tokens(walk, tokenize_diagram(walk))
+
+
+def parse_tokens(walk: DiagramWalk, tokens: TokenGrid) -> Expression:
+    """Builds the term in a walk from its tokens."""
+    # in reverse prefix order, each token's children are on top of the stack,
+    # function first
+    results = list[Expression]()
+    for token in reversed(list(prefix_tokens(walk, tokens))):
+        match token:
+            case AbstractionToken():
+                results.append(Abstraction(results.pop()))
+            case ApplicationToken():
+                function = results.pop()
+                results.append(Application(function, results.pop()))
+            case VariableToken(index=index):
+                results.append(Variable(index))
+    return results.pop()
+
+
+def _find_area_token(
+    tokens: TokenGrid,
     *,
     min_x: int,
     max_x: int,
     min_y: int,
     max_y: int,
-) -> Expression:
+) -> Token:
     # check how many tokens are on this row
-    result: Token | None = None
-    for x in range(min_x, max_x + 1):
-        if token := tokens.get(Vec2(x, min_y)):
-            if result is None:
-                result = token
-            elif result is not token:
-                break
-    else:
-        # if we didn't break, there's only one token on this row
-        # which means that's the value of this area
-        if result is None:
-            raise ValueError(
-                f"Expected to find at least one token, but none were found: x=[{min_x}, {max_x}], y={min_y}"
-            )
-        return _parse_token(tokens, result)
+    row = tokens.row_tokens(min_y, min_x, max_x)
+    result = next(row, None)
+    if result is None:
+        raise ValueError(
+            f"Expected to find at least one token, but none were found: x=[{min_x}, {max_x}], y={min_y}"
+        )
+    if all(token is result for token in row):
+        # there's only one token on this row, which means that's the value of this
+        # area
+        return result
 
     # otherwise, the result is an application at the bottom of the area
-    for x in range(min_x, max_x + 1):
-        match tokens.get(Vec2(x, max_y)):
-            case ApplicationToken() as application:
-                return _parse_token(tokens, application)
-            case None:
-                pass
-            case token:
-                raise ValueError(
-                    f"Expected an application, but got {token}: x=[{min_x}, {max_x}], y={max_y}"
-                )
+    for token in tokens.row_tokens(max_y, min_x, max_x):
+        if isinstance(token, ApplicationToken):
+            return token
+        raise ValueError(
+            f"Expected an application, but got {token}: x=[{min_x}, {max_x}], y={max_y}"
+        )
 
     raise ValueError(
         f"Expected to find at least one token, but none were found: x=[{min_x}, {max_x}], y={max_y}"
     )
-
-
-def _parse_token(tokens: dict[Vec2, Token], token: Token) -> Expression:
-    match token:
-        case AbstractionToken():
-            return Abstraction(
-                body=_parse_area(
-                    tokens,
-                    min_x=token.min_x,
-                    max_x=token.max_x,
-                    min_y=token.y + 2,
-                    max_y=token.scope_max_y,
-                )
-            )
-        case ApplicationToken():
-            return Application(
-                function=_parse_token(tokens, token.left),
-                argument=_parse_token(tokens, token.right),
-            )
-        case VariableToken():
-            return Variable(index=token.index)
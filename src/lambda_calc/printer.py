@@ -0,0 +1,161 @@
+"""Streaming printer for expressions.
+
+Terms are written to any text sink with a `write` method, such as a file or
+`sys.stdout`, in chunks as they're formatted, so printing a huge term never holds
+all of its text in memory at once. The traversal is iterative, and the time taken
+is linear in the size of the output.
+
+Variables can be printed with generated names or as de Bruijn indices, and either
+with every abstraction and application in parentheses, or only where they're
+needed.
+"""
+
+from __future__ import annotations
+
+import io
+from string import ascii_lowercase
+from typing import Callable, Protocol
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+
+# number of pieces of text to collect before writing them out
+_CHUNK = 4096
+
+
+class TextSink(Protocol):
+    def write(self, text: str, /) -> object: ...
+
+
+def variable_name(level: int, names: str = ascii_lowercase) -> str:
+    """Returns the name for the variable bound by the abstraction `level` binders
+    from the root.
+
+    The first names are the characters of `names`, then they repeat with a number
+    after them: `a` to `z`, then `a1` to `z1`, `a2`, and so on.
+    """
+    cycle, i = divmod(level, len(names))
+    return names[i] + str(cycle) if cycle else names[i]
+
+
+def format_expression(
+    expression: Expression,
+    *,
+    names: str = ascii_lowercase,
+    de_bruijn: bool = False,
+    minimal: bool = False,
+    depth: int = 0,
+) -> str:
+    """Returns the text that `write_expression` would write."""
+    sink = io.StringIO()
+    write_expression(
+        expression,
+        sink,
+        names=names,
+        de_bruijn=de_bruijn,
+        minimal=minimal,
+        depth=depth,
+    )
+    return sink.getvalue()
+
+
+def write_expression(
+    expression: Expression,
+    sink: TextSink,
+    *,
+    names: str = ascii_lowercase,
+    de_bruijn: bool = False,
+    minimal: bool = False,
+    depth: int = 0,
+):
+    """Writes `expression` to `sink`.
+
+    By default, variables are named by `variable_name`, and every abstraction and
+    application is wrapped in parentheses, like `(λa.(λb.(a(ab))))`. Names are only
+    separated by a space when one of them is longer than a character. If
+    `de_bruijn` is True, variables are written as their indices instead, like
+    `(λ(λ(2 (2 1))))`.
+
+    If `minimal` is True, parentheses are left out wherever application being left
+    associative and abstractions extending as far right as possible make them
+    unnecessary, like `λa.λb.a (a b)` or `λλ2 (2 1)`. Both of those forms can be
+    read back by `text.parse_term`.
+
+    `depth` is the number of binders the expression is under, for printing
+    subterms with the names they'd have in their enclosing term.
+    """
+    cache = list[str]()
+
+    def name(level: int) -> str:
+        while len(cache) <= level:
+            cache.append(variable_name(len(cache), names))
+        return cache[level]
+
+    parts = list[str]()
+    # pending expressions and literal strings, in reverse order
+    # for expressions, whether nothing follows them before the end of the enclosing
+    # parentheses, so an abstraction there doesn't need its own
+    stack: list[tuple[Expression, int, bool] | str] = [(expression, depth, True)]
+
+    while stack:
+        if len(parts) >= _CHUNK:
+            sink.write("".join(parts))
+            parts.clear()
+
+        match stack.pop():
+            case str() as part:
+                parts.append(part)
+
+            case Variable(index=index), depth, _:
+                if de_bruijn:
+                    parts.append(str(index))
+                elif depth - index >= 0:
+                    parts.append(name(depth - index))
+                else:
+                    raise ValueError(
+                        f"Variable with index {index} is free at depth {depth}"
+                    )
+
+            case Abstraction(body=body), depth, last:
+                binder = "λ" if de_bruijn else f"λ{name(depth)}."
+                if not minimal:
+                    parts.append("(" + binder)
+                    stack += [")", (body, depth + 1, True)]
+                elif last:
+                    parts.append(binder)
+                    stack.append((body, depth + 1, True))
+                else:
+                    parts.append("(" + binder)
+                    stack += [")", (body, depth + 1, True)]
+
+            case Application(function=function, argument=argument), depth, last:
+                if not minimal:
+                    parts.append("(")
+                    stack.append(")")
+                    stack.append((argument, depth, True))
+                    if de_bruijn or _needs_space(function, argument, depth, name):
+                        stack.append(" ")
+                    stack.append((function, depth, False))
+                    continue
+
+                # applications are left associative, so only an application as the
+                # argument needs parentheses
+                if isinstance(argument, Application):
+                    stack += [")", (argument, depth, True), " ("]
+                else:
+                    stack += [(argument, depth, last), " "]
+                stack.append((function, depth, False))
+
+    sink.write("".join(parts))
+
+
+def _needs_space(
+    function: Expression,
+    argument: Expression,
+    depth: int,
+    name: Callable[[int], str],
+) -> bool:
+    match function, argument:
+        case Variable(index=left), Variable(index=right):
+            return len(name(depth - left)) > 1 or len(name(depth - right)) > 1
+        case _:
+            return False
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Callable
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+
+
+class Strategy(StrEnum):
+    NORMAL = "normal"
+    """Contract the leftmost outermost redex first."""
+    APPLICATIVE = "applicative"
+    """Contract the leftmost innermost redex first."""
+
+
+@dataclass
+class Reduction:
+    expression: Expression
+    steps: int
+    normal_form: bool
+    """False if reduction stopped early because of a step limit or timeout."""
+
+
+def reduce(
+    expression: Expression,
+    strategy: Strategy = Strategy.NORMAL,
+    *,
+    max_steps: int | None = None,
+    timeout: float | None = None,
+) -> Reduction:
+    """Beta-reduces `expression` until it's in normal form.
+
+    Stops early after `max_steps` beta steps or `timeout` seconds, whichever comes
+    first.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    steps = 0
+
+    while True:
+        if max_steps is not None and steps >= max_steps:
+            return Reduction(expression, steps, normal_form=False)
+        if deadline is not None and time.monotonic() >= deadline:
+            return Reduction(expression, steps, normal_form=False)
+
+        reduced = step(expression, strategy)
+        if reduced is None:
+            return Reduction(expression, steps, normal_form=True)
+
+        expression = reduced
+        steps += 1
+
+
+def step(
+    expression: Expression,
+    strategy: Strategy = Strategy.NORMAL,
+) -> Expression | None:
+    """Contracts one redex, or returns None if `expression` is in normal form.
+
+    Only the nodes on the path from the root to the redex are rebuilt; every other
+    subtree is shared with `expression`.
+    """
+    match strategy:
+        case Strategy.NORMAL:
+            path = find_outermost_redex(expression)
+        case Strategy.APPLICATIVE:
+            path = find_innermost_redex(expression)
+
+    if path is None:
+        return None
+
+    redex, path = path
+    assert isinstance(redex.function, Abstraction)
+    return rebuild(substitute(redex.function.body, redex.argument), path)
+
+
+def shift(expression: Expression, amount: int, cutoff: int = 0) -> Expression:
+    """Adds `amount` to the index of every variable that's free above `cutoff`
+    binders."""
+    if amount == 0:
+        return expression
+
+    def replace(variable: Variable, depth: int) -> Expression:
+        if variable.index > cutoff + depth:
+            return Variable(variable.index + amount)
+        return variable
+
+    return _map_variables(expression, replace)
+
+
+def substitute(body: Expression, argument: Expression) -> Expression:
+    """Returns the result of applying `Abstraction(body)` to `argument`.
+
+    Occurrences of the abstraction's variable are replaced with `argument`, and the
+    other free variables of `body` are shifted down to account for the removed
+    binder.
+    """
+    shifted = dict[int, Expression]()
+
+    def replace(variable: Variable, depth: int) -> Expression:
+        if variable.index == depth + 1:
+            if (result := shifted.get(depth)) is None:
+                result = shifted[depth] = shift(argument, depth)
+            return result
+        if variable.index > depth + 1:
+            return Variable(variable.index - 1)
+        return variable
+
+    return _map_variables(body, replace)
+
+
+# linked list of (parent, child slot) pairs from a node back up to the root
+type ExpressionPath = tuple[Expression, int, ExpressionPath] | None
+
+
+def rebuild(result: Expression, path: ExpressionPath) -> Expression:
+    """Puts `result` in place of the node at the end of `path`, rebuilding the path
+    back up to the root."""
+    while path is not None:
+        parent, slot, path = path
+        match parent:
+            case Abstraction():
+                result = Abstraction(result)
+            case Application() if slot == 0:
+                result = Application(result, parent.argument)
+            case Application():
+                result = Application(parent.function, result)
+            case Variable():
+                raise AssertionError("Variables have no children")
+    return result
+
+
+def find_outermost_redex(
+    expression: Expression,
+) -> tuple[Application, ExpressionPath] | None:
+    """Returns the leftmost outermost redex and the path to it, or None if
+    `expression` is in normal form."""
+    stack: list[tuple[Expression, ExpressionPath]] = [(expression, None)]
+    while stack:
+        node, path = stack.pop()
+        match node:
+            case Application(function=Abstraction()):
+                return node, path
+            case Application(function=function, argument=argument):
+                stack += [(argument, (node, 1, path)), (function, (node, 0, path))]
+            case Abstraction(body=body):
+                stack.append((body, (node, 0, path)))
+            case Variable():
+                pass
+    return None
+
+
+def find_innermost_redex(
+    expression: Expression,
+) -> tuple[Application, ExpressionPath] | None:
+    """Returns the leftmost innermost redex and the path to it, or None if
+    `expression` is in normal form."""
+    # post-order, so the first redex found contains no other redexes
+    stack: list[tuple[Expression, ExpressionPath, bool]] = [(expression, None, False)]
+    while stack:
+        node, path, children_done = stack.pop()
+        match node:
+            case Application(function=Abstraction()) if children_done:
+                return node, path
+            case Application(function=function, argument=argument):
+                if not children_done:
+                    stack += [
+                        (node, path, True),
+                        (argument, (node, 1, path), False),
+                        (function, (node, 0, path), False),
+                    ]
+            case Abstraction(body=body):
+                stack.append((body, (node, 0, path), False))
+            case Variable():
+                pass
+    return None
+
+
+def _map_variables(
+    expression: Expression,
+    replace: Callable[[Variable, int], Expression],
+) -> Expression:
+    """Rebuilds `expression` with each variable replaced by `replace(variable, depth)`,
+    where `depth` is the number of binders between the variable and the root.
+
+    Subtrees where nothing was replaced are returned as-is rather than copied.
+    """
+    stack: list[tuple[Expression, int, bool]] = [(expression, 0, False)]
+    results = list[Expression]()
+
+    while stack:
+        node, depth, children_done = stack.pop()
+        match node:
+            case Variable():
+                results.append(replace(node, depth))
+            case Abstraction(body=body) if children_done:
+                new_body = results.pop()
+                results.append(node if new_body is body else Abstraction(new_body))
+            case Abstraction(body=body):
+                stack += [(node, depth, True), (body, depth + 1, False)]
+            case Application(function=function, argument=argument) if children_done:
+                new_argument = results.pop()
+                new_function = results.pop()
+                if new_function is function and new_argument is argument:
+                    results.append(node)
+                else:
+                    results.append(Application(new_function, new_argument))
+            case Application(function=function, argument=argument):
+                stack += [
+                    (node, depth, True),
+                    (argument, depth, False),
+                    (function, depth, False),
+                ]
+
+    return results.pop()
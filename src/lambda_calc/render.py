@@ -0,0 +1,128 @@
+"""Renders expressions as lambda diagrams, the inverse of `parse_diagram`.
+
+Layout follows Tromp's standard style: every variable gets a column of its own, four
+pixels wide, abstractions are horizontal bars over their body, and applications
+link the output lines of their function and argument just below the taller of the
+two, continuing down from the function's line.
+"""
+
+from __future__ import annotations
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.diagram import LambdaDiagram
+
+# linked list of the rows of enclosing abstraction bars, innermost first
+type _Bars = tuple[int, _Bars] | None
+
+
+def render_diagram(expression: Expression) -> LambdaDiagram:
+    sizes = _measure(expression)
+    cells, height, _ = sizes[expression]
+
+    width = 4 * cells - 1
+    pixels = bytearray(width * height)
+    ones = memoryview(b"\x01" * max(width, height))
+
+    def hline(y: int, min_x: int, max_x: int):
+        start = y * width + min_x
+        pixels[start : start + max_x - min_x + 1] = ones[: max_x - min_x + 1]
+
+    def vline(x: int, min_y: int, max_y: int):
+        if max_y >= min_y:
+            start = min_y * width + x
+            stop = max_y * width + x + 1
+            pixels[start:stop:width] = ones[: max_y - min_y + 1]
+
+    # the top row is always blank, since every closed term starts with abstractions,
+    # so draw from y=-1 to put their bars at the top of the diagram
+    # the extra row at the bottom lets the output line stick out below the term
+    stack: list[tuple[Expression, int, int, int, _Bars]] = [
+        (expression, 0, -1, height, None)
+    ]
+
+    while stack:
+        # cell: leftmost column of the term, in units of 4 pixels
+        # top: first row of the term
+        # bottom: row where the term's output line should stop, exclusive
+        node, cell, top, bottom, bars = stack.pop()
+        x = 4 * cell + 1
+
+        match node:
+            case Variable(index=index):
+                binder = bars
+                for _ in range(index - 1):
+                    if binder is None:
+                        break
+                    binder = binder[1]
+                if binder is None:
+                    raise ValueError(f"Can't render free variable: {node}")
+                vline(x, binder[0] + 1, bottom - 1)
+
+            case Abstraction(body=body):
+                cells, _, _ = sizes[node]
+                hline(top + 1, 4 * cell, 4 * (cell + cells) - 2)
+                stack.append((body, cell, top + 2, bottom, (top + 1, bars)))
+
+            case Application(function=function, argument=argument):
+                function_cells, function_height, function_short = sizes[function]
+                _, argument_height, argument_short = sizes[argument]
+                link = top + max(
+                    function_height + function_short,
+                    argument_height + argument_short,
+                )
+                argument_cell = cell + function_cells
+
+                hline(link, x, 4 * argument_cell + 1)
+                vline(x, link + 1, bottom - 1)
+                stack += [
+                    (argument, argument_cell, top, link, bars),
+                    (function, cell, top, link, bars),
+                ]
+
+    return LambdaDiagram.from_pixels(pixels, width, height)
+
+
+def _measure(expression: Expression) -> dict[Expression, tuple[int, int, bool]]:
+    """Returns the width in cells, the height in rows, and whether the term is an
+    abstraction of a lone variable for every subterm.
+
+    The variable of such an abstraction needs to stick out one row further before
+    it can be linked into an application, otherwise the parser would see the link
+    in place of the abstraction's body.
+    """
+    sizes = dict[Expression, tuple[int, int, bool]]()
+    stack: list[tuple[Expression, bool]] = [(expression, False)]
+
+    while stack:
+        node, children_done = stack.pop()
+        if node in sizes:
+            continue
+
+        match node:
+            case Variable():
+                sizes[node] = (1, 1, False)
+
+            case Abstraction(body=body) if children_done:
+                cells, height, short = sizes[body]
+                sizes[node] = (cells, height + 2, short or isinstance(body, Variable))
+
+            case Abstraction(body=body):
+                stack += [(node, True), (body, False)]
+
+            case Application(function=function, argument=argument) if children_done:
+                function_cells, function_height, function_short = sizes[function]
+                argument_cells, argument_height, argument_short = sizes[argument]
+                sizes[node] = (
+                    function_cells + argument_cells,
+                    max(
+                        function_height + function_short,
+                        argument_height + argument_short,
+                    )
+                    + 2,
+                    False,
+                )
+
+            case Application(function=function, argument=argument):
+                stack += [(node, True), (argument, False), (function, False)]
+
+    return sizes
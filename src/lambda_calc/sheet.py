@@ -0,0 +1,185 @@
+"""Sheets of many diagrams.
+
+A sheet is a single image holding any number of diagrams laid out next to each
+other. Each diagram is a connected component of the sheet, found by labelling runs
+of pixels in one pass over its rows, and is parsed as if it had its own image.
+"""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+
+from lambda_calc.ast import Expression
+from lambda_calc.batch import parse_diagrams
+from lambda_calc.diagram import LambdaDiagram
+
+
+@dataclass(frozen=True)
+class Box:
+    """Bounding box of a diagram on a sheet, inclusive."""
+
+    min_x: int
+    min_y: int
+    max_x: int
+    max_y: int
+
+    @property
+    def width(self):
+        return self.max_x - self.min_x + 1
+
+    @property
+    def height(self):
+        return self.max_y - self.min_y + 1
+
+
+def parse_sheet(
+    sheet: LambdaDiagram,
+    *,
+    jobs: int | None = 1,
+) -> list[tuple[Box, Expression]]:
+    """Parses every diagram on a sheet, in the order of their top left corners.
+
+    The diagrams are parsed with `parse_diagrams`, so pass `jobs` to parse them in
+    that many processes, or None for one per CPU.
+    """
+    found = find_diagrams(sheet)
+    results = list[tuple[Box, Expression]]()
+    for (box, _), result in zip(
+        found, parse_diagrams((diagram for _, diagram in found), jobs=jobs)
+    ):
+        if result.error is not None:
+            raise ValueError(
+                f"Failed to parse diagram at {box.min_x}, {box.min_y}: {result.error}"
+            ) from result.error
+        assert result.expression is not None
+        results.append((box, result.expression))
+    return results
+
+
+def find_diagrams(sheet: LambdaDiagram) -> list[tuple[Box, LambdaDiagram]]:
+    """Splits a sheet into its diagrams, in the order of their top left corners.
+
+    Pixels are connected the same way `parse_diagram` walks them: to their
+    neighbours, and from the start of an abstraction to the pixels two above and
+    below it. Each diagram is cropped to its bounding box, without any pixels of
+    other diagrams that fall inside it.
+    """
+    width = sheet.width
+    height = sheet.height
+    grid = sheet.pixels
+
+    # runs of set pixels in each row, and the label of each run
+    # labels are numbered in scan order and merged into the smallest one, so each
+    # component is labelled by its first run
+    starts = list[list[int]]()
+    ends = list[list[int]]()
+    labels = list[list[int]]()
+    parents = list[int]()
+    boxes = list[list[int]]()
+
+    def find(label: int) -> int:
+        root = label
+        while parents[root] != root:
+            root = parents[root]
+        while parents[label] != root:
+            parents[label], label = root, parents[label]
+        return root
+
+    def union(a: int, b: int) -> int:
+        a, b = sorted((find(a), find(b)))
+        if a != b:
+            parents[b] = a
+            box, other = boxes[a], boxes[b]
+            box[0] = min(box[0], other[0])
+            box[1] = min(box[1], other[1])
+            box[2] = max(box[2], other[2])
+            box[3] = max(box[3], other[3])
+        return a
+
+    # runs on the row above, which is empty to begin with
+    above_starts: list[int] = []
+    above_ends: list[int] = []
+    above_labels: list[int] = []
+    for y in range(height):
+        row = sheet.row(y)
+        row_starts = list[int]()
+        row_ends = list[int]()
+        row_labels = list[int]()
+
+        # first run above that can still overlap a run on this row
+        j: int = 0
+        x = row.find(1)
+        while x >= 0:
+            end = row.find(0, x)
+            end = (width if end < 0 else end) - 1
+
+            # join the runs above that overlap this one
+            while j < len(above_ends) and above_ends[j] < x:
+                j += 1
+            label = -1
+            k = j
+            while k < len(above_starts) and above_starts[k] <= end:
+                label = (
+                    find(above_labels[k])
+                    if label < 0
+                    else union(label, above_labels[k])
+                )
+                k += 1
+            # the last of them might overlap the next run too
+            j = max(j, k - 1)
+
+            if label < 0:
+                label = len(parents)
+                parents.append(label)
+                boxes.append([x, y, end, y])
+            else:
+                box = boxes[label]
+                box[0] = min(box[0], x)
+                box[2] = max(box[2], end)
+                box[3] = y
+
+            row_starts.append(x)
+            row_ends.append(end)
+            row_labels.append(label)
+            x = row.find(1, end + 1)
+
+        starts.append(row_starts)
+        ends.append(row_ends)
+        labels.append(row_labels)
+        above_starts, above_ends, above_labels = row_starts, row_ends, row_labels
+
+    # join the start of each abstraction to the runs two rows above and below
+    for y in range(height):
+        for x, end, label in zip(starts[y], ends[y], labels[y]):
+            index = y * width + x
+            if (
+                end > x
+                and not (y > 0 and grid[index - width])
+                and not (y < height - 1 and grid[index + width])
+            ):
+                for other_y in (y - 2, y + 2):
+                    if 0 <= other_y < height:
+                        i = bisect.bisect_right(starts[other_y], x) - 1
+                        if i >= 0 and ends[other_y][i] >= x:
+                            union(label, labels[other_y][i])
+
+    crops = dict[int, bytearray]()
+    for label in range(len(parents)):
+        if parents[label] == label:
+            min_x, min_y, max_x, max_y = boxes[label]
+            crops[label] = bytearray((max_x - min_x + 1) * (max_y - min_y + 1))
+
+    ones = b"\x01" * width
+    for y in range(height):
+        for x, end, label in zip(starts[y], ends[y], labels[y]):
+            root = find(label)
+            min_x, min_y, max_x, _ = boxes[root]
+            start = (y - min_y) * (max_x - min_x + 1) + x - min_x
+            crops[root][start : start + end - x + 1] = ones[: end - x + 1]
+
+    diagrams = list[tuple[Box, LambdaDiagram]]()
+    for label, pixels in crops.items():
+        box = Box(*boxes[label])
+        diagrams.append((box, LambdaDiagram.from_pixels(pixels, box.width, box.height)))
+    return diagrams
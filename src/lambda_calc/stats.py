@@ -0,0 +1,102 @@
+"""Instrumentation for `parse_diagram`.
+
+Pass a `ParseStats` to `parse_diagram` to collect timings and counts for each stage
+of parsing. The same object can be passed to many calls to add up their totals.
+When no stats object is given, nothing is measured.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+
+from lambda_calc.ast import Abstraction, Application, Expression
+
+
+@dataclass
+class StageStats:
+    seconds: float = 0.0
+    blocks: int = 0
+    """Net number of memory blocks allocated by the stage and still alive after it,
+    from `sys.getallocatedblocks`."""
+
+
+@dataclass
+class ParseStats:
+    diagrams: int = 0
+    """Number of diagrams parsed, including cache hits."""
+    cache_hits: int = 0
+    pixels: int = 0
+    """Total size of the diagrams, in pixels."""
+    walked_pixels: int = 0
+    """Pixels reachable from the top left, which make up the term."""
+    abstractions: int = 0
+    applications: int = 0
+    runs: int = 0
+    """Horizontal and vertical runs of pixels that tokens were stored as."""
+    nodes: int = 0
+    """Nodes in the parsed expressions, counting shared subterms every time."""
+
+    walk: StageStats = field(default_factory=StageStats)
+    tokenize: StageStats = field(default_factory=StageStats)
+    parse: StageStats = field(default_factory=StageStats)
+    reduce: StageStats = field(default_factory=StageStats)
+    """Reducing parsed terms, when `batch.parse_diagrams` is asked to. It isn't part
+    of `seconds` or `summary`."""
+
+    @property
+    def seconds(self):
+        return self.walk.seconds + self.tokenize.seconds + self.parse.seconds
+
+    def add(self, other: ParseStats):
+        """Adds the totals of `other` to these, such as stats collected by another
+        process."""
+        for f in fields(self):
+            match getattr(self, f.name), getattr(other, f.name):
+                case StageStats() as stage, StageStats() as other_stage:
+                    stage.seconds += other_stage.seconds
+                    stage.blocks += other_stage.blocks
+                case value, other_value:
+                    setattr(self, f.name, value + other_value)
+
+    @contextmanager
+    def measure(self, stage: StageStats):
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage.seconds += time.perf_counter() - start
+            stage.blocks += sys.getallocatedblocks() - blocks
+
+    def count_nodes(self, expression: Expression):
+        stack = [expression]
+        while stack:
+            self.nodes += 1
+            match stack.pop():
+                case Abstraction(body=body):
+                    stack.append(body)
+                case Application(function=function, argument=argument):
+                    stack += [function, argument]
+                case _:
+                    pass
+
+    def summary(self) -> str:
+        lines = [
+            f"diagrams: {self.diagrams} ({self.cache_hits} cached)",
+            f"pixels: {self.pixels} ({self.walked_pixels} walked)",
+            f"tokens: {self.abstractions} abstractions, {self.applications} "
+            f"applications, {self.runs} runs",
+            f"nodes: {self.nodes}",
+        ]
+        for name, stage in [
+            ("walk", self.walk),
+            ("tokenize", self.tokenize),
+            ("parse", self.parse),
+        ]:
+            lines.append(
+                f"{name}: {stage.seconds * 1000:.3f} ms, {stage.blocks:+} blocks"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,144 @@
+"""Parser for lambda terms written as text.
+
+Both named and de Bruijn notation are supported, and can be mixed:
+
+- `λx.x`, `\\x.x`, `λx y.x` (several binders at once)
+- `λ1`, `λλ2 (1 1)`, `\\ \\ 2` (de Bruijn indices start at 1)
+
+Application is left associative and abstraction bodies extend as far right as
+possible. Comments start with `#` or `--` and run to the end of the line.
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+
+_NAME = r"[^\W\dλ][^\Wλ]*'*"
+
+# each token comes with the whitespace before it, and whitespace at the end of the
+# text and comments match without a group, so their `lastgroup` is None
+_TOKENS = re.compile(
+    rf"""
+    \s*(?:
+        (?P<binders>[λ\\]\s*(?P<names>{_NAME}(?:\s+{_NAME})*)\s*\.)
+        | (?P<lambda>[λ\\])
+        | (?P<name>{_NAME})
+        | (?P<index>\d+)
+        | (?P<open>\()
+        | (?P<close>\))
+        | (?:\#|--)[^\n]*
+        | $
+        | (?P<error>.)
+    )
+    """,
+    re.VERBOSE,
+)
+
+
+def parse_term(text: str) -> Expression:
+    """Parses a term, in time linear in the length of the text.
+
+    Tokens come from one regex, and terms are built by a shift-reduce loop with an
+    explicit stack, so nesting depth is only limited by memory. Names are resolved
+    to de Bruijn indices as they're read.
+    """
+    # open groups, innermost last: the top level, parentheses, and abstraction
+    # bodies, which end wherever the group around them does
+    # for each, the application read so far, if any, and how many binders it closes
+    terms: list[Expression | None] = [None]
+    binders = [0]
+    # every bound name, outermost first, with None for de Bruijn binders
+    bound = list[str | None]()
+    # positions in `bound` of each name, innermost last
+    levels = dict[str, list[int]]()
+    # variables by index, which is quicker than building them from scratch each time
+    variables = dict[int, Variable]()
+
+    def close_abstractions():
+        while binders[-1]:
+            body = terms.pop()
+            if body is None:
+                raise ValueError("Invalid lambda term: expected a body")
+            for _ in range(binders.pop()):
+                body = Abstraction(body)
+                if (name := bound.pop()) is not None:
+                    levels[name].pop()
+            function = terms[-1]
+            terms[-1] = body if function is None else Application(function, body)
+
+    for token in _TOKENS.finditer(text):
+        match token.lastgroup:
+            case None:
+                continue
+            case "name":
+                name = token["name"]
+                if not (positions := levels.get(name)):
+                    raise ValueError(f"Unbound variable: {name}")
+                index = len(bound) - positions[-1]
+                if (atom := variables.get(index)) is None:
+                    atom = variables[index] = Variable(index)
+            case "index":
+                if (index := int(token["index"])) < 1:
+                    raise ValueError(f"De Bruijn indices start at 1, but got {index}")
+                if (atom := variables.get(index)) is None:
+                    atom = variables[index] = Variable(index)
+            case "binders":
+                names = token["names"].split()
+                for name in names:
+                    levels.setdefault(name, []).append(len(bound))
+                    bound.append(name)
+                terms.append(None)
+                binders.append(len(names))
+                continue
+            case "lambda":
+                bound.append(None)
+                terms.append(None)
+                binders.append(1)
+                continue
+            case "open":
+                terms.append(None)
+                binders.append(0)
+                continue
+            case "close":
+                close_abstractions()
+                if len(terms) == 1:
+                    raise ValueError(
+                        f"Invalid lambda term: unmatched ')' at {token.start('close')}"
+                    )
+                if (atom := terms.pop()) is None:
+                    raise ValueError(
+                        f"Invalid lambda term: empty parentheses at {token.start('close')}"
+                    )
+                binders.pop()
+            case _:
+                raise ValueError(
+                    f"Invalid lambda term: unexpected {token['error']!r} at {token.start('error')}"
+                )
+
+        # application is left associative
+        function = terms[-1]
+        terms[-1] = atom if function is None else Application(function, atom)
+
+    close_abstractions()
+    if len(terms) > 1:
+        raise ValueError("Invalid lambda term: unclosed '('")
+    if (term := terms[0]) is None:
+        raise ValueError("Invalid lambda term: expected a term")
+    return term
+
+
+def parse_terms(lines: Iterable[str]) -> Iterator[Expression]:
+    """Parses one term per line, skipping blank lines and comments."""
+    for line in lines:
+        if line.strip() and not line.lstrip().startswith(("#", "--")):
+            yield parse_term(line)
+
+
+def load_terms(path: str | Path) -> Iterator[Expression]:
+    """Lazily parses a file with one term per line."""
+    with open(path, encoding="utf-8") as f:
+        yield from parse_terms(f)
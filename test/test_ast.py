@@ -0,0 +1,79 @@
+import copy
+import pickle
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from lambda_calc.ast import (
+    Abstraction,
+    Application,
+    Expression,
+    Variable,
+    display_with_names,
+)
+
+
+@pytest.mark.parametrize(
+    ["expression", "want"],
+    [
+        (Abstraction(Variable(1)), "(λa.a)"),
+        (Abstraction(Abstraction(Variable(2))), "(λa.(λb.a))"),
+        (
+            Abstraction(
+                Abstraction(
+                    Abstraction(
+                        Application(
+                            Application(Variable(3), Variable(1)),
+                            Application(Variable(2), Variable(1)),
+                        )
+                    )
+                )
+            ),
+            "(λa.(λb.(λc.((ac)(bc)))))",
+        ),
+    ],
+)
+def test_display_with_names(expression: Expression, want: str):
+    assert display_with_names(expression) == want
+
+
+def test_display_with_names_deep():
+    depth = 10_000
+    expression: Expression = Variable(1)
+    for _ in range(depth):
+        expression = Application(Variable(2), expression)
+
+    got = display_with_names(Abstraction(Abstraction(expression)))
+
+    assert got == "(λa.(λb." + "(a" * depth + "b" + ")" * depth + "))"
+
+
+def test_nodes_are_interned():
+    a = Abstraction(Application(Variable(1), Variable(2)))
+    b = Abstraction(Application(Variable(1), Variable(2)))
+
+    assert a is b
+    assert hash(a) == hash(b)
+    assert a != Abstraction(Application(Variable(2), Variable(1)))
+    assert len({a, b, Variable(1), Variable(1)}) == 2
+
+
+def test_nodes_are_frozen():
+    node = Abstraction(Variable(1))
+    with pytest.raises(FrozenInstanceError):
+        node.body = Variable(2)  # pyright: ignore[reportAttributeAccessIssue]
+    assert not hasattr(node, "__dict__")
+
+
+def test_nodes_survive_copy_and_pickle():
+    node = Abstraction(Application(Variable(1), Variable(1)))
+    assert copy.deepcopy(node) is node
+    assert pickle.loads(pickle.dumps(node)) is node
+
+
+def test_nodes_match_by_position():
+    match Application(Variable(3), Abstraction(Variable(1))):
+        case Application(Variable(index), Abstraction(body)):
+            assert (index, body) == (3, Variable(1))
+        case _:
+            pytest.fail("No match")
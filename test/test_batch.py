@@ -0,0 +1,85 @@
+import functools
+
+import pytest
+
+from lambda_calc.ast import Abstraction, Application, Variable
+from lambda_calc.batch import NoNormalForm, parse_diagrams
+from lambda_calc.church import numeral
+from lambda_calc.diagram import LambdaDiagram
+from lambda_calc.machine import evaluate
+from lambda_calc.parser import parse_diagram
+from lambda_calc.render import render_diagram
+from lambda_calc.stats import ParseStats
+
+EXPRESSIONS = [numeral(n) for n in range(10)]
+
+# the top left pixel is blank, so this can't be parsed
+INVALID = LambdaDiagram([[False, True], [True, True]])
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+@pytest.mark.parametrize("chunksize", [1, 3])
+def test_parse_diagrams_ordered(jobs: int, chunksize: int):
+    diagrams = [render_diagram(expression) for expression in EXPRESSIONS]
+    diagrams.insert(4, INVALID)
+
+    results = list(parse_diagrams(diagrams, jobs=jobs, chunksize=chunksize))
+
+    assert [result.index for result in results] == list(range(len(diagrams)))
+    assert not results[4].ok
+    assert results[4].expression is None
+    del results[4]
+    assert all(result.ok for result in results)
+    assert [result.expression for result in results] == EXPRESSIONS
+
+
+def test_parse_diagrams_unordered():
+    diagrams = (render_diagram(expression) for expression in EXPRESSIONS)
+
+    results = list(parse_diagrams(diagrams, jobs=2, chunksize=2, ordered=False))
+
+    assert sorted(result.index for result in results) == list(range(len(EXPRESSIONS)))
+    for result in results:
+        assert result.expression == EXPRESSIONS[result.index]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_parse_diagrams_stats(jobs: int):
+    diagrams = [render_diagram(expression) for expression in EXPRESSIONS]
+    want = ParseStats()
+    for diagram in diagrams:
+        parse_diagram(diagram, stats=want)
+
+    stats = ParseStats()
+    list(parse_diagrams(diagrams, jobs=jobs, chunksize=3, stats=stats))
+
+    assert stats.diagrams == want.diagrams == len(diagrams)
+    assert stats.walked_pixels == want.walked_pixels
+    assert stats.nodes == want.nodes
+    assert stats.seconds > 0
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_parse_diagrams_reduce(jobs: int):
+    # λx.x applied to each numeral, and Ω, which has no normal form
+    identity = Abstraction(Variable(1))
+    omega = Abstraction(Application(Variable(1), Variable(1)))
+    expressions = [Application(identity, expression) for expression in EXPRESSIONS]
+    expressions.append(Application(omega, omega))
+    diagrams = [render_diagram(expression) for expression in expressions]
+    stats = ParseStats()
+
+    results = list(
+        parse_diagrams(
+            diagrams,
+            jobs=jobs,
+            chunksize=3,
+            stats=stats,
+            reduce=functools.partial(evaluate, max_steps=50),
+        )
+    )
+
+    assert [result.expression for result in results[:-1]] == EXPRESSIONS
+    assert isinstance(results[-1].error, NoNormalForm)
+    assert results[-1].error.steps >= 50
+    assert stats.reduce.seconds > 0
@@ -0,0 +1,97 @@
+import io
+
+import pytest
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.blc import (
+    decode,
+    decode_bits,
+    encode,
+    encode_bits,
+    read_terms,
+    write_terms,
+)
+
+ID = Abstraction(Variable(1))
+K = Abstraction(Abstraction(Variable(2)))
+S = Abstraction(
+    Abstraction(
+        Abstraction(
+            Application(
+                Application(Variable(3), Variable(1)),
+                Application(Variable(2), Variable(1)),
+            )
+        )
+    )
+)
+OMEGA = Application(
+    Abstraction(Application(Variable(1), Variable(1))),
+    Abstraction(Application(Variable(1), Variable(1))),
+)
+
+
+@pytest.mark.parametrize(
+    ["expression", "want_bits"],
+    [
+        (ID, "0010"),
+        (K, "0000110"),
+        (S, "00000001011110100111010"),
+        (OMEGA, "010001101000011010"),
+    ],
+)
+def test_encode_bits(expression: Expression, want_bits: str):
+    assert encode_bits(expression) == want_bits
+    assert decode_bits(want_bits) == expression
+
+
+@pytest.mark.parametrize("expression", [ID, K, S, OMEGA])
+def test_encode(expression: Expression):
+    data = encode(expression)
+    assert len(data) == (len(encode_bits(expression)) + 7) // 8
+    assert decode(data) == expression
+    assert decode(memoryview(bytearray(data))) == expression
+
+
+@pytest.mark.parametrize("bits", ["", "001", "0011", "00101"])
+def test_decode_bits_invalid(bits: str):
+    with pytest.raises(ValueError):
+        decode_bits(bits)
+
+
+def test_decode_ignores_rest():
+    # the rest doesn't have to be a valid term, since it's never read
+    assert decode(encode(K) + encode(S)[:1]) == K
+
+
+def test_decode_incomplete():
+    with pytest.raises(ValueError):
+        decode(encode(S)[:1])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 1024])
+def test_write_read_terms(chunk_size: int):
+    expressions = [ID, K, S, OMEGA, Variable(20), S]
+    stream = io.BytesIO()
+
+    written = write_terms(expressions, stream)
+
+    bits = "".join(map(encode_bits, expressions))
+    assert written == len(stream.getvalue()) == (len(bits) + 7) // 8
+    stream.seek(0)
+    assert list(read_terms(stream, chunk_size)) == expressions
+
+
+def test_read_terms_truncated():
+    stream = io.BytesIO(encode(S) + encode(S)[:1])
+    with pytest.raises(ValueError):
+        list(read_terms(stream))
+
+
+def test_deep():
+    depth = 10_000
+    expression: Expression = Variable(1)
+    for _ in range(depth):
+        expression = Application(Variable(2), expression)
+    expression = Abstraction(Abstraction(expression))
+
+    assert decode(encode(expression)) == expression
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from lambda_calc.cache import ParseCache
+from lambda_calc.church import numeral
+from lambda_calc.diagram import LambdaDiagram
+from lambda_calc.parser import parse_diagram
+from lambda_calc.render import render_diagram
+
+
+def test_hits_and_misses():
+    cache = ParseCache()
+    diagram = render_diagram(numeral(3))
+
+    assert parse_diagram(diagram, cache) == numeral(3)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    # a different object with the same content
+    copy = LambdaDiagram.from_str(str(diagram))
+    assert parse_diagram(copy, cache) == numeral(3)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(cache) == 1
+
+
+def test_key_depends_on_size():
+    wide = LambdaDiagram.from_pixels(bytearray(6), 3, 2)
+    tall = LambdaDiagram.from_pixels(bytearray(6), 2, 3)
+
+    assert ParseCache.key(wide) != ParseCache.key(tall)
+
+
+def test_lru_eviction():
+    cache = ParseCache(maxsize=2)
+    diagrams = [render_diagram(numeral(n)) for n in range(3)]
+
+    parse_diagram(diagrams[0], cache)
+    parse_diagram(diagrams[1], cache)
+    parse_diagram(diagrams[0], cache)  # now most recently used
+    parse_diagram(diagrams[2], cache)  # evicts 1
+
+    assert len(cache) == 2
+    assert cache.get(ParseCache.key(diagrams[0])) == numeral(0)
+    assert cache.get(ParseCache.key(diagrams[1])) is None
+
+
+def test_disk_store(tmp_path: Path):
+    diagram = render_diagram(numeral(5))
+
+    parse_diagram(diagram, ParseCache(directory=tmp_path))
+
+    cache = ParseCache(directory=tmp_path)
+    assert cache.get(ParseCache.key(diagram)) == numeral(5)
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert len(cache) == 1
@@ -0,0 +1,144 @@
+import pytest
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.church import (
+    EXP,
+    FALSE,
+    MULT,
+    PLUS,
+    PRED,
+    SUCC,
+    SUCC_ALT,
+    TRUE,
+    as_boolean,
+    as_numeral,
+    as_pair,
+    boolean,
+    evaluate,
+    numeral,
+    pair,
+)
+from lambda_calc.reduction import reduce
+
+from .test_machine import ID, OMEGA
+from .test_reduction import apply
+
+
+@pytest.mark.parametrize(
+    ["n", "body"],
+    [
+        (0, Variable(1)),
+        (1, Application(Variable(2), Variable(1))),
+        (2, Application(Variable(2), Application(Variable(2), Variable(1)))),
+    ],
+)
+def test_numeral(n: int, body: Expression):
+    assert numeral(n) == Abstraction(Abstraction(body))
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 10])
+def test_as_numeral(n: int):
+    assert as_numeral(numeral(n)) == n
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        ID,
+        TRUE,
+        Abstraction(Abstraction(Application(Variable(1), Variable(2)))),
+        Abstraction(Abstraction(Application(Variable(2), Variable(2)))),
+        Abstraction(Abstraction(Abstraction(Variable(1)))),
+    ],
+)
+def test_as_numeral_invalid(expression: Expression):
+    assert as_numeral(expression) is None
+
+
+def test_as_boolean():
+    assert as_boolean(boolean(True)) is True
+    assert as_boolean(boolean(False)) is False
+    assert as_boolean(FALSE) is as_boolean(numeral(0)) is False
+    assert as_boolean(ID) is None
+
+
+def test_as_pair():
+    # the halves can use variables bound outside the pair
+    first = Variable(1)
+    second = Abstraction(Application(Variable(1), Variable(2)))
+
+    assert as_pair(pair(first, second)) == (first, second)
+    assert as_pair(Abstraction(apply(Variable(1), Variable(1), ID))) is None
+    assert as_pair(numeral(2)) is None
+
+
+@pytest.mark.parametrize(
+    ["expression", "want"],
+    [
+        (apply(SUCC, numeral(4)), 5),
+        (apply(SUCC_ALT, numeral(0)), 1),
+        (apply(PLUS, numeral(2), numeral(3)), 5),
+        (apply(MULT, numeral(3), numeral(4)), 12),
+        (apply(EXP, numeral(3), numeral(2)), 9),
+        (apply(PRED, numeral(5)), 4),
+        (apply(PRED, numeral(0)), 0),
+        (apply(numeral(3), numeral(2)), 8),
+        # arguments that need reducing first
+        (apply(MULT, apply(PLUS, numeral(2), numeral(3)), apply(SUCC, numeral(3))), 20),
+        (apply(Abstraction(apply(MULT, Variable(1), Variable(1))), numeral(5)), 25),
+    ],
+)
+def test_evaluate(expression: Expression, want: int):
+    result = evaluate(expression)
+
+    assert result.normal_form
+    assert as_numeral(result.expression) == want
+    assert result.expression == reduce(expression).expression
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        # 0 applied to a numeral is λx.x, not 1
+        apply(numeral(0), numeral(3)),
+        apply(EXP, numeral(3), numeral(0)),
+        # not applied to enough arguments
+        apply(PLUS, numeral(2)),
+        # arguments that aren't numerals
+        apply(MULT, Variable(1), numeral(2)),
+        apply(SUCC, TRUE),
+        # arguments that are discarded, so they mustn't be reduced first
+        apply(FALSE, OMEGA, ID),
+        apply(MULT, numeral(0), OMEGA),
+        apply(EXP, OMEGA, numeral(0)),
+    ],
+)
+def test_evaluate_falls_back(expression: Expression):
+    result = evaluate(expression)
+
+    assert result.normal_form
+    assert result.expression == reduce(expression).expression
+
+
+def test_evaluate_large():
+    result = evaluate(apply(EXP, numeral(2), numeral(12)))
+
+    assert result.normal_form
+    assert result.steps == 1
+    assert as_numeral(result.expression) == 4096
+
+
+def test_evaluate_too_large():
+    # 10^10 is left to beta reduction, instead of being built in one step
+    result = evaluate(apply(EXP, numeral(10), numeral(10)), max_steps=10)
+
+    assert not result.normal_form
+
+
+def test_evaluate_limits():
+    result = evaluate(OMEGA, max_steps=100)
+    assert not result.normal_form
+    assert result.expression == OMEGA
+    assert result.steps == 100
+
+    assert not evaluate(apply(SUCC, OMEGA), max_steps=100).normal_form
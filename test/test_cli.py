@@ -0,0 +1,121 @@
+import io
+
+import pytest
+
+from lambda_calc.ast import Application
+from lambda_calc.church import numeral
+from lambda_calc.cli import main
+from lambda_calc.image import write_image
+from lambda_calc.render import render_diagram
+
+
+def _stdin(monkeypatch: pytest.MonkeyPatch, *expressions):
+    text = "\n\n\n".join(str(render_diagram(expression)) for expression in expressions)
+    monkeypatch.setattr("sys.stdin", io.StringIO(text + "\n"))
+
+
+def test_cli(tmp_path, capsys: pytest.CaptureFixture[str]):
+    paths = list[str]()
+    for n in range(3):
+        path = tmp_path / f"{n}.txt"
+        path.write_text(str(render_diagram(numeral(n))), encoding="utf-8")
+        paths.append(str(path))
+
+    assert main([*paths, "--jobs", "2"]) == 0
+
+    assert capsys.readouterr().out.splitlines() == [
+        f"{paths[0]}: (λa.(λb.b))",
+        f"{paths[1]}: (λa.(λb.(ab)))",
+        f"{paths[2]}: (λa.(λb.(a(ab))))",
+    ]
+
+
+def test_cli_image(tmp_path, capsys: pytest.CaptureFixture[str]):
+    path = tmp_path / "2.png"
+    write_image(render_diagram(numeral(2)), path, scale=3)
+
+    assert main([str(path)]) == 0
+
+    assert capsys.readouterr().out == f"{path}: (λa.(λb.(a(ab))))\n"
+
+
+@pytest.mark.parametrize(
+    ["args", "want"],
+    [
+        ([], ["(λa.(λb.b))", "(λa.(λb.(a(ab))))"]),
+        (["-f", "de-bruijn"], ["(λ(λ1))", "(λ(λ(2 (2 1))))"]),
+        (["-f", "blc"], ["000010", "0000011100111010"]),
+        (["--jobs", "2", "--chunksize", "1"], ["(λa.(λb.b))", "(λa.(λb.(a(ab))))"]),
+    ],
+)
+def test_cli_stdin(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    args: list[str],
+    want: list[str],
+):
+    _stdin(monkeypatch, numeral(0), numeral(2))
+
+    assert main(args) == 0
+
+    assert capsys.readouterr().out.splitlines() == want
+
+
+def test_cli_stdin_errors(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+):
+    text = "###\n #\n #\n\n\n #\n##\n\n\n\n###\n #\n #\n"
+    monkeypatch.setattr("sys.stdin", io.StringIO(text))
+
+    assert main(["-"]) == 1
+
+    out, err = capsys.readouterr()
+    assert out.splitlines() == ["(λa.a)", "(λa.a)"]
+    assert err.startswith("<stdin>:6: error: ValueError(")
+
+
+def test_cli_reduce(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+):
+    # (λn.λf.λx.f (n f x)) 2, the successor of 2
+    from lambda_calc.text import parse_term
+
+    _stdin(monkeypatch, parse_term(r"(\n f x. f (n f x)) (\f x. f (f x))"))
+
+    assert main(["--reduce", "--stats"]) == 0
+
+    out, err = capsys.readouterr()
+    assert out == "(λa.(λb.(a(a(ab)))))\n"
+    assert "diagrams: 1" in err
+    assert "reduce:" in err
+    assert "total:" in err
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_cli_reduce_limit(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    jobs: str,
+):
+    from lambda_calc.text import parse_term
+
+    _stdin(monkeypatch, parse_term(r"(\x. x x) (\x. x x)"))
+
+    assert main(["--reduce", "--max-steps", "100", "--jobs", jobs]) == 1
+
+    assert capsys.readouterr().err.startswith("<stdin>:1: error: no normal form")
+
+
+def test_cli_reduce_native(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+):
+    from lambda_calc.church import MULT
+
+    _stdin(monkeypatch, Application(Application(MULT, numeral(3)), numeral(4)))
+
+    assert main(["--reduce", "--native", "-f", "de-bruijn"]) == 0
+
+    assert capsys.readouterr().out == "(λ(λ" + "(2 " * 12 + "1" + ")" * 14 + "\n"
@@ -0,0 +1,88 @@
+import pytest
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.church import numeral
+from lambda_calc.corpus import TermIndex, digest, subterm_digests
+
+from .test_machine import ID, MULT, PRED, K, S
+from .test_reduction import apply
+
+EXPRESSIONS = [ID, K, S, MULT, PRED, apply(S, K, K), numeral(3), Variable(2)]
+
+
+def test_digest_stable():
+    # digests are stored on disk, so they must never change
+    assert digest(ID).hex() == "773c90c1a6f226aa6a42b0ef88925321"
+
+
+def test_digest_distinct():
+    digests = {digest(expression) for expression in EXPRESSIONS}
+    assert len(digests) == len(EXPRESSIONS)
+    assert digest(Variable(1)) != digest(Variable(11))
+
+
+def test_subterm_digests():
+    # λx.x x, where both x are the same interned node
+    expression = Abstraction(Application(Variable(1), Variable(1)))
+
+    digests = subterm_digests(expression)
+
+    assert list(digests) == [Variable(1), expression.body, expression]
+    assert [size for _, size in digests.values()] == [1, 3, 4]
+    for node, (key, _) in digests.items():
+        assert key == digest(node)
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_index_round_trip(expression: Expression):
+    index = TermIndex()
+    key = index.add(expression, "term")
+
+    assert key == digest(expression)
+    assert index.get(key) == expression
+    assert expression in index
+    assert index.names(expression) == ["term"]
+
+
+def test_index_subterms():
+    index = TermIndex()
+    index.add(apply(MULT, numeral(2), numeral(3)), "six")
+    index.add(numeral(2), "two")
+
+    # subterms are found, but only whole terms have names
+    assert numeral(3) in index
+    assert index.get(digest(numeral(3))) == numeral(3)
+    assert index.names(numeral(3)) == []
+    assert index.names(numeral(2)) == ["two"]
+
+    assert apply(MULT, numeral(3)) not in index
+    assert index.get(digest(apply(MULT, numeral(3)))) is None
+
+
+def test_index_find_subterms():
+    index = TermIndex()
+    index.add(apply(MULT, numeral(2), numeral(3)))
+
+    expression = apply(PRED, apply(MULT, numeral(3), numeral(3)))
+    found = list(index.find_subterms(expression, min_size=2))
+    assert found == [(MULT, digest(MULT)), (numeral(3), digest(numeral(3)))]
+
+    # numeral(3) is only found once, even though it occurs twice
+    found = list(index.find_subterms(apply(numeral(3), numeral(3)), min_size=4))
+    assert found == [(numeral(3), digest(numeral(3)))]
+
+    # the body of numeral(3) is in numeral(5), but smaller than 8 nodes
+    assert list(index.find_subterms(numeral(5), min_size=8)) == []
+
+
+def test_index_persists(tmp_path):
+    path = tmp_path / "index.sqlite"
+    with TermIndex(path) as index:
+        assert index.add_all((str(i), numeral(i)) for i in range(10)) == 10
+        # numeral(1) to numeral(9) share their subterms with numeral(10)
+        count = len(index)
+
+    with TermIndex(path) as index:
+        assert len(index) == count
+        assert index.names(numeral(7)) == ["7"]
+        assert index.get(digest(numeral(9))) == numeral(9)
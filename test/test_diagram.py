@@ -0,0 +1,65 @@
+import pytest
+
+from lambda_calc.diagram import LambdaDiagram
+from lambda_calc.math import Vec2
+
+DIAGRAM_STR = """\
+###
+ #
+
+###
+ #
+ #"""
+
+
+def test_from_str_round_trip():
+    diagram = LambdaDiagram.from_str(DIAGRAM_STR)
+    assert (diagram.width, diagram.height) == (3, 6)
+    assert str(diagram) == DIAGRAM_STR
+
+
+def test_from_str_matches_from_rows():
+    rows = [[c != " " for c in line] for line in DIAGRAM_STR.splitlines()]
+    assert LambdaDiagram(rows).pixels == LambdaDiagram.from_str(DIAGRAM_STR).pixels
+
+
+@pytest.mark.parametrize(
+    ["pos", "want"],
+    [
+        ((0, 0), True),
+        ((1, 1), True),
+        ((0, 1), False),
+        ((1, 2), False),
+        # out of bounds
+        ((-1, 0), False),
+        ((3, 0), False),
+        ((0, -1), False),
+        ((0, 6), False),
+    ],
+)
+def test_getitem(pos: tuple[int, int], want: bool):
+    diagram = LambdaDiagram.from_str(DIAGRAM_STR)
+    assert diagram[pos] is want
+    assert diagram[Vec2(*pos)] is want
+    assert diagram.get(*pos) is want
+
+
+def test_from_pixels_checks_size():
+    with pytest.raises(ValueError):
+        LambdaDiagram.from_pixels(bytearray(5), 2, 3)
+
+
+@pytest.mark.parametrize("data", [DIAGRAM_STR, "#", "#" * 8, "# #\n#\n #  #"])
+def test_bytes_round_trip(data: str):
+    diagram = LambdaDiagram.from_str(data)
+    packed = diagram.to_bytes()
+
+    assert len(packed) == 8 + (diagram.width * diagram.height + 7) // 8
+    unpacked = LambdaDiagram.from_bytes(packed)
+    assert (unpacked.width, unpacked.height) == (diagram.width, diagram.height)
+    assert unpacked.pixels == diagram.pixels
+
+
+def test_from_bytes_checks_size():
+    with pytest.raises(ValueError):
+        LambdaDiagram.from_bytes(LambdaDiagram.from_str(DIAGRAM_STR).to_bytes()[:-1])
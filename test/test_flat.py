@@ -0,0 +1,119 @@
+import pytest
+
+from lambda_calc.ast import (
+    Abstraction,
+    Application,
+    Expression,
+    Variable,
+    display_with_names,
+)
+from lambda_calc.blc import encode_bits
+from lambda_calc.diagram import LambdaDiagram
+from lambda_calc.flat import (
+    ABSTRACTION,
+    APPLICATION,
+    VARIABLE,
+    FlatBuilder,
+    FlatTerm,
+    parse_diagram_flat,
+)
+
+from .test_parser import CYCLIC_DIAGRAM, DIAGRAMS
+
+EXPRESSIONS = [want for _, want in DIAGRAMS]
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_flat_round_trip(expression: Expression):
+    term = FlatTerm.from_expression(expression)
+
+    assert term.to_expression() == expression
+    assert FlatTerm.from_bytes(term.to_bytes()) == term
+    assert FlatTerm.from_blc(term.to_blc()) == term
+    assert term.to_blc() == encode_bits(expression)
+    assert term.display() == display_with_names(expression)
+
+
+@pytest.mark.parametrize(["data", "want"], DIAGRAMS)
+def test_parse_diagram_flat(data: str, want: Expression):
+    assert parse_diagram_flat(LambdaDiagram.from_str(data)) == FlatTerm.from_expression(
+        want
+    )
+
+
+def test_flat_layout():
+    # λx.(x x) (λy.y)
+    expression = Application(
+        Abstraction(Application(Variable(1), Variable(1))),
+        Abstraction(Variable(1)),
+    )
+
+    term = FlatTerm.from_expression(expression)
+
+    assert list(term) == [
+        (APPLICATION, 5),
+        (ABSTRACTION, 0),
+        (APPLICATION, 4),
+        (VARIABLE, 1),
+        (VARIABLE, 1),
+        (ABSTRACTION, 0),
+        (VARIABLE, 1),
+    ]
+    assert term.end(1) == 5
+    assert term.subterm(1) == FlatTerm.from_expression(expression.function)
+    assert term.to_expression(5) == expression.argument
+
+
+def test_flat_deep():
+    expression: Expression = Variable(1)
+    for _ in range(10000):
+        expression = Abstraction(Application(expression, Variable(1)))
+
+    term = FlatTerm.from_expression(expression)
+
+    assert len(term) == 30001
+    assert term.to_expression() == expression
+    names = "x" * 10001
+    assert term.display(names) == display_with_names(expression, names)
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        Variable(1),
+        Abstraction(Variable(2)),
+        Abstraction(Abstraction(Application(Variable(1), Variable(3)))),
+    ],
+)
+def test_flat_display_free_variable(expression: Expression):
+    term = FlatTerm.from_expression(expression)
+
+    with pytest.raises(ValueError, match="free"):
+        term.display()
+    with pytest.raises(ValueError, match="free"):
+        display_with_names(expression)
+
+
+def test_flat_builder_invalid():
+    builder = FlatBuilder()
+    builder.application()
+    builder.variable(1)
+    with pytest.raises(ValueError):
+        builder.build()
+
+    builder.variable(1)
+    with pytest.raises(ValueError):
+        builder.variable(1)
+    with pytest.raises(ValueError):
+        FlatBuilder().variable(0)
+
+
+@pytest.mark.parametrize("bits", ["", "00", "0010" + "0", "0110", "001"])
+def test_flat_from_blc_invalid(bits: str):
+    with pytest.raises(ValueError):
+        FlatTerm.from_blc(bits)
+
+
+def test_parse_diagram_flat_cyclic():
+    with pytest.raises(ValueError):
+        parse_diagram_flat(LambdaDiagram.from_str(CYCLIC_DIAGRAM))
@@ -0,0 +1,84 @@
+import pytest
+
+from lambda_calc import graph
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.church import numeral
+from lambda_calc.machine import evaluate
+from lambda_calc.reduction import reduce
+
+from .test_machine import ID, MULT, OMEGA, PRED, K, S
+from .test_reduction import apply
+
+TRUE = K
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        ID,
+        apply(S, K, K),
+        apply(K, ID, OMEGA),
+        apply(MULT, numeral(3), numeral(4)),
+        apply(PRED, numeral(5)),
+        apply(numeral(3), numeral(2)),
+        # free variables, and reduction under binders
+        apply(K, Variable(1), Variable(2)),
+        Abstraction(apply(K, Variable(1), Variable(3))),
+        Abstraction(Application(Variable(1), apply(ID, Variable(2)))),
+        # an abstraction copied under another one that's also being copied
+        apply(Abstraction(Abstraction(Application(Variable(2), Variable(1)))), K),
+    ],
+)
+def test_evaluate_matches_reduce(expression: Expression):
+    result = graph.evaluate(expression)
+    assert result.normal_form
+    assert result.expression == reduce(expression).expression
+
+
+def test_evaluate_limits():
+    result = graph.evaluate(OMEGA, max_steps=100)
+    assert not result.normal_form
+    assert result.expression == OMEGA
+    assert result.steps == 101
+
+    assert not graph.evaluate(OMEGA, timeout=0).normal_form
+
+
+def test_evaluate_shares_free_subexpressions():
+    # λy.(2^6 I TRUE) y, applied 16 times: the closed part of the body is only
+    # reduced the first time
+    heavy = apply(numeral(6), numeral(2), ID, TRUE)
+    function = Abstraction(Application(heavy, Variable(1)))
+
+    once = graph.evaluate(apply(function, ID)).steps
+    many = graph.evaluate(apply(numeral(16), function, ID))
+
+    assert many.normal_form
+    assert many.expression == evaluate(apply(numeral(16), function, ID)).expression
+    assert many.steps < 2 * once
+    assert evaluate(apply(numeral(16), function, ID)).steps > 10 * once
+
+
+def test_evaluate_shared_normal_form():
+    # each step duplicates the term so far, so the normal form has 2^k nodes
+    pair = Abstraction(Abstraction(apply(Variable(1), Variable(2), Variable(2))))
+    expression = apply(numeral(200), pair, ID)
+
+    result = graph.evaluate(expression)
+
+    assert result.normal_form
+    assert result.steps == 202
+    body = result.expression
+    for _ in range(200):
+        assert isinstance(body, Abstraction)
+        assert isinstance(body.body, Application)
+        body = body.body.argument
+    assert body == ID
+
+
+def test_evaluate_deep():
+    expression: Expression = Variable(1)
+    for _ in range(10000):
+        expression = Abstraction(Application(ID, expression))
+
+    assert graph.evaluate(expression).steps == 10000
@@ -0,0 +1,175 @@
+import random
+import struct
+import zlib
+from pathlib import Path
+
+import pytest
+
+from lambda_calc.ast import Abstraction, Application, Variable
+from lambda_calc.diagram import LambdaDiagram
+from lambda_calc.image import (
+    _unfilter_png,
+    decode_image,
+    detect_scale,
+    downsample,
+    encode_pbm,
+    encode_pgm,
+    encode_png,
+    read_image,
+    upsample,
+    write_image,
+)
+from lambda_calc.render import render_diagram
+
+# λf.λx.f (f x), which is 7 pixels wide
+DIAGRAM = render_diagram(
+    Abstraction(
+        Abstraction(Application(Variable(2), Application(Variable(2), Variable(1))))
+    )
+)
+
+
+def png(width: int, height: int, color: int, rows: list[bytes], palette=b"") -> bytes:
+    """Builds an 8-bit PNG from filtered rows."""
+
+    def chunk(kind: bytes, data: bytes):
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    header = struct.pack(">IIBBBBB", width, height, 8, color, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + (chunk(b"PLTE", palette) if palette else b"")
+        + chunk(b"IDAT", zlib.compress(b"".join(rows)))
+        + chunk(b"IEND", b"")
+    )
+
+
+@pytest.mark.parametrize("encode", [encode_pbm, encode_pgm, encode_png])
+@pytest.mark.parametrize("scale", [1, 2, 5])
+def test_round_trip(encode, scale: int):
+    diagram = decode_image(encode(DIAGRAM, scale=scale))
+    assert str(diagram) == str(DIAGRAM)
+
+
+@pytest.mark.parametrize("suffix", [".pbm", ".pgm", ".png"])
+def test_write_read(tmp_path: Path, suffix: str):
+    path = tmp_path / f"diagram{suffix}"
+    write_image(DIAGRAM, path, scale=3)
+    assert str(read_image(path)) == str(DIAGRAM)
+
+
+def test_upsample():
+    diagram = upsample(LambdaDiagram.from_str("#\n #"), 2)
+    assert str(diagram) == "##\n##\n  ##\n  ##"
+
+
+def test_detect_scale():
+    assert detect_scale(DIAGRAM) == (1, 1)
+    assert detect_scale(upsample(DIAGRAM, 4)) == (4, 4)
+
+
+def test_downsample_crops_margins():
+    diagram = LambdaDiagram.from_str(str(upsample(DIAGRAM, 3)))
+    padded = LambdaDiagram(
+        [[False] * (diagram.width + 5)] * 2
+        + [[False] * 5 + list(map(bool, diagram.row(y))) for y in range(diagram.height)]
+        + [[False] * (diagram.width + 5)] * 4
+    )
+    assert str(downsample(padded)) == str(DIAGRAM)
+
+
+def test_downsample_explicit_scale():
+    diagram = upsample(DIAGRAM, 2)
+    assert str(downsample(diagram, (2, 2))) == str(DIAGRAM)
+    assert str(downsample(diagram, 2)) == str(DIAGRAM)
+
+
+def test_ascii_netpbm():
+    pbm = b"P1\n# comment\n3 3\n111\n0 1 0\n010\n"
+    pgm = b"P2 3 3 15\n0 0 0\n15 3 15\n15 0 15\n"
+    assert str(decode_image(pbm)) == "###\n #\n #"
+    assert str(decode_image(pgm)) == "###\n #\n #"
+
+
+def test_png_filters():
+    # λx.x, with every filter type
+    gray = [b"\x00\x00\x00", b"\xff\x00\xff", b"\xff\x00\xff"]
+    rows = [
+        b"\x01" + bytes([0, 0, 0]),  # sub
+        b"\x02" + bytes([255, 0, 255]),  # up
+        b"\x03" + bytes([(255 - 127) & 0xFF, (0 - 127) & 0xFF, (255 - 127) & 0xFF]),
+    ]
+    # avg of left and up, computed by hand for the last row
+    last = bytearray()
+    for i, value in enumerate(gray[2]):
+        left = gray[2][i - 1] if i else 0
+        last.append((value - ((left + gray[1][i]) >> 1)) & 0xFF)
+    rows[2] = b"\x03" + bytes(last)
+
+    assert str(decode_image(png(3, 3, 0, rows))) == "###\n #\n #"
+
+
+def _paeth(left: int, up: int, up_left: int) -> int:
+    p = left + up - up_left
+    pa, pb, pc = abs(p - left), abs(p - up), abs(p - up_left)
+    if pa <= pb and pa <= pc:
+        return left
+    return up if pb <= pc else up_left
+
+
+@pytest.mark.parametrize("bpp", [1, 3, 8])
+def test_unfilter_png(bpp: int):
+    # random rows with random filters, filtered byte by byte as in the spec
+    rng = random.Random(bpp)
+    stride = 5 * bpp
+    raw = [bytes(rng.randrange(256) for _ in range(stride)) for _ in range(20)]
+    data = bytearray()
+    previous = bytes(stride)
+    for row in raw:
+        kind = rng.randrange(5)
+        data.append(kind)
+        for i, value in enumerate(row):
+            left = row[i - bpp] if i >= bpp else 0
+            up_left = previous[i - bpp] if i >= bpp else 0
+            predictor = [
+                0,
+                left,
+                previous[i],
+                (left + previous[i]) >> 1,
+                _paeth(left, previous[i], up_left),
+            ][kind]
+            data.append((value - predictor) & 0xFF)
+        previous = row
+
+    assert _unfilter_png(bytes(data), stride, len(raw), bpp) == b"".join(raw)
+
+
+def test_png_color_types():
+    rgb = [b"\x00" + bytes(9), b"\x00" + bytes([255, 0, 0, 0, 0, 0, 255, 255, 255])]
+    # red isn't dark, so only the middle pixel of the second row is set
+    assert str(decode_image(png(3, 2, 2, rgb))) == "###\n #"
+
+    palette = bytes([255, 255, 255, 0, 0, 0])
+    indexed = [b"\x00\x01\x01\x01", b"\x00\x00\x01\x00"]
+    assert str(decode_image(png(3, 2, 3, indexed, palette))) == "###\n #"
+
+    # transparent black isn't set
+    rgba = [
+        b"\x00" + bytes([0, 0, 0, 255] * 3),
+        b"\x00" + bytes([0, 0, 0, 0, 0, 0, 0, 255, 0, 0, 0, 0]),
+    ]
+    assert str(decode_image(png(3, 2, 6, rgba))) == "###\n #"
+
+
+@pytest.mark.parametrize(
+    "data", [b"", b"GIF89a", b"P4 8 8\n", b"P6 1 1 255\n\x00\x00\x00"]
+)
+def test_invalid(data: bytes):
+    with pytest.raises(ValueError):
+        decode_image(data)
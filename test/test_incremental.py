@@ -0,0 +1,84 @@
+import pytest
+
+from lambda_calc.ast import Expression
+from lambda_calc.diagram import LambdaDiagram
+from lambda_calc.incremental import IncrementalParser
+from lambda_calc.parser import parse_diagram, walk_diagram
+from lambda_calc.render import render_diagram
+
+from .test_parser import CYCLIC_DIAGRAM, DIAGRAMS
+
+EXPRESSIONS = [want for _, want in DIAGRAMS]
+
+
+def _canvas(expression: Expression, width: int, height: int):
+    diagram = render_diagram(expression)
+    pixels = bytearray(width * height)
+    for y in range(diagram.height):
+        pixels[y * width : y * width + diagram.width] = diagram.row(y)
+    return LambdaDiagram.from_pixels(pixels, width, height)
+
+
+@pytest.mark.parametrize(["data", "want"], DIAGRAMS)
+def test_incremental_parse(data: str, want: Expression):
+    parser = IncrementalParser(LambdaDiagram.from_str(data))
+    assert parser.parse() == want
+
+
+@pytest.mark.parametrize("before", EXPRESSIONS[::3])
+@pytest.mark.parametrize("after", EXPRESSIONS[1::3])
+def test_incremental_redraw(before: Expression, after: Expression):
+    rendered = [render_diagram(before), render_diagram(after)]
+    width = max(diagram.width for diagram in rendered)
+    height = max(diagram.height for diagram in rendered)
+    diagram = _canvas(before, width, height)
+    target = _canvas(after, width, height)
+
+    parser = IncrementalParser(diagram)
+    assert parser.parse() == before
+
+    for y in range(height):
+        for x in range(width):
+            if diagram.get(x, y) != target.get(x, y):
+                parser.set(x, y, target.get(x, y))
+
+    assert parser.parse() == after == parse_diagram(target)
+    assert parser.walk() == walk_diagram(target)
+
+
+def test_incremental_stray_pixels():
+    diagram = _canvas(EXPRESSIONS[-1], 40, 40)
+    parser = IncrementalParser(diagram)
+    expression = parser.parse()
+
+    parser.set(39, 39, True)
+    assert parser.parse() is expression
+
+    parser.invalidate(0, 0, 39, 39)
+    assert parser.parse() is expression
+
+
+def test_incremental_cut_line():
+    diagram = LambdaDiagram.from_str(
+        """
+        ###
+         #
+         #
+         #
+        """
+    )
+    parser = IncrementalParser(diagram)
+
+    parser.set(1, 1, False)
+    with pytest.raises(ValueError):
+        parser.parse()
+
+    parser.set(1, 1, True)
+    assert parser.parse() == parse_diagram(diagram)
+
+
+def test_incremental_cyclic():
+    parser = IncrementalParser(LambdaDiagram.from_str(CYCLIC_DIAGRAM))
+
+    with pytest.raises(ValueError):
+        parser.parse()
@@ -0,0 +1,94 @@
+import pytest
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.church import numeral
+from lambda_calc.machine import Mode, evaluate
+from lambda_calc.reduction import reduce
+
+from .test_reduction import apply
+
+ID = Abstraction(Variable(1))
+K = Abstraction(Abstraction(Variable(2)))
+S = Abstraction(
+    Abstraction(
+        Abstraction(
+            Application(
+                Application(Variable(3), Variable(1)),
+                Application(Variable(2), Variable(1)),
+            )
+        )
+    )
+)
+OMEGA = Application(
+    Abstraction(Application(Variable(1), Variable(1))),
+    Abstraction(Application(Variable(1), Variable(1))),
+)
+MULT = Abstraction(
+    Abstraction(
+        Abstraction(Application(Variable(3), Application(Variable(2), Variable(1))))
+    )
+)
+# λn.λf.λx.n(λg.λh.h(g f))(λu.x)(λu.u)
+PRED = Abstraction(
+    Abstraction(
+        Abstraction(
+            Application(
+                Application(
+                    Application(
+                        Variable(3),
+                        Abstraction(
+                            Abstraction(
+                                Application(
+                                    Variable(1), Application(Variable(2), Variable(4))
+                                )
+                            )
+                        ),
+                    ),
+                    Abstraction(Variable(2)),
+                ),
+                Abstraction(Variable(1)),
+            )
+        )
+    )
+)
+
+
+@pytest.mark.parametrize("mode", list(Mode))
+@pytest.mark.parametrize(
+    "expression",
+    [
+        ID,
+        apply(S, K, K),
+        apply(K, ID, OMEGA),
+        apply(MULT, numeral(3), numeral(4)),
+        apply(PRED, numeral(5)),
+        # church numerals to a power: n m = m^n
+        apply(numeral(3), numeral(2)),
+        # free variables, and reduction under binders
+        apply(K, Variable(1), Variable(2)),
+        Abstraction(apply(K, Variable(1), Variable(3))),
+        Abstraction(Application(Variable(1), apply(ID, Variable(2)))),
+    ],
+)
+def test_evaluate_matches_reduce(mode: Mode, expression: Expression):
+    result = evaluate(expression, mode)
+    assert result.normal_form
+    assert result.expression == reduce(expression).expression
+
+
+def test_evaluate_limits():
+    result = evaluate(OMEGA, max_steps=100)
+    assert not result.normal_form
+    assert result.expression == OMEGA
+    assert result.steps == 101
+
+    assert not evaluate(OMEGA, timeout=0).normal_form
+
+
+def test_evaluate_call_by_need_shares_arguments():
+    # (λx.x x x)(I I): by name, I I is reduced once per use of x
+    expression = Application(
+        Abstraction(apply(Variable(1), Variable(1), Variable(1))),
+        Application(ID, ID),
+    )
+    assert evaluate(expression, Mode.NEED).steps < evaluate(expression, Mode.NAME).steps
@@ -0,0 +1,92 @@
+from pathlib import Path
+
+import pytest
+
+from lambda_calc.ast import Abstraction, Variable
+from lambda_calc.cache import ParseCache
+from lambda_calc.diagram import LambdaDiagram
+from lambda_calc.mapped import map_pbm, map_text
+from lambda_calc.parser import parse_diagram, walk_diagram
+
+from .test_parser import DIAGRAMS
+
+
+@pytest.mark.parametrize(["data", "want"], DIAGRAMS)
+def test_map_text(tmp_path: Path, data: str, want: object):
+    path = tmp_path / "diagram.txt"
+    path.write_text(data, encoding="ascii")
+
+    with map_text(path) as diagram:
+        expected = LambdaDiagram.from_str(data)
+        assert (diagram.width, diagram.height) == (expected.width, expected.height)
+        assert diagram.buffer() == expected.pixels
+        assert diagram.to_bytes() == expected.to_bytes()
+        assert ParseCache.key(diagram) == ParseCache.key(expected)
+        assert parse_diagram(diagram) == want
+
+
+def test_map_text_crlf(tmp_path: Path):
+    path = tmp_path / "diagram.txt"
+    path.write_bytes(b"###\r\n #\r\n #\r\n")
+
+    with map_text(path) as diagram:
+        assert str(diagram) == "###\n #\n #"
+
+
+@pytest.mark.parametrize("data", [b"", b"\n  \n", b" #\n# \n", b"#\t#\n"])
+def test_map_text_invalid(tmp_path: Path, data: bytes):
+    path = tmp_path / "diagram.txt"
+    path.write_bytes(data)
+
+    with pytest.raises(ValueError):
+        map_text(path)
+
+
+def to_pbm(diagram: LambdaDiagram) -> bytes:
+    stride = (diagram.width + 7) // 8
+    padding = 8 * stride - diagram.width
+    header = b"P4\n# comment\n%d %d\n" % (diagram.width, diagram.height)
+    rows = list[bytes]()
+    for y in range(diagram.height):
+        bits = diagram.row(y).translate(b"01" + bytes(254)) + b"0" * padding
+        rows.append(int(bits, 2).to_bytes(stride))
+    return header + b"".join(rows)
+
+
+@pytest.mark.parametrize(["data", "want"], DIAGRAMS)
+def test_map_pbm(tmp_path: Path, data: str, want: object):
+    expected = LambdaDiagram.from_str(data)
+    path = tmp_path / "diagram.pbm"
+    path.write_bytes(to_pbm(expected))
+
+    with map_pbm(path) as diagram:
+        assert (diagram.width, diagram.height) == (expected.width, expected.height)
+        assert diagram.buffer() == expected.pixels
+        assert diagram.to_bytes() == expected.to_bytes()
+        assert ParseCache.key(diagram) == ParseCache.key(expected)
+        assert parse_diagram(diagram) == want
+
+
+def test_map_pbm_truncated(tmp_path: Path):
+    path = tmp_path / "diagram.pbm"
+    path.write_bytes(b"P4 16 2\n\xff")
+
+    with pytest.raises(ValueError):
+        map_pbm(path)
+
+
+def test_map_pbm_small_term(tmp_path: Path):
+    # λx.x in the corner of a much bigger bitmap
+    width = height = 2000
+    term = LambdaDiagram.from_str("###\n #\n #")
+    pixels = bytearray(width * height)
+    for y in range(term.height):
+        pixels[y * width : y * width + term.width] = term.row(y)
+    path = tmp_path / "diagram.pbm"
+    path.write_bytes(to_pbm(LambdaDiagram.from_pixels(pixels, width, height)))
+
+    with map_pbm(path) as diagram:
+        walk = walk_diagram(diagram)
+        assert (walk.width, walk.height) == (3, 3)
+        assert len(walk.pixels) == 9
+        assert parse_diagram(diagram) == Abstraction(Variable(1))
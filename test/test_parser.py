@@ -2,600 +2,740 @@ import pytest
 
 from lambda_calc.ast import Abstraction, Application, Expression, Variable
 from lambda_calc.diagram import LambdaDiagram
-from lambda_calc.parser import parse_diagram
-
+from lambda_calc.math import Vec2
+from lambda_calc.parser import (
+    AbstractionToken,
+    ApplicationToken,
+    DiagramWalk,
+    TokenGrid,
+    VariableToken,
+    parse_diagram,
+    parse_tokens,
+    tokenize_diagram,
+    walk_diagram,
+)
+from lambda_calc.render import render_diagram
 
-@pytest.mark.parametrize(
-    ["diagram_str", "want_ast"],
-    [
-        # identity
-        # λx.x
-        (
-            """
-            ###
-             #
-             #
-            """,
-            Abstraction(Variable(1)),
-        ),
-        # true
-        # λx.λy.x
-        (
-            """
-            ###
-             #
-            ###
-             #
-             #
-            """,
-            Abstraction(Abstraction(Variable(2))),
-        ),
-        # false
-        # λx.λy.y
-        (
-            """
-            ###
+DIAGRAMS: list[tuple[str, Expression]] = [
+    # identity
+    # λx.x
+    (
+        """
+        ###
+         #
+         #
+        """,
+        Abstraction(Variable(1)),
+    ),
+    # true
+    # λx.λy.x
+    (
+        """
+        ###
+         #
+        ###
+         #
+         #
+        """,
+        Abstraction(Abstraction(Variable(2))),
+    ),
+    # false
+    # λx.λy.y
+    (
+        """
+        ###
 
-            ###
-             #
-             #
-            """,
-            Abstraction(Abstraction(Variable(1))),
-        ),
-        # S
-        # λx.λy.λz.(x z)(y z)
-        (
-            """
-            ###############
-             #
-            ###############
-             #       #
-            ###############
-             #   #   #   #
-             #####   #####
-             #       #
-             #########
-             #
-             #
-            """,
+        ###
+         #
+         #
+        """,
+        Abstraction(Abstraction(Variable(1))),
+    ),
+    # S
+    # λx.λy.λz.(x z)(y z)
+    (
+        """
+        ###############
+         #
+        ###############
+         #       #
+        ###############
+         #   #   #   #
+         #####   #####
+         #       #
+         #########
+         #
+         #
+        """,
+        Abstraction(
             Abstraction(
                 Abstraction(
-                    Abstraction(
-                        Application(
-                            Application(Variable(3), Variable(1)),
-                            Application(Variable(2), Variable(1)),
-                        )
+                    Application(
+                        Application(Variable(3), Variable(1)),
+                        Application(Variable(2), Variable(1)),
                     )
                 )
-            ),
+            )
         ),
-        (
-            """
-            ###############
-             #
-            ###############
-             #       #
-            ###############
-             #   #   #   #
-             #####   #####
-                 #   #
-                 #####
-            """,
+    ),
+    (
+        """
+        ###############
+         #
+        ###############
+         #       #
+        ###############
+         #   #   #   #
+         #####   #####
+             #   #
+             #####
+        """,
+        Abstraction(
             Abstraction(
                 Abstraction(
-                    Abstraction(
-                        Application(
-                            Application(Variable(3), Variable(1)),
-                            Application(Variable(2), Variable(1)),
-                        )
+                    Application(
+                        Application(Variable(3), Variable(1)),
+                        Application(Variable(2), Variable(1)),
                     )
                 )
-            ),
-        ),
-        # Y
-        # λf.(λx.x x)(λx.f(x x))
-        (
-            """
-            ###################
-                     #
-            ####### ###########
-             #   #   #   #   #
-             #####   #   #####
-             #       #   #
-             #       #####
-             #       #
-             #########
-             #
-             #
-            """,
-            Abstraction(
-                Application(
-                    Abstraction(Application(Variable(1), Variable(1))),
-                    Abstraction(
-                        Application(
-                            Variable(2),
-                            Application(Variable(1), Variable(1)),
-                        )
-                    ),
-                )
-            ),
+            )
         ),
-        (
-            """
-            ###################
-                     #
-            ####### ###########
-             #   #   #   #   #
-             #####   #   #####
-                 #   #   #
-                 #   #####
-                 #   #
-                 #####
-            """,
-            Abstraction(
-                Application(
-                    Abstraction(Application(Variable(1), Variable(1))),
-                    Abstraction(
-                        Application(
-                            Variable(2),
-                            Application(Variable(1), Variable(1)),
-                        )
-                    ),
-                )
-            ),
+    ),
+    # Y
+    # λf.(λx.x x)(λx.f(x x))
+    (
+        """
+        ###################
+                 #
+        ####### ###########
+         #   #   #   #   #
+         #####   #   #####
+         #       #   #
+         #       #####
+         #       #
+         #########
+         #
+         #
+        """,
+        Abstraction(
+            Application(
+                Abstraction(Application(Variable(1), Variable(1))),
+                Abstraction(
+                    Application(
+                        Variable(2),
+                        Application(Variable(1), Variable(1)),
+                    )
+                ),
+            )
         ),
-        # 3
-        # λf.λx.f(f(f x))
-        (
-            """
-            ###############
-             #   #   #
-            ###############
-             #   #   #   #
-             #   #   #####
+    ),
+    (
+        """
+        ###################
+                 #
+        ####### ###########
+         #   #   #   #   #
+         #####   #   #####
              #   #   #
              #   #####
              #   #
              #####
-             #
-             #
-            """,
-            Abstraction(
+        """,
+        Abstraction(
+            Application(
+                Abstraction(Application(Variable(1), Variable(1))),
                 Abstraction(
                     Application(
                         Variable(2),
-                        Application(
-                            Variable(2),
-                            Application(Variable(2), Variable(1)),
-                        ),
+                        Application(Variable(1), Variable(1)),
                     )
+                ),
+            )
+        ),
+    ),
+    # 3
+    # λf.λx.f(f(f x))
+    (
+        """
+        ###############
+         #   #   #
+        ###############
+         #   #   #   #
+         #   #   #####
+         #   #   #
+         #   #####
+         #   #
+         #####
+         #
+         #
+        """,
+        Abstraction(
+            Abstraction(
+                Application(
+                    Variable(2),
+                    Application(
+                        Variable(2),
+                        Application(Variable(2), Variable(1)),
+                    ),
                 )
-            ),
+            )
         ),
-        (
-            """
-            ###############
-             #   #   #
-            ###############
-             #   #   #   #
-             #   #   #####
-             #   #   #
-             #   #####
-             #   #
-             #####
-            """,
+    ),
+    (
+        """
+        ###############
+         #   #   #
+        ###############
+         #   #   #   #
+         #   #   #####
+         #   #   #
+         #   #####
+         #   #
+         #####
+        """,
+        Abstraction(
             Abstraction(
-                Abstraction(
+                Application(
+                    Variable(2),
                     Application(
                         Variable(2),
-                        Application(
-                            Variable(2),
-                            Application(Variable(2), Variable(1)),
-                        ),
-                    )
+                        Application(Variable(2), Variable(1)),
+                    ),
                 )
-            ),
+            )
         ),
-        # predecessor
-        # λn.λf.λx.n(λg.λh.h(g f))(λu.x)(λu.u)
-        (
-            """
-            #######################
-             #
-            #######################
-             #           #
-            #######################
-             #           #   #
-             #  ########### ### ###
-             #       #   #   #   #
-             #  ###########  #   #
-             #   #   #   #   #   #
-             #   #   #####   #   #
-             #   #   #       #   #
-             #   #####       #   #
-             #   #           #   #
-             #####           #   #
-             #               #   #
-             #################   #
-             #                   #
-             #####################
-             #
-             #
-            """,
+    ),
+    # predecessor
+    # λn.λf.λx.n(λg.λh.h(g f))(λu.x)(λu.u)
+    (
+        """
+        #######################
+         #
+        #######################
+         #           #
+        #######################
+         #           #   #
+         #  ########### ### ###
+         #       #   #   #   #
+         #  ###########  #   #
+         #   #   #   #   #   #
+         #   #   #####   #   #
+         #   #   #       #   #
+         #   #####       #   #
+         #   #           #   #
+         #####           #   #
+         #               #   #
+         #################   #
+         #                   #
+         #####################
+         #
+         #
+        """,
+        Abstraction(
             Abstraction(
                 Abstraction(
-                    Abstraction(
+                    Application(
                         Application(
                             Application(
-                                Application(
-                                    Variable(3),
+                                Variable(3),
+                                Abstraction(
                                     Abstraction(
-                                        Abstraction(
-                                            Application(
-                                                Variable(1),
-                                                Application(Variable(2), Variable(4)),
-                                            )
+                                        Application(
+                                            Variable(1),
+                                            Application(Variable(2), Variable(4)),
                                         )
-                                    ),
+                                    )
                                 ),
-                                Abstraction(Variable(2)),
                             ),
-                            Abstraction(Variable(1)),
-                        )
+                            Abstraction(Variable(2)),
+                        ),
+                        Abstraction(Variable(1)),
                     )
                 )
-            ),
+            )
         ),
-        (
-            """
-            #######################
-             #
-            #######################
-             #           #
-            #######################
+    ),
+    (
+        """
+        #######################
+         #
+        #######################
+         #           #
+        #######################
+         #           #   #
+         #  ########### ### ###
+         #       #   #   #   #
+         #  ###########  #   #
+         #   #   #   #   #   #
+         #   #   #####   #   #
+         #   #   #       #   #
+         #   #####       #   #
+         #   #           #   #
+         #####           #   #
              #           #   #
-             #  ########### ### ###
-             #       #   #   #   #
-             #  ###########  #   #
-             #   #   #   #   #   #
-             #   #   #####   #   #
-             #   #   #       #   #
-             #   #####       #   #
-             #   #           #   #
-             #####           #   #
-                 #           #   #
-                 #############   #
-                             #   #
-                             #####
-            """,
+             #############   #
+                         #   #
+                         #####
+        """,
+        Abstraction(
             Abstraction(
                 Abstraction(
-                    Abstraction(
+                    Application(
                         Application(
                             Application(
-                                Application(
-                                    Variable(3),
+                                Variable(3),
+                                Abstraction(
                                     Abstraction(
-                                        Abstraction(
-                                            Application(
-                                                Variable(1),
-                                                Application(Variable(2), Variable(4)),
-                                            )
+                                        Application(
+                                            Variable(1),
+                                            Application(Variable(2), Variable(4)),
                                         )
-                                    ),
+                                    )
                                 ),
-                                Abstraction(Variable(2)),
                             ),
-                            Abstraction(Variable(1)),
-                        )
+                            Abstraction(Variable(2)),
+                        ),
+                        Abstraction(Variable(1)),
                     )
                 )
-            ),
+            )
         ),
-        # fac
-        # λn.λf.n(λf.λn.n(f(λf.λx.n f(f x))))(λx.f)(λx.x)
-        (
-            """
-            ###################################
-             #
-            ###################################
-             #                           #
-             #  ####################### ### ###
-             #       #                   #   #
-             #  #######################  #   #
-             #   #   #   #               #   #
-             #   #   #  ###############  #   #
-             #   #   #   #   #   #       #   #
-             #   #   #  ###############  #   #
-             #   #   #   #   #   #   #   #   #
-             #   #   #   #####   #####   #   #
-             #   #   #   #       #       #   #
-             #   #   #   #########       #   #
-             #   #   #   #               #   #
-             #   #   #####               #   #
-             #   #   #                   #   #
-             #   #####                   #   #
-             #   #                       #   #
-             #####                       #   #
-             #                           #   #
-             #############################   #
-             #                               #
-             #################################
-             #
-             #
-            """,
+    ),
+    # fac
+    # λn.λf.n(λf.λn.n(f(λf.λx.n f(f x))))(λx.f)(λx.x)
+    (
+        """
+        ###################################
+         #
+        ###################################
+         #                           #
+         #  ####################### ### ###
+         #       #                   #   #
+         #  #######################  #   #
+         #   #   #   #               #   #
+         #   #   #  ###############  #   #
+         #   #   #   #   #   #       #   #
+         #   #   #  ###############  #   #
+         #   #   #   #   #   #   #   #   #
+         #   #   #   #####   #####   #   #
+         #   #   #   #       #       #   #
+         #   #   #   #########       #   #
+         #   #   #   #               #   #
+         #   #   #####               #   #
+         #   #   #                   #   #
+         #   #####                   #   #
+         #   #                       #   #
+         #####                       #   #
+         #                           #   #
+         #############################   #
+         #                               #
+         #################################
+         #
+         #
+        """,
+        Abstraction(
             Abstraction(
-                Abstraction(
+                Application(
                     Application(
                         Application(
-                            Application(
-                                Variable(2),
+                            Variable(2),
+                            Abstraction(
                                 Abstraction(
-                                    Abstraction(
+                                    Application(
+                                        Variable(1),
                                         Application(
-                                            Variable(1),
-                                            Application(
-                                                Variable(2),
+                                            Variable(2),
+                                            Abstraction(
                                                 Abstraction(
-                                                    Abstraction(
+                                                    Application(
                                                         Application(
-                                                            Application(
-                                                                Variable(3),
-                                                                Variable(2),
-                                                            ),
-                                                            Application(
-                                                                Variable(2),
-                                                                Variable(1),
-                                                            ),
-                                                        )
+                                                            Variable(3),
+                                                            Variable(2),
+                                                        ),
+                                                        Application(
+                                                            Variable(2),
+                                                            Variable(1),
+                                                        ),
                                                     )
-                                                ),
+                                                )
                                             ),
-                                        )
+                                        ),
                                     )
-                                ),
+                                )
                             ),
-                            Abstraction(Variable(2)),
                         ),
-                        Abstraction(Variable(1)),
-                    )
+                        Abstraction(Variable(2)),
+                    ),
+                    Abstraction(Variable(1)),
                 )
-            ),
+            )
         ),
-        (
-            """
-            ###################################
-             #
-            ###################################
-             #                           #
-             #  ####################### ### ###
-             #       #                   #   #
-             #  #######################  #   #
-             #   #   #   #               #   #
-             #   #   #  ###############  #   #
-             #   #   #   #   #   #       #   #
-             #   #   #  ###############  #   #
-             #   #   #   #   #   #   #   #   #
-             #   #   #   #####   #####   #   #
-             #   #   #       #   #       #   #
-             #   #   #       #####       #   #
-             #   #   #       #           #   #
-             #   #   #########           #   #
-             #   #   #                   #   #
-             #   #####                   #   #
-             #   #                       #   #
-             #####                       #   #
-                 #                       #   #
-                 #########################   #
-                                         #   #
-                                         #####
-            """,
+    ),
+    (
+        """
+        ###################################
+         #
+        ###################################
+         #                           #
+         #  ####################### ### ###
+         #       #                   #   #
+         #  #######################  #   #
+         #   #   #   #               #   #
+         #   #   #  ###############  #   #
+         #   #   #   #   #   #       #   #
+         #   #   #  ###############  #   #
+         #   #   #   #   #   #   #   #   #
+         #   #   #   #####   #####   #   #
+         #   #   #       #   #       #   #
+         #   #   #       #####       #   #
+         #   #   #       #           #   #
+         #   #   #########           #   #
+         #   #   #                   #   #
+         #   #####                   #   #
+         #   #                       #   #
+         #####                       #   #
+             #                       #   #
+             #########################   #
+                                     #   #
+                                     #####
+        """,
+        Abstraction(
             Abstraction(
-                Abstraction(
+                Application(
                     Application(
                         Application(
-                            Application(
-                                Variable(2),
+                            Variable(2),
+                            Abstraction(
                                 Abstraction(
-                                    Abstraction(
+                                    Application(
+                                        Variable(1),
                                         Application(
-                                            Variable(1),
-                                            Application(
-                                                Variable(2),
+                                            Variable(2),
+                                            Abstraction(
                                                 Abstraction(
-                                                    Abstraction(
+                                                    Application(
                                                         Application(
-                                                            Application(
-                                                                Variable(3),
-                                                                Variable(2),
-                                                            ),
-                                                            Application(
-                                                                Variable(2),
-                                                                Variable(1),
-                                                            ),
-                                                        )
+                                                            Variable(3),
+                                                            Variable(2),
+                                                        ),
+                                                        Application(
+                                                            Variable(2),
+                                                            Variable(1),
+                                                        ),
                                                     )
-                                                ),
+                                                )
                                             ),
-                                        )
+                                        ),
                                     )
-                                ),
+                                )
                             ),
-                            Abstraction(Variable(2)),
                         ),
-                        Abstraction(Variable(1)),
-                    )
+                        Abstraction(Variable(2)),
+                    ),
+                    Abstraction(Variable(1)),
                 )
-            ),
+            )
         ),
-        # fib
-        # λn.λf.n(λc.λa.λb.c b(λx.a (b x)))(λx.λy.x)(λx.x)f
-        (
-            """
-            ###################################
-             #
-            ###################################
-             #                               #
-             #  ################### ### ###  #
-             #   #                   #   #   #
-             #  ################### ###  #   #
-             #   #       #           #   #   #
-             #  ###################  #   #   #
-             #   #   #   #   #       #   #   #
-             #   #####  ###########  #   #   #
-             #   #       #   #   #   #   #   #
-             #   #       #   #####   #   #   #
-             #   #       #   #       #   #   #
-             #   #       #####       #   #   #
-             #   #       #           #   #   #
-             #   #########           #   #   #
-             #   #                   #   #   #
-             #####                   #   #   #
-             #                       #   #   #
-             #########################   #   #
-             #                           #   #
-             #############################   #
-             #                               #
-             #################################
-             #
-             #
-            """,
+    ),
+    # fib
+    # λn.λf.n(λc.λa.λb.c b(λx.a (b x)))(λx.λy.x)(λx.x)f
+    (
+        """
+        ###################################
+         #
+        ###################################
+         #                               #
+         #  ################### ### ###  #
+         #   #                   #   #   #
+         #  ################### ###  #   #
+         #   #       #           #   #   #
+         #  ###################  #   #   #
+         #   #   #   #   #       #   #   #
+         #   #####  ###########  #   #   #
+         #   #       #   #   #   #   #   #
+         #   #       #   #####   #   #   #
+         #   #       #   #       #   #   #
+         #   #       #####       #   #   #
+         #   #       #           #   #   #
+         #   #########           #   #   #
+         #   #                   #   #   #
+         #####                   #   #   #
+         #                       #   #   #
+         #########################   #   #
+         #                           #   #
+         #############################   #
+         #                               #
+         #################################
+         #
+         #
+        """,
+        Abstraction(
             Abstraction(
-                Abstraction(
+                Application(
                     Application(
                         Application(
                             Application(
-                                Application(
-                                    Variable(2),
+                                Variable(2),
+                                Abstraction(
                                     Abstraction(
                                         Abstraction(
-                                            Abstraction(
+                                            Application(
                                                 Application(
+                                                    Variable(3),
+                                                    Variable(1),
+                                                ),
+                                                Abstraction(
                                                     Application(
                                                         Variable(3),
-                                                        Variable(1),
-                                                    ),
-                                                    Abstraction(
                                                         Application(
-                                                            Variable(3),
-                                                            Application(
-                                                                Variable(2),
-                                                                Variable(1),
-                                                            ),
-                                                        )
-                                                    ),
-                                                )
+                                                            Variable(2),
+                                                            Variable(1),
+                                                        ),
+                                                    )
+                                                ),
                                             )
                                         )
-                                    ),
+                                    )
                                 ),
-                                Abstraction(Abstraction(Variable(2))),
                             ),
-                            Abstraction(Variable(1)),
+                            Abstraction(Abstraction(Variable(2))),
                         ),
-                        Variable(1),
-                    )
+                        Abstraction(Variable(1)),
+                    ),
+                    Variable(1),
                 )
-            ),
+            )
         ),
-        (
-            """
-            ###################################
-             #
-            ###################################
-             #                               #
-             #  ################### ### ###  #
-             #   #                   #   #   #
-             #  ################### ###  #   #
-             #   #       #           #   #   #
-             #  ###################  #   #   #
-             #   #   #   #   #       #   #   #
-             #   #####  ###########  #   #   #
-             #       #   #   #   #   #   #   #
-             #       #   #   #####   #   #   #
-             #       #   #   #       #   #   #
-             #       #   #####       #   #   #
-             #       #   #           #   #   #
-             #       #####           #   #   #
-             #       #               #   #   #
-             #########               #   #   #
-                     #               #   #   #
-                     #################   #   #
-                                     #   #   #
-                                     #####   #
-                                         #   #
-                                         #####
-            """,
+    ),
+    (
+        """
+        ###################################
+         #
+        ###################################
+         #                               #
+         #  ################### ### ###  #
+         #   #                   #   #   #
+         #  ################### ###  #   #
+         #   #       #           #   #   #
+         #  ###################  #   #   #
+         #   #   #   #   #       #   #   #
+         #   #####  ###########  #   #   #
+         #       #   #   #   #   #   #   #
+         #       #   #   #####   #   #   #
+         #       #   #   #       #   #   #
+         #       #   #####       #   #   #
+         #       #   #           #   #   #
+         #       #####           #   #   #
+         #       #               #   #   #
+         #########               #   #   #
+                 #               #   #   #
+                 #################   #   #
+                                 #   #   #
+                                 #####   #
+                                     #   #
+                                     #####
+        """,
+        Abstraction(
             Abstraction(
-                Abstraction(
+                Application(
                     Application(
                         Application(
                             Application(
-                                Application(
-                                    Variable(2),
+                                Variable(2),
+                                Abstraction(
                                     Abstraction(
                                         Abstraction(
-                                            Abstraction(
+                                            Application(
                                                 Application(
+                                                    Variable(3),
+                                                    Variable(1),
+                                                ),
+                                                Abstraction(
                                                     Application(
                                                         Variable(3),
-                                                        Variable(1),
-                                                    ),
-                                                    Abstraction(
                                                         Application(
-                                                            Variable(3),
-                                                            Application(
-                                                                Variable(2),
-                                                                Variable(1),
-                                                            ),
-                                                        )
-                                                    ),
-                                                )
+                                                            Variable(2),
+                                                            Variable(1),
+                                                        ),
+                                                    )
+                                                ),
                                             )
                                         )
-                                    ),
+                                    )
                                 ),
-                                Abstraction(Abstraction(Variable(2))),
                             ),
-                            Abstraction(Variable(1)),
+                            Abstraction(Abstraction(Variable(2))),
                         ),
-                        Variable(1),
-                    )
+                        Abstraction(Variable(1)),
+                    ),
+                    Variable(1),
                 )
-            ),
+            )
         ),
-        # omega
-        # (λx.x x)(λx.x x)
-        (
-            """
-            ####### #######
-             #   #   #   #
-             #####   #####
-             #       #
-             #########
-             #
-             #
-            """,
-            Application(
-                Abstraction(Application(Variable(1), Variable(1))),
-                Abstraction(Application(Variable(1), Variable(1))),
-            ),
+    ),
+    # omega
+    # (λx.x x)(λx.x x)
+    (
+        """
+        ####### #######
+         #   #   #   #
+         #####   #####
+         #       #
+         #########
+         #
+         #
+        """,
+        Application(
+            Abstraction(Application(Variable(1), Variable(1))),
+            Abstraction(Application(Variable(1), Variable(1))),
         ),
-        (
-            """
-            ####### #######
-             #   #   #   #
-             #####   #####
-                 #   #
-                 #####
-            """,
-            Application(
-                Abstraction(Application(Variable(1), Variable(1))),
-                Abstraction(Application(Variable(1), Variable(1))),
-            ),
+    ),
+    (
+        """
+        ####### #######
+         #   #   #   #
+         #####   #####
+             #   #
+             #####
+        """,
+        Application(
+            Abstraction(Application(Variable(1), Variable(1))),
+            Abstraction(Application(Variable(1), Variable(1))),
         ),
-    ],
-)
+    ),
+]
+
+
+@pytest.mark.parametrize(["diagram_str", "want_ast"], DIAGRAMS)
 def test_parse_diagram(diagram_str: str, want_ast: Expression):
     diagram = LambdaDiagram.from_str(diagram_str)
     assert parse_diagram(diagram) == want_ast
+
+
+@pytest.mark.parametrize(["diagram_str", "want_ast"], DIAGRAMS)
+def test_render_parse_round_trip(diagram_str: str, want_ast: Expression):
+    diagram = LambdaDiagram.from_str(diagram_str)
+    assert parse_diagram(render_diagram(parse_diagram(diagram))) == want_ast
+    assert parse_diagram(render_diagram(want_ast)) == want_ast
+
+
+def test_walk_diagram():
+    # the stray pixel on the right is not connected to the term
+    diagram = LambdaDiagram.from_str(
+        """
+        ###
+                #
+        ###
+         #
+         #
+        """
+    )
+    walk = walk_diagram(diagram)
+
+    assert [walk.pos(i) for i in walk.abstractions] == [Vec2(0, 0), Vec2(0, 2)]
+    assert walk.applications == []
+    assert (walk.min_x, walk.min_y, walk.max_x, walk.max_y) == (0, 0, 2, 4)
+    assert (walk.width, walk.height) == (3, 5)
+    assert Vec2(1, 4) in walk
+    assert Vec2(8, 1) not in walk
+    assert sum(walk.pixels) == 8
+
+
+def test_parse_tokens_deep():
+    # f (f (f ... x)), nested far deeper than the recursion limit
+    depth = 10_000
+    token = VariableToken(1)
+    for _ in range(depth):
+        application = ApplicationToken(min_x=0, max_x=0, y=0, left=VariableToken(2))
+        application.right = token
+        token = application
+    tokens = TokenGrid()
+    tokens.add_row_run(0, 0, 0, token)
+    walk = DiagramWalk(
+        width=1,
+        height=1,
+        pixels=bytearray([1]),
+        abstractions=[],
+        applications=[],
+        min_x=0,
+        min_y=0,
+        max_x=0,
+        max_y=0,
+    )
+
+    expression = parse_tokens(walk, tokens)
+
+    for _ in range(depth):
+        assert isinstance(expression, Application)
+        assert expression.function == Variable(2)
+        expression = expression.argument
+    assert expression == Variable(1)
+
+
+def test_tokenize_diagram():
+    # λx.λy.x y
+    diagram = LambdaDiagram.from_str(
+        """
+        #######
+         #
+        #######
+         #   #
+         #####
+         #
+        """
+    )
+    tokens = tokenize_diagram(walk_diagram(diagram))
+
+    outer, inner = tokens[Vec2(0, 0)], tokens[Vec2(6, 2)]
+    assert isinstance(outer, AbstractionToken)
+    assert isinstance(inner, AbstractionToken)
+    assert (outer.min_x, outer.max_x, outer.scope_max_y) == (0, 6, 5)
+
+    x = tokens[Vec2(1, 3)]
+    assert isinstance(x, VariableToken) and x.index == 2
+    assert tokens[Vec2(1, 1)] is not x
+
+    application = tokens[Vec2(3, 4)]
+    assert isinstance(application, ApplicationToken)
+    assert application.left is x
+    assert tokens[Vec2(1, 5)] is application
+    assert Vec2(2, 3) not in tokens
+
+
+def test_token_grid_row_tokens():
+    tokens = TokenGrid()
+    bar = AbstractionToken(min_x=0, max_x=6, y=0, scope_max_y=4)
+    left, right = VariableToken(1), VariableToken(2)
+    tokens.add_row_run(0, 0, 6, bar)
+    tokens.add_column_run(1, 1, 4, left)
+    tokens.add_column_run(5, 3, 4, right)
+
+    assert list(tokens.row_tokens(0, 0, 6)) == [bar]
+    assert list(tokens.row_tokens(2, 0, 6)) == [left]
+    assert list(tokens.row_tokens(3, 0, 6)) == [left, right]
+    assert list(tokens.row_tokens(3, 2, 5)) == [right]
+    assert list(tokens.row_tokens(5, 0, 6)) == []
+
+
+def test_parse_deep_abstractions():
+    # λ^n.1 is a tall stack of bars, which used to take quadratic time to tokenize
+    expression: Expression = Variable(1)
+    for _ in range(5000):
+        expression = Abstraction(expression)
+
+    assert parse_diagram(render_diagram(expression)) == expression
+
+
+# the tokens of this diagram lead back to one another, which used to loop forever
+CYCLIC_DIAGRAM = """
+## ###
+ #   #
+ #####
+ #
+ #
+"""
+
+
+def test_parse_cyclic_diagram():
+    with pytest.raises(ValueError):
+        parse_diagram(LambdaDiagram.from_str(CYCLIC_DIAGRAM))
@@ -0,0 +1,139 @@
+import io
+import random
+
+import pytest
+
+from lambda_calc.ast import (
+    Abstraction,
+    Application,
+    Expression,
+    Variable,
+    display_with_names,
+)
+from lambda_calc.printer import format_expression, variable_name, write_expression
+from lambda_calc.text import parse_term
+
+S = Abstraction(
+    Abstraction(
+        Abstraction(
+            Application(
+                Application(Variable(3), Variable(1)),
+                Application(Variable(2), Variable(1)),
+            )
+        )
+    )
+)
+
+
+def _nested(depth: int, body: Expression) -> Expression:
+    for _ in range(depth):
+        body = Abstraction(body)
+    return body
+
+
+def _random_term(rng: random.Random, size: int, depth: int = 0) -> Expression:
+    if size <= 1 and depth:
+        return Variable(rng.randint(1, depth))
+    if size <= 2 or not depth or rng.random() < 0.3:
+        return Abstraction(_random_term(rng, size - 1, depth + 1))
+    left = rng.randint(1, size - 2)
+    return Application(
+        _random_term(rng, left, depth),
+        _random_term(rng, size - 1 - left, depth),
+    )
+
+
+@pytest.mark.parametrize(
+    ["level", "want"],
+    [(0, "a"), (25, "z"), (26, "a1"), (27, "b1"), (52, "a2"), (26 * 100 + 3, "d100")],
+)
+def test_variable_name(level: int, want: str):
+    assert variable_name(level) == want
+
+
+@pytest.mark.parametrize(
+    ["expression", "de_bruijn", "minimal", "want"],
+    [
+        (S, False, False, "(λa.(λb.(λc.((ac)(bc)))))"),
+        (S, True, False, "(λ(λ(λ((3 1) (2 1)))))"),
+        (S, False, True, "λa.λb.λc.a c (b c)"),
+        (S, True, True, "λλλ3 1 (2 1)"),
+        (
+            Application(Abstraction(Variable(1)), Abstraction(Variable(1))),
+            False,
+            True,
+            "(λa.a) λa.a",
+        ),
+        (
+            Abstraction(
+                Application(
+                    Application(Variable(1), Abstraction(Variable(1))),
+                    Variable(1),
+                )
+            ),
+            False,
+            True,
+            "λa.a (λb.b) a",
+        ),
+    ],
+)
+def test_format_expression(
+    expression: Expression, de_bruijn: bool, minimal: bool, want: str
+):
+    got = format_expression(expression, de_bruijn=de_bruijn, minimal=minimal)
+
+    assert got == want
+
+
+def test_format_expression_long_names():
+    expression = _nested(28, Application(Variable(28), Variable(1)))
+
+    got = format_expression(expression)
+
+    assert got.endswith("(λb1.(a b1))" + ")" * 27)
+
+
+def test_display_with_names_beyond_alphabet():
+    expression = _nested(1000, Variable(1))
+
+    got = display_with_names(expression)
+
+    assert got.endswith("(λl38.l38)" + ")" * 999)
+
+
+@pytest.mark.parametrize("de_bruijn", [False, True])
+def test_minimal_round_trip(de_bruijn: bool):
+    rng = random.Random(0)
+    for _ in range(200):
+        expression = _random_term(rng, rng.randint(1, 30))
+
+        text = format_expression(expression, de_bruijn=de_bruijn, minimal=True)
+
+        assert parse_term(text) == expression, text
+
+
+def test_format_expression_free_variable():
+    with pytest.raises(ValueError):
+        format_expression(Variable(1))
+
+    assert format_expression(Variable(1), depth=1) == "a"
+
+
+def test_write_expression_chunks():
+    depth = 100_000
+    body: Expression = Variable(1)
+    for _ in range(depth):
+        body = Application(Variable(2), body)
+    expression = Abstraction(Abstraction(body))
+    sink = io.StringIO()
+    writes = list[str]()
+
+    class Sink:
+        def write(self, text: str):
+            writes.append(text)
+            return sink.write(text)
+
+    write_expression(expression, Sink(), minimal=True)
+
+    assert len(writes) > 1
+    assert sink.getvalue() == "λa.λb." + "a (" * (depth - 1) + "a b" + ")" * (depth - 1)
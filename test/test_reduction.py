@@ -0,0 +1,109 @@
+import pytest
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.church import numeral
+from lambda_calc.reduction import (
+    Reduction,
+    Strategy,
+    reduce,
+    shift,
+    step,
+    substitute,
+)
+
+ID = Abstraction(Variable(1))
+K = Abstraction(Abstraction(Variable(2)))
+S = Abstraction(
+    Abstraction(
+        Abstraction(
+            Application(
+                Application(Variable(3), Variable(1)),
+                Application(Variable(2), Variable(1)),
+            )
+        )
+    )
+)
+OMEGA = Application(
+    Abstraction(Application(Variable(1), Variable(1))),
+    Abstraction(Application(Variable(1), Variable(1))),
+)
+PLUS = Abstraction(
+    Abstraction(
+        Abstraction(
+            Abstraction(
+                Application(
+                    Application(Variable(4), Variable(2)),
+                    Application(Application(Variable(3), Variable(2)), Variable(1)),
+                )
+            )
+        )
+    )
+)
+
+
+def apply(function: Expression, *arguments: Expression) -> Expression:
+    for argument in arguments:
+        function = Application(function, argument)
+    return function
+
+
+@pytest.mark.parametrize("strategy", list(Strategy))
+@pytest.mark.parametrize(
+    ["expression", "want"],
+    [
+        (ID, ID),
+        (apply(ID, K), K),
+        (apply(S, K, K), ID),
+        (apply(K, Variable(1), Variable(2)), Variable(1)),
+        (apply(PLUS, numeral(2), numeral(3)), numeral(5)),
+        # reduction under a binder, with a free variable that must be shifted
+        (Abstraction(apply(K, Variable(1))), Abstraction(Abstraction(Variable(2)))),
+    ],
+)
+def test_reduce(strategy: Strategy, expression: Expression, want: Expression):
+    result = reduce(expression, strategy)
+    assert result.normal_form
+    assert result.expression == want
+
+
+def test_reduce_strategies_differ():
+    # K I Ω only has a normal form if the argument Ω is never reduced
+    expression = apply(K, ID, OMEGA)
+
+    assert reduce(expression, Strategy.NORMAL) == Reduction(ID, 2, normal_form=True)
+
+    result = reduce(expression, Strategy.APPLICATIVE, max_steps=10)
+    assert not result.normal_form
+    assert result.steps == 10
+
+
+def test_reduce_limits():
+    assert reduce(OMEGA, max_steps=5).expression == OMEGA
+    assert reduce(OMEGA, max_steps=5).steps == 5
+    assert reduce(OMEGA, timeout=0) == Reduction(OMEGA, 0, normal_form=False)
+
+
+def test_step_shares_unchanged_subtrees():
+    argument = numeral(3)
+    expression = Application(apply(ID, K), argument)
+
+    reduced = step(expression)
+
+    assert reduced == Application(K, argument)
+    assert isinstance(reduced, Application)
+    assert reduced.argument is argument
+    assert step(K) is None
+
+
+def test_shift():
+    expression = Abstraction(Application(Variable(1), Variable(2)))
+    assert shift(expression, 2) == Abstraction(Application(Variable(1), Variable(4)))
+    assert shift(expression, 1, cutoff=1) is expression
+
+
+def test_substitute():
+    # (λx.λy.x z)[x := w], with z and w free
+    body = Abstraction(Application(Variable(2), Variable(3)))
+    assert substitute(body, Variable(5)) == Abstraction(
+        Application(Variable(6), Variable(2))
+    )
@@ -0,0 +1,69 @@
+import textwrap
+
+import pytest
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.parser import parse_diagram
+from lambda_calc.render import render_diagram
+
+
+@pytest.mark.parametrize(
+    ["expression", "want_str"],
+    [
+        (
+            Abstraction(Variable(1)),
+            """
+            ###
+             #
+             #
+            """,
+        ),
+        (
+            Abstraction(Abstraction(Variable(1))),
+            """
+            ###
+
+            ###
+             #
+             #
+            """,
+        ),
+        (
+            Application(
+                Abstraction(Application(Variable(1), Variable(1))),
+                Abstraction(Application(Variable(1), Variable(1))),
+            ),
+            """
+            ####### #######
+             #   #   #   #
+             #####   #####
+             #       #
+             #########
+             #
+             #
+            """,
+        ),
+        # the variable under the first abstraction has to stick out an extra row,
+        # otherwise the link below it would be parsed as the abstraction's body
+        (
+            Application(Abstraction(Variable(1)), Abstraction(Variable(1))),
+            """
+            ### ###
+             #   #
+             #   #
+             #####
+             #
+             #
+            """,
+        ),
+    ],
+)
+def test_render_diagram(expression: Expression, want_str: str):
+    diagram = render_diagram(expression)
+    assert str(diagram) == textwrap.dedent(want_str).strip("\n")
+    assert parse_diagram(diagram) == expression
+
+
+def test_render_diagram_free_variable():
+    with pytest.raises(ValueError):
+        render_diagram(Abstraction(Variable(2)))
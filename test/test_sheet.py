@@ -0,0 +1,90 @@
+import pytest
+
+from lambda_calc.ast import Abstraction, Variable
+from lambda_calc.diagram import LambdaDiagram
+from lambda_calc.render import render_diagram
+from lambda_calc.sheet import Box, find_diagrams, parse_sheet
+
+from .test_parser import DIAGRAMS
+
+EXPRESSIONS = [want for _, want in DIAGRAMS]
+
+
+def _sheet(expressions: list, columns: int = 4):
+    """Lays out the rendered expressions in a grid, each cell offset a little
+    differently, and returns the sheet and where each diagram ended up."""
+    diagrams = [render_diagram(expression) for expression in expressions]
+    cell_width = max(diagram.width for diagram in diagrams) + 3
+    cell_height = max(diagram.height for diagram in diagrams) + 3
+    rows = -(-len(diagrams) // columns)
+    width = cell_width * columns
+    pixels = bytearray(width * cell_height * rows)
+
+    boxes = list[Box]()
+    for i, diagram in enumerate(diagrams):
+        row, column = divmod(i, columns)
+        min_x = column * cell_width + i % 3
+        min_y = row * cell_height + i % 2
+        for y in range(diagram.height):
+            start = (min_y + y) * width + min_x
+            pixels[start : start + diagram.width] = diagram.row(y)
+        boxes.append(
+            Box(min_x, min_y, min_x + diagram.width - 1, min_y + diagram.height - 1)
+        )
+
+    return LambdaDiagram.from_pixels(pixels, width, cell_height * rows), boxes
+
+
+def _in_order(boxes: list[Box]):
+    return sorted(
+        zip(boxes, EXPRESSIONS), key=lambda pair: (pair[0].min_y, pair[0].min_x)
+    )
+
+
+def test_find_diagrams():
+    sheet, boxes = _sheet(EXPRESSIONS)
+
+    found = find_diagrams(sheet)
+
+    assert [box for box, _ in found] == [box for box, _ in _in_order(boxes)]
+    for (_, diagram), (_, expression) in zip(found, _in_order(boxes)):
+        assert diagram.pixels == render_diagram(expression).pixels
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_parse_sheet(jobs: int):
+    sheet, boxes = _sheet(EXPRESSIONS)
+
+    assert parse_sheet(sheet, jobs=jobs) == _in_order(boxes)
+
+
+def test_parse_sheet_abstraction_gap():
+    # λx.λy.y, where the bars are only joined by the abstraction's two row jump
+    sheet = LambdaDiagram.from_str(
+        """
+        ###
+             ###
+        ###
+         #   ###
+         #    #
+              #
+        """
+    )
+
+    assert parse_sheet(sheet) == [
+        (Box(0, 0, 2, 4), Abstraction(Abstraction(Variable(1)))),
+        (Box(5, 1, 7, 5), Abstraction(Abstraction(Variable(1)))),
+    ]
+
+
+def test_parse_sheet_invalid():
+    sheet = LambdaDiagram.from_str(
+        """
+        ###  ###
+         #   #
+         #   #
+        """
+    )
+
+    with pytest.raises(ValueError, match="at 5, 0"):
+        parse_sheet(sheet)
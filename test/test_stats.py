@@ -0,0 +1,47 @@
+from lambda_calc.ast import Abstraction, Application, Variable
+from lambda_calc.cache import ParseCache
+from lambda_calc.diagram import LambdaDiagram
+from lambda_calc.parser import parse_diagram
+from lambda_calc.stats import ParseStats
+
+# λx.λy.x y
+DIAGRAM = """
+#######
+ #
+#######
+ #   #
+ #####
+ #
+"""
+
+
+def test_parse_stats():
+    stats = ParseStats()
+    diagram = LambdaDiagram.from_str(DIAGRAM)
+
+    expression = parse_diagram(diagram, stats=stats)
+
+    assert expression == Abstraction(Abstraction(Application(Variable(2), Variable(1))))
+    assert stats.diagrams == 1
+    assert stats.pixels == 7 * 6
+    assert stats.walked_pixels == 7 + 1 + 7 + 2 + 5 + 1
+    assert (stats.abstractions, stats.applications) == (2, 1)
+    assert stats.nodes == 5
+    assert stats.runs > 0
+    assert stats.seconds > 0
+    assert all(stage.seconds > 0 for stage in (stats.walk, stats.tokenize, stats.parse))
+    assert "walk" in stats.summary()
+
+
+def test_parse_stats_accumulate():
+    stats = ParseStats()
+    cache = ParseCache()
+    diagram = LambdaDiagram.from_str(DIAGRAM)
+
+    parse_diagram(diagram, cache, stats)
+    seconds = stats.seconds
+    parse_diagram(diagram, cache, stats)
+
+    assert (stats.diagrams, stats.cache_hits) == (2, 1)
+    assert stats.nodes == 5
+    assert stats.seconds == seconds
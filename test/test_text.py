@@ -0,0 +1,106 @@
+import pytest
+
+from lambda_calc.ast import Abstraction, Application, Expression, Variable
+from lambda_calc.text import load_terms, parse_term, parse_terms
+
+S = Abstraction(
+    Abstraction(
+        Abstraction(
+            Application(
+                Application(Variable(3), Variable(1)),
+                Application(Variable(2), Variable(1)),
+            )
+        )
+    )
+)
+OMEGA = Application(
+    Abstraction(Application(Variable(1), Variable(1))),
+    Abstraction(Application(Variable(1), Variable(1))),
+)
+
+
+@pytest.mark.parametrize(
+    ["text", "want"],
+    [
+        ("λx.x", Abstraction(Variable(1))),
+        ("\\x.x", Abstraction(Variable(1))),
+        ("λ1", Abstraction(Variable(1))),
+        ("λx.λy.x", Abstraction(Abstraction(Variable(2)))),
+        ("λx y.x", Abstraction(Abstraction(Variable(2)))),
+        ("λλ2", Abstraction(Abstraction(Variable(2)))),
+        ("λ x . λ y . y", Abstraction(Abstraction(Variable(1)))),
+        ("λx.λy.λz.x z (y z)", S),
+        ("λλλ3 1 (2 1)", S),
+        ("\\x y z. (x z) (y z)", S),
+        ("(λx.x x)(λx.x x)", OMEGA),
+        ("(λ1 1) (λ1 1)", OMEGA),
+        # shadowing
+        ("λx.λx.x", Abstraction(Abstraction(Variable(1)))),
+        # mixed notation
+        (
+            "λf.λ2 (f 1)",
+            Abstraction(
+                Abstraction(
+                    Application(Variable(2), Application(Variable(2), Variable(1)))
+                )
+            ),
+        ),
+        # abstraction bodies extend as far right as possible
+        (
+            "λx.x λy.y x",
+            Abstraction(
+                Application(
+                    Variable(1), Abstraction(Application(Variable(1), Variable(2)))
+                )
+            ),
+        ),
+        (
+            "λf' x1.f' x1 # comment",
+            Abstraction(Abstraction(Application(Variable(2), Variable(1)))),
+        ),
+    ],
+)
+def test_parse_term(text: str, want: Expression):
+    assert parse_term(text) == want
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "λx.", "(λx.x", "λx.y", "λ0", "x", "()", "λx.x)", "λ.x", "λx.x ?", "# λx.x"],
+)
+def test_parse_term_invalid(text: str):
+    with pytest.raises(ValueError):
+        parse_term(text)
+
+
+def test_parse_term_deep():
+    depth = 10_000
+    text = "λf.λx." + "f (" * depth + "x" + ")" * depth
+
+    expression = parse_term(text)
+
+    assert isinstance(expression, Abstraction)
+    assert isinstance(expression.body, Abstraction)
+    expression = expression.body.body
+    for _ in range(depth):
+        assert isinstance(expression, Application)
+        assert expression.function == Variable(2)
+        expression = expression.argument
+    assert expression == Variable(1)
+
+
+def test_parse_terms():
+    lines = ["λx.x\n", "\n", "# comment\n", "λλ2\n"]
+    assert list(parse_terms(lines)) == [
+        Abstraction(Variable(1)),
+        Abstraction(Abstraction(Variable(2))),
+    ]
+
+
+def test_load_terms(tmp_path):
+    path = tmp_path / "terms.txt"
+    path.write_text("λx.x\n-- comment\nλx.x x\n", encoding="utf-8")
+    assert list(load_terms(path)) == [
+        Abstraction(Variable(1)),
+        Abstraction(Application(Variable(1), Variable(1))),
+    ]